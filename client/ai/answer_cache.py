@@ -0,0 +1,159 @@
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from dotenv import load_dotenv
+import logging
+import math
+import os
+import re
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "false").lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "600"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0"))
+
+WORD_PATTERN = re.compile(r"\w+")
+MONTHS = {
+    "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december"
+}
+# Words naming what a question asks for: similar questions with different intents need different answers
+INTENT_WORDS = {
+    "count": {"many", "count", "counts", "number", "orders", "order", "ordered", "purchases"},
+    "spend": {"much", "spend", "spent", "spends", "spending", "amount", "revenue", "paid", "value"},
+    "list": {"list", "show", "recent", "latest", "newest", "which", "who"}
+}
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(WORD_PATTERN.findall(question.casefold()))
+
+
+def anchor_terms(question: str) -> frozenset[str]:
+    """
+    Terms two questions must share to be answered alike: numbers, months and
+    capitalized words past the first one, which are usually names and countries.
+    """
+    words = WORD_PATTERN.findall(question)
+    return frozenset(
+        word.casefold()
+        for position, word in enumerate(words)
+        if any(c.isdigit() for c in word)
+        or word.casefold() in MONTHS
+        or (position > 0 and word[0].isupper())
+    )
+
+
+def intents(question: str) -> frozenset[str]:
+    words = set(normalize_question(question).split())
+    return frozenset(intent for intent, intent_words in INTENT_WORDS.items() if words & intent_words)
+
+
+def embed(text: str) -> dict[str, float]:
+    """Local bag of words and character trigrams, normalized to unit length."""
+    words = text.split()
+    counts = Counter(words)
+    for word in words:
+        padded = f" {word} "
+        counts.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(count * count for count in counts.values()))
+    return {term: count / norm for term, count in counts.items()}
+
+
+def cosine_similarity(a: dict[str, float], b: dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    expires_at: float
+    anchors: frozenset[str]
+    intents: frozenset[str]
+    vector: dict[str, float] | None
+
+
+class AnswerCache:
+    """
+    Answers to first-turn questions, reused without calling the model.
+
+    Entries are keyed by normalized question text and expire after `ttl`
+    seconds. The whole cache is dropped when the data version reported by the
+    MCP server changes. With `similarity` above zero, a question without an
+    exact entry reuses the answer of the most similar cached question, as long
+    as both mention the same numbers, months and names and ask for the same
+    things: counts, spend or lists of customers.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = ANSWER_CACHE,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl: float = ANSWER_CACHE_TTL,
+        similarity: float = ANSWER_CACHE_SIMILARITY
+    ):
+        self.enabled = enabled and max_size > 0 and ttl > 0
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity = similarity
+        self.hits = 0
+        self.misses = 0
+        self.data_version: str | None = None
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+
+    def check_data_version(self, data_version: str) -> None:
+        if self.data_version is not None and data_version != self.data_version:
+            logger.info(f"Data version changed, clearing {len(self._entries)} cached answers")
+            self._entries.clear()
+        self.data_version = data_version
+
+    def get(self, question: str) -> str | None:
+        key = normalize_question(question)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is None and self.similarity > 0:
+            key, entry = self._most_similar(question, key, now)
+
+        if entry is None or entry.expires_at < now:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.answer
+
+    def put(self, question: str, answer: str) -> None:
+        key = normalize_question(question)
+        self._entries[key] = CachedAnswer(
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl,
+            anchors=anchor_terms(question),
+            intents=intents(question),
+            vector=embed(key) if self.similarity > 0 else None
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _most_similar(self, question: str, key: str, now: float) -> tuple[str, CachedAnswer | None]:
+        anchors = anchor_terms(question)
+        question_intents = intents(question)
+        vector = embed(key)
+        best_key, best_entry, best_similarity = key, None, self.similarity
+        for cached_key, entry in self._entries.items():
+            if entry.anchors != anchors or entry.intents != question_intents or entry.vector is None or entry.expires_at < now:
+                continue
+            similarity = cosine_similarity(vector, entry.vector)
+            if similarity >= best_similarity:
+                best_key, best_entry, best_similarity = cached_key, entry, similarity
+        return best_key, best_entry
+
+
+answer_cache = AnswerCache()
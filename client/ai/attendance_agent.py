@@ -1,61 +1,85 @@
 
 from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
 from ai.state import State
-from ai.mcp_client import get_mcp_client
-import os
+from ai.model import get_model
+from ai.history import get_encoding, summary_message, truncate_tool_outputs
+from ai.mcp_client import mcp_tool_provider
+from ai.tool_memo import memoize_tools, tool_memo_scope
+from langchain_core.tools import BaseTool
+from langgraph.graph.state import CompiledStateGraph
 import logging
-from utils.exception_handler import handle_agent_exception
+from utils.exception_handler import handle_agent_exception, is_connection_error
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-async def attendance_agent(state: State) -> State:
-    try:
-        logger.debug(f"thread_id: {state['thread_id']} - Starting agent execution")
-        model = ChatOpenAI(
-            model_name="gpt-4o",
-            temperature=0.33,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+PROMPT_TEMPLATE = ChatPromptTemplate.from_messages(
+    [
+        ("system", """
+            You're a helpful attendance agent that answers questions about customers and orders.
+         
+            Always answer in plain text, never use markdown or JSON.
+        """),
+        ("placeholder", "{messages}")
+    ]
+)
 
-        prompt_template = ChatPromptTemplate.from_messages(
-            [
-                ("system", """
-                    You're a helpful attendance agent that answers questions about customers and orders.
-                 
-                    Always answer in plain text, never use markdown or JSON.
-                """),
-                ("placeholder", "{messages}")
-            ]
-        )
+_agent: CompiledStateGraph | None = None
+_agent_tools: list[BaseTool] | None = None
 
-        logger.debug(f"thread_id: {state['thread_id']} - Getting MCP tools")
-        mcp_client = get_mcp_client()
 
-        mcp_tools = await mcp_client.get_tools()
+async def get_agent() -> CompiledStateGraph:
+    """Return the ReAct agent, recompiling it only when the MCP tool list was refreshed."""
+    global _agent, _agent_tools
 
-        agent = create_react_agent(
-            model=model,
-            tools=mcp_tools,
+    mcp_tools = await mcp_tool_provider.get_tools()
+    if _agent is None or mcp_tools is not _agent_tools:
+        logger.info("Compiling attendance agent")
+        _agent = create_react_agent(
+            model=get_model(),
+            tools=memoize_tools(mcp_tools),
             checkpointer=False,
-            prompt=prompt_template
+            prompt=PROMPT_TEMPLATE,
+            pre_model_hook=truncate_tool_outputs
         )
+        _agent_tools = mcp_tools
+    return _agent
+
+
+async def warm_up() -> None:
+    get_model()
+    get_encoding()
+    try:
+        await get_agent()
+        logger.info("Attendance agent warmed up")
+    except Exception as e:
+        logger.warning(f"Attendance agent warm-up failed, it will be built on the first request: {e}")
+
+
+async def attendance_agent(state: State) -> State:
+    try:
+        logger.debug(f"thread_id: {state['thread_id']} - Starting agent execution")
+        agent = await get_agent()
+
+        messages = state["messages"]
+        if state.get("summary"):
+            messages = [summary_message(state["summary"]), *messages]
 
         logger.debug(f"thread_id: {state['thread_id']} - Invoking agent")
-        response = await agent.ainvoke(
-            {"messages": state["messages"]},
-            config={
-                "configurable": {
-                    "max_iterations": 3,
-                    "max_execution_time": 30,
-                    "max_retries": 3
+        with tool_memo_scope(state["thread_id"]):
+            response = await agent.ainvoke(
+                {"messages": messages},
+                config={
+                    "configurable": {
+                        "max_iterations": 3,
+                        "max_execution_time": 30,
+                        "max_retries": 3
+                    }
                 }
-            }
-        )
+            )
 
         logger.debug(f"thread_id: {state['thread_id']} - Agent response: {response}")
 
@@ -64,6 +88,9 @@ async def attendance_agent(state: State) -> State:
         state["messages"].append(last_message)
         return state
     except Exception as e:
+        # Only a broken MCP session is worth reconnecting; model errors leave it as is
+        if is_connection_error(e):
+            await mcp_tool_provider.reset()
         error_message = handle_agent_exception(e, logger, state["thread_id"])
         state["messages"].append(error_message)
         return state
\ No newline at end of file
@@ -0,0 +1,444 @@
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableConfig
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any
+from dotenv import load_dotenv
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTER = os.getenv("CHECKPOINTER", "sqlite")
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite")
+CHECKPOINT_THREAD_TTL = float(os.getenv("CHECKPOINT_THREAD_TTL", "86400"))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "10000"))
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", "1"))
+CHECKPOINT_CACHE_KB = int(os.getenv("CHECKPOINT_CACHE_KB", "8192"))
+CHECKPOINT_COMPACTION_INTERVAL = float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "600"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_threads_accessed_at ON threads (accessed_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpointer backed by a local SQLite file, bounded in time and size.
+
+    Every read or write of a thread refreshes its access time. Threads idle for
+    longer than `thread_ttl` seconds are treated as gone, and when more than
+    `max_threads` are stored the least recently used ones are evicted.
+    `compact()` also drops the checkpoints superseded by the latest
+    `keep_per_thread` of each thread. The page cache is capped at `cache_kb`,
+    so process memory no longer grows with the number of conversations.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        thread_ttl: float = CHECKPOINT_THREAD_TTL,
+        max_threads: int = CHECKPOINT_MAX_THREADS,
+        keep_per_thread: int = CHECKPOINT_KEEP_PER_THREAD,
+        cache_kb: int = CHECKPOINT_CACHE_KB,
+        serde: SerializerProtocol | None = None
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.thread_ttl = thread_ttl
+        self.max_threads = max_threads
+        self.keep_per_thread = max(keep_per_thread, 1)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute(f"PRAGMA cache_size = -{int(cache_kb)}")
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        if self._is_expired(thread_id):
+            self.delete_thread(thread_id)
+            return None
+
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+            " FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        parameters: list[Any] = [thread_id, checkpoint_ns]
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            parameters.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._connection.execute(query, parameters).fetchone()
+            if row is None:
+                return None
+            self._touch(thread_id)
+            self._connection.commit()
+
+        return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+            " FROM checkpoints"
+        )
+        conditions = []
+        parameters: list[Any] = []
+        if config:
+            conditions.append("thread_id = ?")
+            parameters.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                parameters.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                parameters.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            parameters.append(before_checkpoint_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, row)
+            if filter and not all(checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    checkpoint_type,
+                    checkpoint_data,
+                    metadata_type,
+                    metadata_data
+                )
+            )
+            self._touch(thread_id)
+            self._connection.commit()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"]
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_data = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                value_type,
+                value_data,
+                task_path
+            ))
+
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "writes", "threads"):
+                self._connection.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._connection.commit()
+
+    def compact(self) -> dict[str, int]:
+        """Expire idle threads, evict the least recently used ones and drop superseded checkpoints."""
+        with self._lock:
+            expired = self._delete_threads(
+                "SELECT thread_id FROM threads WHERE accessed_at < ?",
+                (time.time() - self.thread_ttl,)
+            )
+            evicted = self._delete_threads(
+                "SELECT thread_id FROM threads ORDER BY accessed_at DESC LIMIT -1 OFFSET ?",
+                (self.max_threads,)
+            )
+            superseded = self._connection.execute(
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                        ) AS position
+                        FROM checkpoints
+                    ) WHERE position > ?
+                )
+                """,
+                (self.keep_per_thread,)
+            ).rowcount
+            self._connection.execute(
+                """
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                    AND c.checkpoint_ns = writes.checkpoint_ns
+                    AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """
+            )
+            self._connection.commit()
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        return {"expired": expired, "evicted": evicted, "superseded": superseded}
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def acompact(self) -> dict[str, int]:
+        return await asyncio.to_thread(self.compact)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # Same zero-padded string versions as MemorySaver, so they sort correctly
+        if current is None:
+            current_version = 0
+        elif isinstance(current, int):
+            current_version = current
+        else:
+            current_version = int(current.split(".")[0])
+        return f"{current_version + 1:032}.{0:016}"
+
+    def _is_expired(self, thread_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT accessed_at FROM threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        return row is not None and row[0] < time.time() - self.thread_ttl
+
+    def _touch(self, thread_id: str) -> None:
+        self._connection.execute(
+            "INSERT INTO threads VALUES (?, ?) ON CONFLICT (thread_id) DO UPDATE SET accessed_at = excluded.accessed_at",
+            (thread_id, time.time())
+        )
+
+    def _delete_threads(self, select_query: str, parameters: tuple) -> int:
+        thread_ids = [row[0] for row in self._connection.execute(select_query, parameters)]
+        for table in ("checkpoints", "writes", "threads"):
+            self._connection.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,) for thread_id in thread_ids]
+            )
+        return len(thread_ids)
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint_data, metadata_type, metadata_data = row
+
+        with self._lock:
+            writes = self._connection.execute(
+                "SELECT task_id, channel, type, value FROM writes"
+                " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id
+                }
+            },
+            checkpoint=self.serde.loads_typed((checkpoint_type, checkpoint_data)),
+            metadata=self.serde.loads_typed((metadata_type, metadata_data)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ]
+        )
+
+
+def is_shared(checkpointer: BaseCheckpointSaver) -> bool:
+    """Whether every worker process sees the same conversations through `checkpointer`."""
+    return not isinstance(checkpointer, MemorySaver)
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    if CHECKPOINTER == "redis":
+        try:
+            from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+        except ImportError as e:
+            raise ImportError("CHECKPOINTER=redis requires the redis extra: uv sync --extra redis") from e
+        logger.info(f"Using the Redis checkpointer at {REDIS_URL}")
+        return AsyncRedisSaver(redis_url=REDIS_URL)
+    if CHECKPOINTER == "memory":
+        logger.warning("Using the in-memory checkpointer, conversations are unbounded and lost on restart")
+        return MemorySaver()
+    if CHECKPOINTER == "sqlite":
+        logger.info(f"Using the SQLite checkpointer at {CHECKPOINT_DB_PATH}")
+        return SqliteCheckpointSaver()
+    raise ValueError(f"Unknown checkpointer: {CHECKPOINTER}")
+
+
+async def setup_checkpointer(checkpointer: BaseCheckpointSaver) -> None:
+    # The Redis checkpointer creates its indexes asynchronously, before the first request
+    if hasattr(checkpointer, "asetup"):
+        await checkpointer.asetup()
+
+
+async def run_compaction(checkpointer: BaseCheckpointSaver, interval: float = CHECKPOINT_COMPACTION_INTERVAL) -> None:
+    """Compact `checkpointer` every `interval` seconds until cancelled."""
+    if not isinstance(checkpointer, SqliteCheckpointSaver) or interval <= 0:
+        return
+
+    while True:
+        try:
+            result = await checkpointer.acompact()
+            logger.info(f"Checkpoint compaction: {result}")
+        except Exception as e:
+            logger.error(f"Checkpoint compaction failed: {e}")
+        await asyncio.sleep(interval)
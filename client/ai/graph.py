@@ -1,18 +1,20 @@
 from langgraph.graph.state import StateGraph, CompiledStateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 from ai.state import State
 from ai.attendance_agent import attendance_agent
+from ai.history import manage_history
+from ai.checkpointer import create_checkpointer
 
 def create_graph() -> CompiledStateGraph:
-    checkpointer = MemorySaver()
+    checkpointer = create_checkpointer()
 
     graph = StateGraph(State)
 
+    graph.add_node("manage_history", manage_history)
     graph.add_node("attendance_agent", attendance_agent)
 
 
-    graph.add_edge(START, "attendance_agent")
-    graph.add_edge("attendance_agent", "attendance_agent_2")
-    graph.add_edge("attendance_agent_2", END)
+    graph.add_edge(START, "manage_history")
+    graph.add_edge("manage_history", "attendance_agent")
+    graph.add_edge("attendance_agent", END)
 
     return graph.compile(checkpointer=checkpointer)
\ No newline at end of file
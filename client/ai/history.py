@@ -0,0 +1,179 @@
+from langchain_core.messages import AnyMessage, AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate
+from ai.state import State
+from ai.model import get_model
+from dotenv import load_dotenv
+from typing import Optional
+import logging
+import os
+import time
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+HISTORY_WINDOW = int(os.getenv("HISTORY_WINDOW", "10"))
+TOOL_OUTPUT_TOKEN_LIMIT = int(os.getenv("TOOL_OUTPUT_TOKEN_LIMIT", "500"))
+HISTORY_TOKENIZER_MODEL = os.getenv("HISTORY_TOKENIZER_MODEL", "gpt-4o")
+
+# Tags the summarization model call, so streaming endpoints can skip its tokens
+SUMMARY_TAG = "history_summary"
+
+# Seconds before a tokenizer that failed to load (e.g. its download) is tried again
+TOKENIZER_RETRY_SECONDS = 60
+
+# Fixed cost of the role and separators OpenAI adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", """
+            Summarize the conversation between a customer and an attendance agent about customers and orders.
+            Keep names, ids, dates, amounts and any answer already given. Be brief, plain text only.
+        """),
+        ("human", "Previous summary:\n{summary}\n\nNew messages:\n{messages}")
+    ]
+)
+
+
+_encoding = None
+_encoding_failed_at: Optional[float] = None
+
+
+def get_encoding():
+    """Return the tiktoken encoding, or None while it can't be loaded. Only a loaded encoding is kept, failures are retried."""
+    global _encoding, _encoding_failed_at
+    if _encoding is not None:
+        return _encoding
+    if tiktoken is None:
+        if _encoding_failed_at is None:
+            logger.warning("tiktoken is not installed, estimating tokens from characters")
+            _encoding_failed_at = time.monotonic()
+        return None
+    if _encoding_failed_at is not None and time.monotonic() - _encoding_failed_at < TOKENIZER_RETRY_SECONDS:
+        return None
+    try:
+        _encoding = tiktoken.encoding_for_model(HISTORY_TOKENIZER_MODEL)
+        _encoding_failed_at = None
+    except Exception as e:
+        logger.warning(f"Tokenizer for {HISTORY_TOKENIZER_MODEL} unavailable, estimating tokens from characters: {e}")
+        _encoding_failed_at = time.monotonic()
+    return _encoding
+
+
+def message_text(message: AnyMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(message: AnyMessage) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(message_text(message))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(str(message.tool_calls))
+    return tokens
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def truncate_tool_outputs(state: dict) -> dict:
+    """
+    pre_model_hook of the agent: the model sees tool outputs cut to
+    TOOL_OUTPUT_TOKEN_LIMIT, while the agent's messages keep them whole.
+    """
+    messages = []
+    for message in state["messages"]:
+        if isinstance(message, ToolMessage) and count_tokens(message_text(message)) > TOOL_OUTPUT_TOKEN_LIMIT:
+            message = message.model_copy(update={"content": truncate_text(message_text(message), TOOL_OUTPUT_TOKEN_LIMIT) + " [truncated]"})
+        messages.append(message)
+    return {"llm_input_messages": messages}
+
+
+def split_history(messages: list[AnyMessage], budget: int, window: int) -> int:
+    """
+    Return the index of the first message to keep.
+
+    The last `window` messages are kept as long as they fit in `budget`, and
+    the most recent message is always kept. The split never leaves a tool
+    result without the AI message that requested it.
+    """
+    start = len(messages)
+    used = 0
+    while start > 0 and len(messages) - start < window:
+        tokens = count_message_tokens(messages[start - 1])
+        if start < len(messages) and used + tokens > budget:
+            break
+        used += tokens
+        start -= 1
+
+    while start < len(messages) - 1 and isinstance(messages[start], ToolMessage):
+        start += 1
+    return start
+
+
+def format_transcript(messages: list[AnyMessage]) -> str:
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"Customer: {message_text(message)}")
+        elif isinstance(message, AIMessage) and message_text(message):
+            lines.append(f"Agent: {message_text(message)}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool {message.name}: {truncate_text(message_text(message), TOOL_OUTPUT_TOKEN_LIMIT)}")
+    return "\n".join(lines)
+
+
+async def summarize(summary: str, messages: list[AnyMessage]) -> str:
+    response = await (SUMMARY_PROMPT | get_model()).ainvoke({
+        "summary": summary or "(none)",
+        "messages": format_transcript(messages)
+    }, config={"tags": [SUMMARY_TAG]})
+    return message_text(response)
+
+
+def summary_message(summary: str) -> SystemMessage:
+    return SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+
+
+async def manage_history(state: State) -> dict:
+    """
+    Keep the prompt within HISTORY_TOKEN_BUDGET.
+
+    Messages that fall out of the rolling window are folded into the running
+    summary and removed from the state; if summarizing fails they are kept.
+    """
+    messages = state["messages"]
+    summary = state.get("summary", "")
+    budget = HISTORY_TOKEN_BUDGET - (count_message_tokens(summary_message(summary)) if summary else 0)
+    if split_history(messages, budget, HISTORY_WINDOW) == 0:
+        return {}
+
+    # Shrink to half the window so the summary is refreshed every few turns, not on every turn
+    start = split_history(messages, budget // 2, max(HISTORY_WINDOW // 2, 1))
+
+    dropped = messages[:start]
+    logger.debug(f"thread_id: {state['thread_id']} - Summarizing {len(dropped)} messages out of the history window")
+    try:
+        summary = await summarize(summary, dropped)
+    except Exception as e:
+        # Dropping the messages without a summary would lose them, keep them until a later turn succeeds
+        logger.warning(f"thread_id: {state['thread_id']} - History summarization failed, keeping old messages: {e}")
+        return {}
+
+    return {"messages": [RemoveMessage(id=message.id) for message in dropped], "summary": summary}
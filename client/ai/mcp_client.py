@@ -1,15 +1,147 @@
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from langchain_core.tools import BaseTool
+from mcp import ClientSession, types
+from pydantic import AnyUrl
+import asyncio
+import httpx
+import logging
 import os
+import time
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-def get_mcp_client():
+SERVER_NAME = "simple_server"
+DATA_VERSION_URI = AnyUrl("data://version")
+MCP_TOOLS_TTL = float(os.getenv("MCP_TOOLS_TTL", "300"))
+MCP_HTTP_MAX_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "20"))
+
+
+def create_http_client(headers: dict[str, str] | None = None, timeout: httpx.Timeout | None = None, auth: httpx.Auth | None = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=MCP_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=MCP_HTTP_MAX_CONNECTIONS
+        )
+    )
+
+
+def get_mcp_client(message_handler=None):
     return MultiServerMCPClient(
         {
-            "simple_server": {
+            SERVER_NAME: {
                 "url": os.getenv("MCP_SERVER_URL"),
-                "transport": "streamable_http"
+                "transport": "streamable_http",
+                "httpx_client_factory": create_http_client,
+                "session_kwargs": {"message_handler": message_handler} if message_handler else None
             }
         }
-    )
\ No newline at end of file
+    )
+
+
+class McpToolProvider:
+    """
+    Process-lifetime MCP session with a cached tool list.
+
+    The session is opened once, on a background task that owns the
+    streamable-HTTP connection, and shared by every request. The tool list is
+    refreshed after `ttl` seconds, when the server sends a tools/list_changed
+    notification, or when the session breaks, in which case the next call
+    reconnects.
+    """
+
+    def __init__(self, ttl: float = MCP_TOOLS_TTL):
+        self.ttl = ttl
+        self._session: ClientSession | None = None
+        self._session_task: asyncio.Task | None = None
+        self._session_error: BaseException | None = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._tools: list[BaseTool] | None = None
+        self._tools_loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_tools(self) -> list[BaseTool]:
+        if self._tools_are_fresh():
+            return self._tools
+
+        async with self._lock:
+            if self._tools_are_fresh():
+                return self._tools
+
+            session = await self._get_session()
+            self._tools = await load_mcp_tools(session)
+            self._tools_loaded_at = time.monotonic()
+            logger.info(f"Loaded {len(self._tools)} MCP tools")
+            return self._tools
+
+    async def get_data_version(self) -> str:
+        """Version of the data behind the tools, as reported by the server's data://version resource."""
+        async with self._lock:
+            session = await self._get_session()
+        result = await session.read_resource(DATA_VERSION_URI)
+        return result.contents[0].text
+
+    def invalidate_tools(self) -> None:
+        self._tools = None
+
+    async def reset(self) -> None:
+        self.invalidate_tools()
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session_task is not None and not self._session_task.done():
+            self._closing.set()
+            await self._session_task
+
+    def _tools_are_fresh(self) -> bool:
+        return (
+            self._tools is not None
+            and self._session is not None
+            and time.monotonic() - self._tools_loaded_at < self.ttl
+        )
+
+    async def _get_session(self) -> ClientSession:
+        if self._session_task is None or self._session_task.done():
+            self._ready = asyncio.Event()
+            self._closing = asyncio.Event()
+            self._session_error = None
+            self._session_task = asyncio.create_task(self._run_session())
+
+        await self._ready.wait()
+        if self._session is None:
+            raise self._session_error or ConnectionError("MCP session is closed")
+        return self._session
+
+    async def _run_session(self) -> None:
+        # The transport's task group must be entered and exited on the same task
+        try:
+            async with get_mcp_client(self._handle_message).session(SERVER_NAME) as session:
+                self._session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            logger.error(f"MCP session closed with error: {e}")
+            self._session_error = e
+        finally:
+            self._session = None
+            self._tools = None
+            self._ready.set()
+
+    async def _handle_message(self, message) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            logger.info("MCP server tool list changed")
+            self.invalidate_tools()
+        elif isinstance(message, Exception):
+            logger.warning(f"MCP transport error, reconnecting on next request: {message}")
+            self.invalidate_tools()
+            self._closing.set()
+
+
+mcp_tool_provider = McpToolProvider()
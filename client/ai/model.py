@@ -0,0 +1,15 @@
+from langchain_openai import ChatOpenAI
+from functools import lru_cache
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+
+@lru_cache(maxsize=1)
+def get_model() -> ChatOpenAI:
+    return ChatOpenAI(
+        model_name="gpt-4o",
+        temperature=0.33,
+        api_key=os.getenv("OPENAI_API_KEY")
+    )
@@ -1,7 +1,8 @@
 from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
-from typing import Annotated, TypedDict
+from typing import Annotated, NotRequired, TypedDict
 
 class State(TypedDict):
     thread_id: str
-    messages: Annotated[list[AnyMessage], add_messages]
\ No newline at end of file
+    messages: Annotated[list[AnyMessage], add_messages]
+    summary: NotRequired[str]
\ No newline at end of file
@@ -0,0 +1,95 @@
+from langchain_core.tools import BaseTool, StructuredTool
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+from dotenv import load_dotenv
+import asyncio
+import json
+import logging
+import os
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TOOL_MEMO_SCOPE = os.getenv("TOOL_MEMO_SCOPE", "turn")
+TOOL_MEMO_THREAD_TTL = float(os.getenv("TOOL_MEMO_THREAD_TTL", "300"))
+TOOL_MEMO_MAX_THREADS = int(os.getenv("TOOL_MEMO_MAX_THREADS", "1024"))
+
+Memo = dict[tuple[str, str], asyncio.Future]
+
+_current_memo: ContextVar[Memo | None] = ContextVar("tool_memo", default=None)
+_thread_memos: OrderedDict[str, tuple[float, Memo]] = OrderedDict()
+
+
+def thread_memo(thread_id: str) -> Memo:
+    now = time.monotonic()
+    entry = _thread_memos.get(thread_id)
+    if entry is None or entry[0] < now:
+        entry = (now + TOOL_MEMO_THREAD_TTL, {})
+        _thread_memos[thread_id] = entry
+    _thread_memos.move_to_end(thread_id)
+    while len(_thread_memos) > TOOL_MEMO_MAX_THREADS:
+        _thread_memos.popitem(last=False)
+    return entry[1]
+
+
+@contextmanager
+def tool_memo_scope(thread_id: str, scope: str = TOOL_MEMO_SCOPE) -> Iterator[None]:
+    """
+    Memoize tool calls made inside the block.
+
+    With scope "turn" results are shared by the calls of one agent turn, with
+    "thread" by every turn of the thread for TOOL_MEMO_THREAD_TTL seconds, and
+    "off" disables memoization.
+    """
+    if scope == "off":
+        yield
+        return
+
+    token = _current_memo.set(thread_memo(thread_id) if scope == "thread" else {})
+    try:
+        yield
+    finally:
+        _current_memo.reset(token)
+
+
+def memoize_tool(tool: StructuredTool) -> StructuredTool:
+    """
+    Wrap an MCP tool so identical calls within the current memo scope run once.
+
+    Concurrent identical calls, e.g. emitted in the same agent step, share the
+    same in-flight call. Failed calls are forgotten so they can be retried.
+    """
+    call_tool = tool.coroutine
+
+    async def memoized_call(**arguments: Any) -> Any:
+        memo = _current_memo.get()
+        if memo is None:
+            return await call_tool(**arguments)
+
+        key = (tool.name, json.dumps(arguments, sort_keys=True, default=str))
+        call = memo.get(key)
+        if call is None:
+            call = asyncio.ensure_future(call_tool(**arguments))
+            memo[key] = call
+        else:
+            logger.debug(f"Reusing result of {tool.name} {key[1]}")
+
+        try:
+            return await asyncio.shield(call)
+        except Exception:
+            if memo.get(key) is call:
+                del memo[key]
+            raise
+
+    return tool.model_copy(update={"coroutine": memoized_call})
+
+
+def memoize_tools(tools: list[BaseTool]) -> list[BaseTool]:
+    return [
+        memoize_tool(tool) if isinstance(tool, StructuredTool) and tool.coroutine is not None else tool
+        for tool in tools
+    ]
@@ -1,34 +1,149 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from dto.chat_input import ChatInput
 from dto.chat_output import ChatOutput
+from typing import AsyncIterator
+import json
 import logging
 from ai.graph import create_graph
-from langchain_core.messages import HumanMessage
+from ai.history import SUMMARY_TAG
+from ai.answer_cache import answer_cache
+from ai.mcp_client import mcp_tool_provider
+from utils.turn_coordinator import TurnCoordinator
+from langchain_core.messages import AIMessage, HumanMessage
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 graph = create_graph()
+turn_coordinator = TurnCoordinator()
 
-@router.post("/ask")
-async def ask(chat_input: ChatInput):
-
-    logger.info(f"thread_id: {chat_input.thread_id} - Received question: {chat_input.question}")
 
+def graph_input(chat_input: ChatInput) -> tuple[dict, dict]:
     config = {
         "configurable": {
             "thread_id": chat_input.thread_id
         }
     }
 
-    response = await graph.ainvoke({
+    return {
         "thread_id": chat_input.thread_id,
         "messages": [HumanMessage(content=chat_input.question)]
-    }, config=config)
+    }, config
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def is_cacheable(chat_input: ChatInput, config: dict) -> bool:
+    """Only first turns are cached, since later answers depend on the conversation."""
+    if not answer_cache.enabled:
+        return False
+
+    snapshot = await graph.aget_state(config)
+    if snapshot.values.get("messages"):
+        return False
+
+    try:
+        answer_cache.check_data_version(await mcp_tool_provider.get_data_version())
+    except Exception as e:
+        logger.warning(f"thread_id: {chat_input.thread_id} - Unable to check the data version, skipping the answer cache: {e}")
+        return False
+    return True
+
+
+async def get_cached_answer(chat_input: ChatInput, config: dict) -> str | None:
+    ai_answer = answer_cache.get(chat_input.question)
+    if ai_answer is None:
+        return None
+
+    logger.info(f"thread_id: {chat_input.thread_id} - Answer cache hit")
+    # Record the turn as if the agent had answered, so follow-up questions keep their context
+    await graph.aupdate_state(config, {
+        "thread_id": chat_input.thread_id,
+        "messages": [HumanMessage(content=chat_input.question), AIMessage(content=ai_answer)]
+    }, as_node="attendance_agent")
+    return ai_answer
+
+
+def cache_answer(chat_input: ChatInput, messages: list) -> None:
+    # Error replies are SystemMessages and must not be served again
+    if isinstance(messages[-1], AIMessage):
+        answer_cache.put(chat_input.question, messages[-1].content)
+
+
+async def answer_turn(chat_input: ChatInput) -> str:
+    state, config = graph_input(chat_input)
 
-    ai_answer = response["messages"][-1].content
+    cacheable = await is_cacheable(chat_input, config)
+    if cacheable and (ai_answer := await get_cached_answer(chat_input, config)) is not None:
+        return ai_answer
+
+    response = await graph.ainvoke(state, config=config)
+    if cacheable:
+        cache_answer(chat_input, response["messages"])
+    return response["messages"][-1].content
+
+
+@router.post("/ask")
+async def ask(chat_input: ChatInput):
+
+    logger.info(f"thread_id: {chat_input.thread_id} - Received question: {chat_input.question}")
+
+    ai_answer = await turn_coordinator.run(
+        chat_input.thread_id,
+        chat_input.question,
+        lambda: answer_turn(chat_input)
+    )
 
     logger.info(f"thread_id: {chat_input.thread_id} - AI answer: {ai_answer}")
 
-    return ChatOutput(answer=ai_answer)
\ No newline at end of file
+    return ChatOutput(answer=ai_answer)
+
+
+async def stream_answer(chat_input: ChatInput) -> AsyncIterator[str]:
+    state, config = graph_input(chat_input)
+
+    try:
+        async with turn_coordinator.lock(chat_input.thread_id):
+            cacheable = await is_cacheable(chat_input, config)
+            if cacheable and (ai_answer := await get_cached_answer(chat_input, config)) is not None:
+                yield sse_event("answer", ChatOutput(answer=ai_answer).model_dump())
+                return
+
+            async for event in graph.astream_events(state, config=config, version="v2"):
+                if SUMMARY_TAG in event.get("tags", []):
+                    continue
+
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    if token := event["data"]["chunk"].content:
+                        yield sse_event("token", {"content": token})
+                elif kind == "on_tool_start":
+                    yield sse_event("tool_start", {"tool": event["name"], "input": event["data"].get("input")})
+                elif kind == "on_tool_end":
+                    yield sse_event("tool_end", {"tool": event["name"]})
+
+            snapshot = await graph.aget_state(config)
+            if cacheable:
+                cache_answer(chat_input, snapshot.values["messages"])
+        ai_answer = snapshot.values["messages"][-1].content
+        logger.info(f"thread_id: {chat_input.thread_id} - AI answer: {ai_answer}")
+        yield sse_event("answer", ChatOutput(answer=ai_answer).model_dump())
+    except Exception as e:
+        logger.error(f"thread_id: {chat_input.thread_id} - Streaming error: {e}")
+        yield sse_event("error", {"message": "Sorry, I have an internal problem. Please try again later."})
+
+
+@router.post("/ask/stream")
+async def ask_stream(chat_input: ChatInput):
+
+    logger.info(f"thread_id: {chat_input.thread_id} - Received streaming question: {chat_input.question}")
+
+    return StreamingResponse(
+        stream_answer(chat_input),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,19 +1,55 @@
 from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import uvicorn
 import logging
 from controller import ask_controller
 from config.logging_config import setup_logging
+from ai.mcp_client import mcp_tool_provider
+from ai.attendance_agent import warm_up
+from ai.checkpointer import is_shared, run_compaction, setup_checkpointer
+import argparse
+import os
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await setup_checkpointer(ask_controller.graph.checkpointer)
+    await warm_up()
+    compaction = asyncio.create_task(run_compaction(ask_controller.graph.checkpointer))
+    yield
+    compaction.cancel()
+    with suppress(asyncio.CancelledError):
+        await compaction
+    await mcp_tool_provider.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(ask_controller.router)
 
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Attendance agent client")
+    parser.add_argument("--host", default=os.getenv("CLIENT_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CLIENT_PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CLIENT_WORKERS", "1")))
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        uvicorn.run(app, host="0.0.0.0", port=8080)
+        if args.workers > 1:
+            # Each worker imports its own app, so conversations must live outside the process
+            if not is_shared(ask_controller.graph.checkpointer):
+                raise ValueError("Multiple workers need a shared checkpointer, set CHECKPOINTER to sqlite or redis")
+            uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+        else:
+            uvicorn.run(app, host=args.host, port=args.port)
     except Exception as e:
         logger.error(f"Error starting the server: {e}")
         raise e
\ No newline at end of file
@@ -0,0 +1,50 @@
+import pytest
+from ai.answer_cache import AnswerCache, intents
+
+
+class TestAnswerCache:
+
+    @pytest.fixture
+    def cache(self):
+        return AnswerCache(enabled=True, max_size=10, ttl=60, similarity=0.6)
+
+    def test_exact_match_after_normalization(self):
+        cache = AnswerCache(enabled=True, max_size=10, ttl=60)
+        cache.put("How many orders did John Doe place in March 2025?", "3 orders")
+
+        assert cache.get("how many orders did john doe place in march 2025") == "3 orders"
+        assert cache.get("How many orders did John Doe place in April 2025?") is None
+
+    @pytest.mark.parametrize("cached,question", [
+        ("How much did John Doe spend in March 2025?", "What is the total spend of John Doe in March 2025?"),
+        ("How many orders did John Doe place in March 2025?", "How many orders has John Doe placed in March 2025?"),
+        ("List the 5 most recent customers from Brazil", "Show the 5 latest customers from Brazil")
+    ])
+    def test_paraphrase_reuses_answer(self, cache, cached, question):
+        cache.put(cached, "answer")
+
+        assert cache.get(question) == "answer"
+
+    @pytest.mark.parametrize("cached,question", [
+        ("How many orders did John Doe place in March 2025?", "How much did John Doe spend in March 2025?"),
+        ("How much did John Doe spend in March 2025?", "How many orders did John Doe place in March 2025?"),
+        ("List the 5 most recent customers from Brazil", "List the 5 most recent customers from Brazil with their spend"),
+        ("How much did John Doe spend in March 2025?", "How much did John Doe spend in April 2025?")
+    ])
+    def test_different_question_misses(self, cache, cached, question):
+        cache.put(cached, "answer")
+
+        assert cache.get(question) is None
+
+    def test_intents(self):
+        assert intents("How many orders did John Doe place?") == {"count"}
+        assert intents("What is the total spend of John Doe?") == {"spend"}
+        assert intents("List the customers from Brazil with their spend") == {"list", "spend"}
+
+    def test_cleared_when_data_version_changes(self, cache):
+        cache.check_data_version("v1")
+        cache.put("How much did John Doe spend in March 2025?", "answer")
+
+        cache.check_data_version("v2")
+
+        assert cache.get("How much did John Doe spend in March 2025?") is None
@@ -0,0 +1,98 @@
+import pytest
+import tempfile
+import os
+from unittest.mock import patch
+from langgraph.checkpoint.base import ERROR, empty_checkpoint
+from ai.checkpointer import SqliteCheckpointSaver
+
+
+class TestSqliteCheckpointSaver:
+
+    @pytest.fixture
+    def database_path(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield os.path.join(temp_dir, "checkpoints.sqlite")
+
+    @pytest.fixture
+    def clock(self):
+        now = [1_000_000.0]
+        with patch("ai.checkpointer.time.time", side_effect=lambda: now[0]):
+            yield now
+
+    @staticmethod
+    def thread_config(thread_id: str, checkpoint_id: str | None = None) -> dict:
+        configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+        if checkpoint_id is not None:
+            configurable["checkpoint_id"] = checkpoint_id
+        return {"configurable": configurable}
+
+    def put_checkpoint(self, saver: SqliteCheckpointSaver, thread_id: str, messages: list, parent_id: str | None = None) -> dict:
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": messages}
+        return saver.put(self.thread_config(thread_id, parent_id), checkpoint, {"source": "loop", "step": len(messages)}, {})
+
+    def test_state_round_trips_across_instances(self, database_path):
+        saver = SqliteCheckpointSaver(database_path)
+        first = self.put_checkpoint(saver, "thread-1", ["hello"])
+        second = self.put_checkpoint(saver, "thread-1", ["hello", "hi"], parent_id=first["configurable"]["checkpoint_id"])
+        saver.put_writes(second, [("messages", "pending")], task_id="task-1")
+        saver.close()
+
+        reopened = SqliteCheckpointSaver(database_path)
+        checkpoint_tuple = reopened.get_tuple(self.thread_config("thread-1"))
+
+        assert checkpoint_tuple.config == second
+        assert checkpoint_tuple.checkpoint["channel_values"] == {"messages": ["hello", "hi"]}
+        assert checkpoint_tuple.metadata["step"] == 2
+        assert checkpoint_tuple.parent_config == first
+        assert checkpoint_tuple.pending_writes == [("task-1", "messages", "pending")]
+        assert reopened.get_tuple(first).checkpoint["channel_values"] == {"messages": ["hello"]}
+        assert [item.config for item in reopened.list(self.thread_config("thread-1"))] == [second, first]
+
+    def test_put_writes_replaces_special_channels_and_ignores_repeated_writes(self, database_path):
+        saver = SqliteCheckpointSaver(database_path)
+        config = self.put_checkpoint(saver, "thread-1", ["hello"])
+
+        saver.put_writes(config, [("messages", "first")], task_id="task-1")
+        saver.put_writes(config, [("messages", "retried")], task_id="task-1")
+        saver.put_writes(config, [(ERROR, "first error")], task_id="task-2")
+        saver.put_writes(config, [(ERROR, "second error")], task_id="task-2")
+
+        assert saver.get_tuple(config).pending_writes == [("task-1", "messages", "first"), ("task-2", ERROR, "second error")]
+
+    def test_idle_thread_expires_on_read(self, database_path, clock):
+        saver = SqliteCheckpointSaver(database_path, thread_ttl=60)
+        self.put_checkpoint(saver, "thread-1", ["hello"])
+
+        clock[0] += 30
+        assert saver.get_tuple(self.thread_config("thread-1")) is not None
+
+        clock[0] += 61
+        assert saver.get_tuple(self.thread_config("thread-1")) is None
+        assert list(saver.list(self.thread_config("thread-1"))) == []
+
+    def test_least_recently_used_threads_evicted(self, database_path, clock):
+        saver = SqliteCheckpointSaver(database_path, max_threads=2)
+        for thread_id in ("thread-1", "thread-2", "thread-3"):
+            self.put_checkpoint(saver, thread_id, ["hello"])
+            clock[0] += 1
+        saver.get_tuple(self.thread_config("thread-1"))
+
+        assert saver.compact() == {"expired": 0, "evicted": 1, "superseded": 0}
+        assert saver.get_tuple(self.thread_config("thread-2")) is None
+        assert saver.get_tuple(self.thread_config("thread-1")) is not None
+        assert saver.get_tuple(self.thread_config("thread-3")) is not None
+
+    def test_superseded_checkpoints_pruned(self, database_path):
+        saver = SqliteCheckpointSaver(database_path, keep_per_thread=1)
+        first = self.put_checkpoint(saver, "thread-1", ["hello"])
+        saver.put_writes(first, [("messages", "old")], task_id="task-1")
+        second = self.put_checkpoint(saver, "thread-1", ["hello", "hi"], parent_id=first["configurable"]["checkpoint_id"])
+        saver.put_writes(second, [("messages", "new")], task_id="task-1")
+        self.put_checkpoint(saver, "thread-2", ["other"])
+
+        assert saver.compact() == {"expired": 0, "evicted": 0, "superseded": 1}
+        assert [item.config for item in saver.list(self.thread_config("thread-1"))] == [second]
+        assert saver.get_tuple(second).pending_writes == [("task-1", "messages", "new")]
+        assert saver.get_tuple(self.thread_config("thread-2")) is not None
+        assert saver._connection.execute("SELECT COUNT(*) FROM writes WHERE checkpoint_id = ?", (first["configurable"]["checkpoint_id"],)).fetchone()[0] == 0
@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from unittest.mock import AsyncMock, MagicMock, patch
+from ai import history
+from ai.history import count_message_tokens, get_encoding, manage_history, split_history, truncate_tool_outputs
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    """Count tokens from characters, so the budgets below don't depend on tiktoken's vocabulary."""
+    monkeypatch.setattr(history, "get_encoding", lambda: None)
+
+
+def conversation(turns: int) -> list:
+    """A human question, a tool call, its result and the answer per turn."""
+    messages = []
+    for turn in range(turns):
+        messages.extend([
+            HumanMessage(content=f"question {turn}", id=f"h{turn}"),
+            AIMessage(content="", tool_calls=[{"name": "get_orders", "args": {"turn": turn}, "id": f"call{turn}"}], id=f"c{turn}"),
+            ToolMessage(content=f"result {turn}", tool_call_id=f"call{turn}", name="get_orders", id=f"t{turn}"),
+            AIMessage(content=f"answer {turn}", id=f"a{turn}")
+        ])
+    return messages
+
+
+class TestSplitHistory:
+
+    def test_keeps_everything_within_window_and_budget(self):
+        messages = conversation(2)
+
+        assert split_history(messages, budget=10_000, window=8) == 0
+
+    def test_window_limits_kept_messages(self):
+        messages = conversation(3)
+
+        assert split_history(messages, budget=10_000, window=4) == 8
+        assert split_history(messages, budget=10_000, window=5) == 7
+
+    def test_budget_limits_kept_messages(self):
+        messages = conversation(3)
+        last_turn = sum(count_message_tokens(message) for message in messages[-4:])
+        last_three = sum(count_message_tokens(message) for message in messages[-3:])
+
+        assert split_history(messages, budget=last_turn, window=12) == 8
+        assert split_history(messages, budget=last_turn - 1, window=12) == 9
+        # Only the tool result and the answer fit, and the result can't be kept without its call
+        assert split_history(messages, budget=last_three - 1, window=12) == 11
+
+    def test_always_keeps_most_recent_message(self):
+        messages = [HumanMessage(content="x" * 1000, id="h")]
+
+        assert split_history(messages, budget=1, window=1) == 0
+        assert split_history(conversation(1), budget=1, window=4) == 3
+
+    def test_does_not_start_with_tool_result(self):
+        messages = conversation(2)
+
+        # The window would start at the first turn's tool result, orphaning it from its call
+        assert split_history(messages, budget=10_000, window=6) == 3
+        assert isinstance(messages[2], ToolMessage)
+
+    def test_skips_consecutive_tool_results(self):
+        messages = [
+            HumanMessage(content="question", id="h"),
+            AIMessage(content="", tool_calls=[
+                {"name": "get_orders", "args": {}, "id": "call1"},
+                {"name": "get_customers", "args": {}, "id": "call2"}
+            ], id="c"),
+            ToolMessage(content="orders", tool_call_id="call1", name="get_orders", id="t1"),
+            ToolMessage(content="customers", tool_call_id="call2", name="get_customers", id="t2"),
+            AIMessage(content="answer", id="a")
+        ]
+
+        assert split_history(messages, budget=10_000, window=3) == 4
+        assert split_history(messages, budget=10_000, window=4) == 1
+
+
+class TestManageHistory:
+
+    def test_no_changes_within_budget(self):
+        state = {"thread_id": "1", "messages": conversation(1)}
+
+        with patch.object(history, "summarize", AsyncMock()) as summarize:
+            assert asyncio.run(manage_history(state)) == {}
+        summarize.assert_not_called()
+
+    def test_summarizes_and_removes_old_messages(self):
+        messages = conversation(4)
+        state = {"thread_id": "1", "messages": messages, "summary": "old"}
+
+        with patch.object(history, "HISTORY_WINDOW", 8), patch.object(history, "summarize", AsyncMock(return_value="new")) as summarize:
+            result = asyncio.run(manage_history(state))
+
+        start = 12
+        summarize.assert_awaited_once_with("old", messages[:start])
+        assert result["summary"] == "new"
+        assert all(isinstance(update, RemoveMessage) for update in result["messages"])
+        assert [update.id for update in result["messages"]] == [message.id for message in messages[:start]]
+
+    def test_failed_summary_keeps_messages(self):
+        state = {"thread_id": "1", "messages": conversation(4), "summary": "old"}
+
+        with patch.object(history, "HISTORY_WINDOW", 8), patch.object(history, "summarize", AsyncMock(side_effect=RuntimeError("model down"))):
+            assert asyncio.run(manage_history(state)) == {}
+
+
+class TestTruncateToolOutputs:
+
+    def test_truncates_long_tool_outputs_for_the_model_only(self):
+        long_output = ToolMessage(content="x" * 10_000, tool_call_id="call0", name="get_orders", id="t0")
+        messages = [HumanMessage(content="y" * 10_000, id="h0"), long_output]
+
+        with patch.object(history, "TOOL_OUTPUT_TOKEN_LIMIT", 10):
+            result = truncate_tool_outputs({"messages": messages})
+
+        human, tool = result["llm_input_messages"]
+        assert human is messages[0]
+        assert tool.content == "x" * 40 + " [truncated]"
+        assert tool.id == "t0" and tool.tool_call_id == "call0"
+        assert long_output.content == "x" * 10_000
+
+    def test_keeps_short_tool_outputs(self):
+        messages = conversation(1)
+
+        assert truncate_tool_outputs({"messages": messages})["llm_input_messages"] == messages
+
+
+class TestGetEncoding:
+
+    @pytest.fixture(autouse=True)
+    def fresh_encoding(self, monkeypatch):
+        monkeypatch.setattr(history, "_encoding", None)
+        monkeypatch.setattr(history, "_encoding_failed_at", None)
+        monkeypatch.setattr(history, "tiktoken", MagicMock())
+
+    def test_failed_load_is_retried(self, monkeypatch):
+        encoding = object()
+        history.tiktoken.encoding_for_model.side_effect = [OSError("download failed"), encoding]
+        clock = iter([100.0, 110.0, 100.0 + history.TOKENIZER_RETRY_SECONDS + 1])
+        monkeypatch.setattr(history, "time", MagicMock(monotonic=lambda: next(clock)))
+
+        assert get_encoding() is None
+        assert get_encoding() is None
+        assert get_encoding() is encoding
+        assert history.tiktoken.encoding_for_model.call_count == 2
+
+    def test_loaded_encoding_is_kept(self):
+        encoding = object()
+        history.tiktoken.encoding_for_model.return_value = encoding
+
+        assert get_encoding() is encoding
+        assert get_encoding() is encoding
+        history.tiktoken.encoding_for_model.assert_called_once()
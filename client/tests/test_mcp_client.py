@@ -0,0 +1,152 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from mcp import types
+from ai import mcp_client
+from ai.mcp_client import DATA_VERSION_URI, SERVER_NAME, McpToolProvider
+
+
+class FakeMcpClient:
+    """Stands in for MultiServerMCPClient, counting the sessions it opens."""
+
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.opened = 0
+        self.closed = 0
+        self.handler = None
+        self.session_ = AsyncMock()
+        self.session_.read_resource.return_value = SimpleNamespace(contents=[SimpleNamespace(text="v1")])
+
+    def __call__(self, message_handler=None):
+        self.handler = message_handler
+        return self
+
+    @asynccontextmanager
+    async def session(self, server_name: str):
+        assert server_name == SERVER_NAME
+        self.opened += 1
+        if self.opened <= self.fail:
+            raise ConnectionError("server unavailable")
+        try:
+            yield self.session_
+        finally:
+            self.closed += 1
+
+
+class TestMcpToolProvider:
+
+    @pytest.fixture
+    def client(self):
+        client = FakeMcpClient()
+        with patch.object(mcp_client, "get_mcp_client", client):
+            yield client
+
+    @pytest.fixture
+    def load_tools(self):
+        loads = []
+
+        async def load_mcp_tools(session):
+            loads.append(session)
+            await asyncio.sleep(0)
+            return [f"tool-{len(loads)}"]
+
+        with patch.object(mcp_client, "load_mcp_tools", load_mcp_tools):
+            yield loads
+
+    @pytest.fixture
+    def clock(self):
+        now = [1000.0]
+        with patch.object(mcp_client, "time", SimpleNamespace(monotonic=lambda: now[0])):
+            yield now
+
+    def test_tools_cached_and_session_shared(self, client, load_tools, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            results = await asyncio.gather(*(provider.get_tools() for _ in range(5)))
+            clock[0] += 30
+            results.append(await provider.get_tools())
+            await provider.close()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert all(result == ["tool-1"] for result in results)
+        assert client.opened == 1 and client.closed == 1
+        assert len(load_tools) == 1
+
+    def test_tools_reloaded_after_ttl_on_same_session(self, client, load_tools, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            first = await provider.get_tools()
+            clock[0] += 61
+            second = await provider.get_tools()
+            await provider.close()
+            return first, second
+
+        assert asyncio.run(scenario()) == (["tool-1"], ["tool-2"])
+        assert client.opened == 1
+
+    def test_tool_list_changed_invalidates_tools(self, client, load_tools, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            first = await provider.get_tools()
+            await client.handler(types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed")))
+            second = await provider.get_tools()
+            await provider.close()
+            return first, second
+
+        assert asyncio.run(scenario()) == (["tool-1"], ["tool-2"])
+        assert client.opened == 1
+
+    def test_transport_error_reconnects(self, client, load_tools, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            first = await provider.get_tools()
+            await client.handler(ConnectionError("stream broken"))
+            await provider._session_task
+            second = await provider.get_tools()
+            await provider.close()
+            return first, second
+
+        assert asyncio.run(scenario()) == (["tool-1"], ["tool-2"])
+        assert client.opened == 2 and client.closed == 2
+
+    def test_failed_connection_raises_and_is_retried(self, load_tools, clock):
+        client = FakeMcpClient(fail=1)
+
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            with pytest.raises(ConnectionError):
+                await provider.get_tools()
+            tools = await provider.get_tools()
+            await provider.close()
+            return tools
+
+        with patch.object(mcp_client, "get_mcp_client", client):
+            assert asyncio.run(scenario()) == ["tool-1"]
+        assert client.opened == 2
+
+    def test_reset_closes_session(self, client, load_tools, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            await provider.get_tools()
+            await provider.reset()
+            closed = client.closed
+            tools = await provider.get_tools()
+            await provider.close()
+            return closed, tools
+
+        assert asyncio.run(scenario()) == (1, ["tool-2"])
+        assert client.opened == 2
+
+    def test_get_data_version(self, client, clock):
+        async def scenario():
+            provider = McpToolProvider(ttl=60)
+            version = await provider.get_data_version()
+            await provider.close()
+            return version
+
+        assert asyncio.run(scenario()) == "v1"
+        client.session_.read_resource.assert_awaited_once_with(DATA_VERSION_URI)
@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from collections import OrderedDict
+from langchain_core.tools import StructuredTool
+from ai import tool_memo
+from ai.tool_memo import memoize_tool, memoize_tools, tool_memo_scope
+
+
+class TestMemoizeTool:
+
+    @pytest.fixture(autouse=True)
+    def no_thread_memos(self, monkeypatch):
+        monkeypatch.setattr(tool_memo, "_thread_memos", OrderedDict())
+
+    @staticmethod
+    def counting_tool(calls: list, fail: int = 0, delay: float = 0) -> StructuredTool:
+        async def get_orders(customer_id: int, month: str = "") -> str:
+            """Orders of a customer."""
+            calls.append((customer_id, month))
+            await asyncio.sleep(delay)
+            if len(calls) <= fail:
+                raise ConnectionError("server unavailable")
+            return f"orders of {customer_id} {month} #{len(calls)}"
+        return StructuredTool.from_function(coroutine=get_orders)
+
+    def test_identical_calls_run_once_per_scope(self):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls))
+
+        async def scenario():
+            with tool_memo_scope("1", scope="turn"):
+                first = await tool.ainvoke({"customer_id": 1, "month": "2025-03"})
+                again = await tool.ainvoke({"month": "2025-03", "customer_id": 1})
+                other = await tool.ainvoke({"customer_id": 2, "month": "2025-03"})
+            with tool_memo_scope("1", scope="turn"):
+                next_turn = await tool.ainvoke({"customer_id": 1, "month": "2025-03"})
+            return first, again, other, next_turn
+
+        first, again, other, next_turn = asyncio.run(scenario())
+
+        assert first == again == "orders of 1 2025-03 #1"
+        assert other == "orders of 2 2025-03 #2"
+        assert next_turn == "orders of 1 2025-03 #3"
+        assert len(calls) == 3
+
+    def test_thread_scope_shares_results_across_turns(self):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls))
+
+        async def scenario():
+            results = []
+            for thread_id in ("1", "1", "2"):
+                with tool_memo_scope(thread_id, scope="thread"):
+                    results.append(await tool.ainvoke({"customer_id": 1}))
+            return results
+
+        assert asyncio.run(scenario()) == ["orders of 1  #1", "orders of 1  #1", "orders of 1  #2"]
+
+    @pytest.mark.parametrize("scope", ["off", None])
+    def test_no_memoization_outside_a_scope(self, scope):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls))
+
+        async def scenario():
+            if scope is None:
+                await tool.ainvoke({"customer_id": 1})
+                await tool.ainvoke({"customer_id": 1})
+            else:
+                with tool_memo_scope("1", scope=scope):
+                    await tool.ainvoke({"customer_id": 1})
+                    await tool.ainvoke({"customer_id": 1})
+
+        asyncio.run(scenario())
+
+        assert len(calls) == 2
+
+    def test_concurrent_identical_calls_share_the_call(self):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls, delay=0.01))
+
+        async def scenario():
+            with tool_memo_scope("1", scope="turn"):
+                return await asyncio.gather(*(tool.ainvoke({"customer_id": 1}) for _ in range(3)))
+
+        assert asyncio.run(scenario()) == ["orders of 1  #1"] * 3
+        assert len(calls) == 1
+
+    def test_failed_call_is_forgotten(self):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls, fail=1, delay=0.01))
+
+        async def scenario():
+            with tool_memo_scope("1", scope="turn"):
+                failed = await asyncio.gather(tool.ainvoke({"customer_id": 1}), tool.ainvoke({"customer_id": 1}), return_exceptions=True)
+                retried = await tool.ainvoke({"customer_id": 1})
+            return failed, retried
+
+        failed, retried = asyncio.run(scenario())
+
+        assert all(isinstance(error, ConnectionError) for error in failed)
+        assert retried == "orders of 1  #2"
+        assert len(calls) == 2
+
+    def test_cancelled_caller_does_not_cancel_shared_call(self):
+        calls = []
+        tool = memoize_tool(self.counting_tool(calls, delay=0.02))
+
+        async def scenario():
+            with tool_memo_scope("1", scope="turn"):
+                cancelled = asyncio.create_task(tool.ainvoke({"customer_id": 1}))
+                while not calls:
+                    await asyncio.sleep(0)
+                cancelled.cancel()
+                return await tool.ainvoke({"customer_id": 1})
+
+        assert asyncio.run(scenario()) == "orders of 1  #1"
+        assert len(calls) == 1
+
+    def test_memoize_tools_only_wraps_async_structured_tools(self):
+        def local_tool(value: int) -> int:
+            """A tool without a coroutine."""
+            return value
+
+        sync_tool = StructuredTool.from_function(func=local_tool)
+        async_tool = self.counting_tool([])
+
+        wrapped_sync, wrapped_async = memoize_tools([sync_tool, async_tool])
+
+        assert wrapped_sync is sync_tool
+        assert wrapped_async is not async_tool and wrapped_async.name == async_tool.name
@@ -0,0 +1,165 @@
+import asyncio
+import pytest
+from utils.turn_coordinator import TurnCoordinator, normalize_question
+
+
+class TestTurnCoordinator:
+
+    @staticmethod
+    def recording_turn(events: list, name: str):
+        async def turn():
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+            return name
+        return turn
+
+    def test_same_thread_turns_are_serialized(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=False)
+            events = []
+            results = await asyncio.gather(
+                coordinator.run("1", "first", self.recording_turn(events, "a")),
+                coordinator.run("1", "second", self.recording_turn(events, "b"))
+            )
+            return events, results
+
+        events, results = asyncio.run(scenario())
+
+        assert results == ["a", "b"]
+        assert events == ["a start", "a end", "b start", "b end"]
+
+    def test_different_threads_run_in_parallel(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=False)
+            events = []
+            await asyncio.gather(
+                coordinator.run("1", "question", self.recording_turn(events, "a")),
+                coordinator.run("2", "question", self.recording_turn(events, "b"))
+            )
+            return events
+
+        assert asyncio.run(scenario()) == ["a start", "b start", "a end", "b end"]
+
+    @pytest.mark.parametrize("coalesce", [False, True])
+    def test_locks_are_dropped_after_use(self, coalesce):
+        async def failing_turn():
+            raise ValueError("boom")
+
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=coalesce)
+            events = []
+            await asyncio.gather(
+                coordinator.run("1", "first", self.recording_turn(events, "a")),
+                coordinator.run("1", "second", self.recording_turn(events, "b")),
+                coordinator.run("2", "first", self.recording_turn(events, "c")),
+                coordinator.run("3", "first", failing_turn),
+                return_exceptions=True
+            )
+            return coordinator
+
+        coordinator = asyncio.run(scenario())
+
+        assert coordinator._locks == {}
+        assert coordinator._holders == {}
+        assert coordinator._in_flight == {}
+
+    def test_coalesces_identical_questions(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=True)
+            events = []
+            results = await asyncio.gather(
+                coordinator.run("1", "How many orders?", self.recording_turn(events, "a")),
+                coordinator.run("1", "  how many ORDERS? ", self.recording_turn(events, "b")),
+                coordinator.run("1", "How much was spent?", self.recording_turn(events, "c")),
+                coordinator.run("2", "How many orders?", self.recording_turn(events, "d"))
+            )
+            return coordinator, events, results
+
+        coordinator, events, results = asyncio.run(scenario())
+
+        assert results == ["a", "a", "c", "d"]
+        assert "b start" not in events
+        assert coordinator.coalesced == 1
+
+    def test_without_coalescing_identical_questions_run_twice(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=False)
+            events = []
+            results = await asyncio.gather(
+                coordinator.run("1", "How many orders?", self.recording_turn(events, "a")),
+                coordinator.run("1", "How many orders?", self.recording_turn(events, "b"))
+            )
+            return coordinator, results
+
+        coordinator, results = asyncio.run(scenario())
+
+        assert results == ["a", "b"]
+        assert coordinator.coalesced == 0
+
+    def test_error_reaches_joined_callers(self):
+        async def failing_turn():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=True)
+            return await asyncio.gather(
+                coordinator.run("1", "question", failing_turn),
+                coordinator.run("1", "question", failing_turn),
+                return_exceptions=True
+            )
+
+        first, joined = asyncio.run(scenario())
+
+        assert isinstance(first, ValueError)
+        assert joined is first
+
+    def test_cancellation_reaches_joined_callers(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=True)
+            started = asyncio.Event()
+
+            async def slow_turn():
+                started.set()
+                await asyncio.sleep(10)
+
+            owner = asyncio.create_task(coordinator.run("1", "question", slow_turn))
+            await started.wait()
+            joined = asyncio.create_task(coordinator.run("1", "question", slow_turn))
+            await asyncio.sleep(0)
+            owner.cancel()
+            outcomes = await asyncio.gather(owner, joined, return_exceptions=True)
+            return coordinator, outcomes
+
+        coordinator, (owner, joined) = asyncio.run(scenario())
+
+        assert isinstance(owner, asyncio.CancelledError)
+        assert isinstance(joined, asyncio.CancelledError)
+        assert coordinator.coalesced == 1
+        assert coordinator._locks == {} and coordinator._in_flight == {}
+
+    def test_cancelled_joiner_does_not_cancel_the_turn(self):
+        async def scenario():
+            coordinator = TurnCoordinator(coalesce=True)
+            started = asyncio.Event()
+
+            async def slow_turn():
+                started.set()
+                await asyncio.sleep(0.05)
+                return "answer"
+
+            owner = asyncio.create_task(coordinator.run("1", "question", slow_turn))
+            await started.wait()
+            joined = asyncio.create_task(coordinator.run("1", "question", slow_turn))
+            await asyncio.sleep(0)
+            joined.cancel()
+            return await asyncio.gather(owner, joined, return_exceptions=True)
+
+        owner, joined = asyncio.run(scenario())
+
+        assert owner == "answer"
+        assert isinstance(joined, asyncio.CancelledError)
+
+    def test_normalize_question(self):
+        assert normalize_question("  How many\n ORDERS? ") == "how many orders?"
@@ -1,10 +1,18 @@
 from langchain_core.messages import AnyMessage
-from httpx import ConnectError
+from httpx import ConnectError, HTTPError
+from mcp.shared.exceptions import McpError
 from langchain_core.messages import SystemMessage
 from logging import Logger
 from langchain_core.tools import ToolException
 
 
+def is_connection_error(e: BaseException) -> bool:
+    """Whether the error comes from the MCP transport, directly or inside the ExceptionGroup raised by its task group."""
+    if isinstance(e, BaseExceptionGroup):
+        return any(is_connection_error(exc) for exc in e.exceptions)
+    return isinstance(e, (HTTPError, McpError))
+
+
 def handle_agent_exception(e: Exception, logger: Logger, thread_id: str) -> AnyMessage:    
     if hasattr(e, 'exceptions'):
         for exc in e.exceptions:
@@ -0,0 +1,81 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+from dotenv import load_dotenv
+import asyncio
+import logging
+import os
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COALESCE_QUESTIONS = os.getenv("COALESCE_QUESTIONS", "false").lower() == "true"
+
+T = TypeVar("T")
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.split()).casefold()
+
+
+class TurnCoordinator:
+    """
+    Serializes the turns of each thread_id while different threads run in parallel.
+
+    Turns of the same thread wait on a per-thread lock, so two requests never
+    run the graph against the same checkpoint at once. Locks are dropped as soon
+    as no request holds or waits for them. With `coalesce`, a question that is
+    already in flight for the same thread joins that execution and gets its
+    answer instead of running a second turn. Locks are per process, so with
+    several workers a thread's concurrent requests are only serialized within
+    each worker.
+    """
+
+    def __init__(self, coalesce: bool = COALESCE_QUESTIONS):
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._holders: dict[str, int] = {}
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+    @asynccontextmanager
+    async def lock(self, thread_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._holders[thread_id] = self._holders.get(thread_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[thread_id] -= 1
+            if self._holders[thread_id] == 0:
+                del self._holders[thread_id]
+                del self._locks[thread_id]
+
+    async def run(self, thread_id: str, question: str, turn: Callable[[], Awaitable[T]]) -> T:
+        if not self.coalesce:
+            async with self.lock(thread_id):
+                return await turn()
+
+        key = (thread_id, normalize_question(question))
+        if (in_flight := self._in_flight.get(key)) is not None:
+            logger.info(f"thread_id: {thread_id} - Joining identical question already in flight")
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        # Retrieve the outcome even when nobody joined, so failures are not reported as unhandled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        try:
+            async with self.lock(thread_id):
+                result = await turn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._in_flight[key]
@@ -3,6 +3,7 @@ from config.logging_config import setup_logging
 
 import tools.customer_tools
 import tools.order_tools
+import tools.data_resources
 
 if __name__ == "__main__":
     setup_logging()
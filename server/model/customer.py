@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict
+from model.record import from_epoch_seconds, to_epoch_seconds
 from datetime import datetime
+from typing import Optional
+import sys
 
 
 class Customer(BaseModel):
@@ -9,3 +12,52 @@ class Customer(BaseModel):
     name: str
     country: str
     joined_at: datetime = Field(alias="joinedAt")
+
+
+class CustomerRecord:
+    """
+    Compact customer kept by the in-memory stores.
+
+    Customers are validated as Customer at ingestion and then stored with the
+    join date as whole epoch seconds, its microsecond and its UTC offset (None
+    when naive). Names and countries are interned. `joined_at` rebuilds the
+    datetime on access and `joined_at_iso` renders it once for responses.
+    """
+
+    __slots__ = ("id", "name", "country", "joined_at_timestamp", "joined_at_microsecond", "utc_offset", "_joined_at_iso")
+
+    def __init__(self, id: int, name: str, country: str, joined_at_timestamp: int, joined_at_microsecond: int, utc_offset: Optional[int]):
+        self.id = id
+        self.name = name
+        self.country = country
+        self.joined_at_timestamp = joined_at_timestamp
+        self.joined_at_microsecond = joined_at_microsecond
+        self.utc_offset = utc_offset
+        self._joined_at_iso: Optional[str] = None
+
+    @classmethod
+    def from_customer(cls, customer: "Customer | CustomerRecord") -> "CustomerRecord":
+        if isinstance(customer, CustomerRecord):
+            return customer
+        return cls(
+            customer.id,
+            sys.intern(customer.name),
+            sys.intern(customer.country),
+            *to_epoch_seconds(customer.joined_at)
+        )
+
+    @property
+    def joined_at(self) -> datetime:
+        return from_epoch_seconds(self.joined_at_timestamp, self.joined_at_microsecond, self.utc_offset)
+
+    @property
+    def joined_at_iso(self) -> str:
+        if self._joined_at_iso is None:
+            self._joined_at_iso = self.joined_at.isoformat()
+        return self._joined_at_iso
+
+    def to_model(self) -> Customer:
+        return Customer.model_construct(id=self.id, name=self.name, country=self.country, joined_at=self.joined_at)
+
+    def __repr__(self) -> str:
+        return f"CustomerRecord(id={self.id}, name={self.name!r}, country={self.country!r}, joined_at={self.joined_at.isoformat()})"
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field, ConfigDict
+from model.record import from_epoch_seconds, from_fixed_point, local_time, to_epoch_seconds, to_fixed_point
 from datetime import datetime
 from decimal import Decimal
+from typing import Optional
+import sys
 
 
 class Order(BaseModel):
@@ -10,4 +13,82 @@ class Order(BaseModel):
     customer_id: int = Field(alias="customerId")
     customer_name: str = Field(alias="customerName")
     date: datetime
-    amount: Decimal
\ No newline at end of file
+    amount: Decimal
+
+
+class OrderRecord:
+    """
+    Compact order kept by the in-memory stores.
+
+    Orders are validated as Order at ingestion and then stored as plain ints:
+    the date as whole epoch seconds, its microsecond and its UTC offset (None
+    when naive), and the amount as `amount_units` scaled by `amount_scale`
+    decimal places. Customer names are interned, so repeated names share one
+    string. `date` and `amount` rebuild the original values on access.
+    """
+
+    __slots__ = ("id", "customer_id", "customer_name", "timestamp", "microsecond", "utc_offset", "amount_units", "amount_scale")
+
+    def __init__(
+        self,
+        id: int,
+        customer_id: int,
+        customer_name: str,
+        timestamp: int,
+        microsecond: int,
+        utc_offset: Optional[int],
+        amount_units: int,
+        amount_scale: int
+    ):
+        self.id = id
+        self.customer_id = customer_id
+        self.customer_name = customer_name
+        self.timestamp = timestamp
+        self.microsecond = microsecond
+        self.utc_offset = utc_offset
+        self.amount_units = amount_units
+        self.amount_scale = amount_scale
+
+    @classmethod
+    def from_order(cls, order: "Order | OrderRecord") -> "OrderRecord":
+        if isinstance(order, OrderRecord):
+            return order
+        return cls(
+            order.id,
+            order.customer_id,
+            sys.intern(order.customer_name),
+            *to_epoch_seconds(order.date),
+            *to_fixed_point(order.amount)
+        )
+
+    @property
+    def date(self) -> datetime:
+        return from_epoch_seconds(self.timestamp, self.microsecond, self.utc_offset)
+
+    @property
+    def amount(self) -> Decimal:
+        return from_fixed_point(self.amount_units, self.amount_scale)
+
+    @property
+    def iso_month(self) -> str:
+        """Calendar month of the order in its own timezone."""
+        local = local_time(self.timestamp, self.utc_offset)
+        return f"{local.tm_year:04d}-{local.tm_mon:02d}"
+
+    @property
+    def iso_day(self) -> str:
+        """Calendar day of the order in its own timezone."""
+        local = local_time(self.timestamp, self.utc_offset)
+        return f"{local.tm_year:04d}-{local.tm_mon:02d}-{local.tm_mday:02d}"
+
+    def to_model(self) -> Order:
+        return Order.model_construct(
+            id=self.id,
+            customer_id=self.customer_id,
+            customer_name=self.customer_name,
+            date=self.date,
+            amount=self.amount
+        )
+
+    def __repr__(self) -> str:
+        return f"OrderRecord(id={self.id}, customer_id={self.customer_id}, customer_name={self.customer_name!r}, date={self.date.isoformat()}, amount={self.amount})"
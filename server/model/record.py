@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Tuple
+import time
+
+UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=None)
+def fixed_timezone(utc_offset: int) -> timezone:
+    return timezone.utc if utc_offset == 0 else timezone(timedelta(seconds=utc_offset))
+
+
+def to_epoch_seconds(value: datetime) -> Tuple[int, int, Optional[int]]:
+    """
+    Split a datetime into whole epoch seconds, its microsecond and its UTC
+    offset in seconds, None when naive. Naive values are taken as UTC.
+    """
+    offset = value.utcoffset()
+    if offset is None:
+        return (value - NAIVE_EPOCH) // timedelta(seconds=1), value.microsecond, None
+    return (value - UTC_EPOCH) // timedelta(seconds=1), value.microsecond, int(offset.total_seconds())
+
+
+def from_epoch_seconds(timestamp: int, microsecond: int, utc_offset: Optional[int]) -> datetime:
+    if utc_offset is None:
+        return NAIVE_EPOCH + timedelta(seconds=timestamp, microseconds=microsecond)
+    return datetime.fromtimestamp(timestamp, fixed_timezone(utc_offset)).replace(microsecond=microsecond)
+
+
+def local_time(timestamp: int, utc_offset: Optional[int]) -> time.struct_time:
+    """Calendar fields of the timestamp in its own timezone, without building a datetime."""
+    return time.gmtime(timestamp + (utc_offset or 0))
+
+
+def to_fixed_point(amount: Decimal) -> Tuple[int, int]:
+    """Split an amount into an integer number of units and the decimal places they are scaled by."""
+    scale = max(0, -amount.as_tuple().exponent)
+    return int(amount.scaleb(scale)), scale
+
+
+def from_fixed_point(units: int, scale: int) -> Decimal:
+    return Decimal(units).scaleb(-scale)
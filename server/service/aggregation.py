@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+import math
+
+AGGREGATE_METRICS = ("count", "sum", "avg", "min", "max")
+AGGREGATE_GROUPS = ("customer", "day", "month", "country")
+UNKNOWN_COUNTRY = "Unknown"
+
+# count, sum, min and max of the amounts in a group
+GroupTotals = Tuple[int, Decimal, Decimal, Decimal]
+
+
+def utc_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def epoch_bound(value: datetime) -> int:
+    """
+    First whole epoch second at or after value. Ranges compare on the orders'
+    whole seconds, ignoring their microseconds, which is exact for the
+    midnight bounds aggregate_orders is called with.
+    """
+    return math.ceil(utc_timestamp(value))
+
+
+def validate_aggregation(metric: str, group_by: Optional[str], country_by_customer_id: Optional[Dict[int, str]]) -> None:
+    if metric not in AGGREGATE_METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if group_by is not None and group_by not in AGGREGATE_GROUPS:
+        raise ValueError(f"Unknown group: {group_by}")
+    if group_by == "country" and country_by_customer_id is None:
+        raise ValueError("Grouping by country requires the customers' countries")
+
+
+def merge_group_totals(groups: Dict[Any, GroupTotals], key: Any, totals: GroupTotals) -> None:
+    current = groups.get(key)
+    if current is None:
+        groups[key] = totals
+    else:
+        groups[key] = (current[0] + totals[0], current[1] + totals[1], min(current[2], totals[2]), max(current[3], totals[3]))
+
+
+def aggregate_results(
+    groups: Dict[Any, GroupTotals],
+    metric: str,
+    group_by: Optional[str],
+    customer_names: Optional[Dict[int, str]] = None
+) -> List[Dict[str, Any]]:
+    """Format group totals as aggregate_orders results, sorted by group key."""
+    if group_by is None and not groups:
+        return [{"count": 0, "value": 0 if metric in ("count", "sum") else None}]
+
+    results = []
+    for key in sorted(groups):
+        count, total, minimum, maximum = groups[key]
+        value = {
+            "count": count,
+            "sum": float(total),
+            "avg": float(total / count),
+            "min": float(minimum),
+            "max": float(maximum)
+        }[metric]
+        result = {"count": count, "value": value}
+        if group_by == "customer":
+            result = {"customerId": key, "customerName": customer_names[key], **result}
+        elif group_by is not None:
+            result = {group_by: key, **result}
+        results.append(result)
+    return results
@@ -0,0 +1,259 @@
+from model.order import OrderRecord
+from model.record import local_time
+from service.aggregation import GroupTotals, UNKNOWN_COUNTRY, aggregate_results, epoch_bound
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, List, Dict, Optional
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ISO_MONTH_PATTERN = re.compile(r"^(\d{4})-(\d{2})$")
+INT64_MAX = 2 ** 63 - 1
+SECONDS_PER_DAY = 86_400
+EPOCH_DATE = date(1970, 1, 1)
+# utc_offsets value of orders with naive dates, which are taken as UTC
+NAIVE_UTC_OFFSET = -2 ** 31
+
+
+def month_key(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def parse_iso_month(iso_month: str) -> Optional[int]:
+    match = ISO_MONTH_PATTERN.match(iso_month)
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return month_key(year, month)
+
+
+class ColumnarOrderStore:
+    """
+    Array-backed order store for vectorized aggregations.
+
+    Orders are kept as parallel NumPy columns: customer id, epoch seconds,
+    calendar month key (year * 12 + month - 1, in the order's own timezone),
+    dictionary-encoded customer name, UTC offset in seconds and the amount as
+    a fixed-point integer with `scale` decimal places. The scale is the
+    largest number of decimal places found in the data, so sums are exact and
+    match the Decimal sums computed by OrderService.
+
+    `date_order` holds the positions of the orders sorted by timestamp, so
+    date ranges are found by binary search. It is computed on first use when
+    not given, e.g. read from a snapshot.
+    """
+
+    def __init__(
+        self,
+        customer_ids,
+        timestamps,
+        utc_offsets,
+        months,
+        name_codes,
+        amounts,
+        scale: int,
+        customer_names: List[str],
+        date_order=None
+    ):
+        self.customer_ids = customer_ids
+        self.timestamps = timestamps
+        self.months = months
+        self.name_codes = name_codes
+        self.amounts = amounts
+        self.scale = scale
+        self.customer_names = customer_names
+        self.utc_offsets = utc_offsets
+        self._date_order = date_order
+        self.name_codes_by_name = {name: code for code, name in enumerate(customer_names)}
+
+    @classmethod
+    def from_orders(cls, orders: List[OrderRecord]) -> "ColumnarOrderStore":
+        if np is None:
+            raise ImportError("The columnar order store requires numpy, install it with the 'columnar' extra")
+
+        scale = max((order.amount_scale for order in orders), default=0)
+
+        customer_ids = []
+        timestamps = []
+        utc_offsets = []
+        months = []
+        name_codes = []
+        amounts = []
+        name_codes_by_name = {}
+        absolute_total = 0
+
+        for order in orders:
+            amount = order.amount_units * 10 ** (scale - order.amount_scale)
+            absolute_total += abs(amount)
+
+            customer_ids.append(order.customer_id)
+            local = local_time(order.timestamp, order.utc_offset)
+            timestamps.append(order.timestamp)
+            utc_offsets.append(NAIVE_UTC_OFFSET if order.utc_offset is None else order.utc_offset)
+            months.append(month_key(local.tm_year, local.tm_mon))
+            name_codes.append(name_codes_by_name.setdefault(order.customer_name, len(name_codes_by_name)))
+            amounts.append(amount)
+
+        if absolute_total > INT64_MAX:
+            raise ValueError(f"Order amounts with scale {scale} exceed the int64 fixed-point range")
+
+        return cls(
+            customer_ids=np.array(customer_ids, dtype=np.int64),
+            timestamps=np.array(timestamps, dtype=np.int64),
+            utc_offsets=np.array(utc_offsets, dtype=np.int32),
+            months=np.array(months, dtype=np.int32),
+            name_codes=np.array(name_codes, dtype=np.int32),
+            amounts=np.array(amounts, dtype=np.int64),
+            scale=scale,
+            customer_names=list(name_codes_by_name)
+        )
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    @property
+    def date_order(self):
+        if self._date_order is None:
+            self._date_order = np.argsort(self.timestamps, kind="stable")
+        return self._date_order
+
+    def to_decimal(self, fixed_point: int) -> Decimal:
+        return Decimal(int(fixed_point)).scaleb(-self.scale)
+
+    def sum_amounts_by_customer(self, customer_ids: List[int]) -> Dict[int, int]:
+        requested = np.unique(np.asarray(customer_ids, dtype=np.int64))
+        mask = np.isin(self.customer_ids, requested)
+
+        ids = self.customer_ids[mask]
+        if ids.size == 0:
+            return {}
+
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1])))
+        sums = np.add.reduceat(self.amounts[mask][order], starts)
+
+        return dict(zip(sorted_ids[starts].tolist(), sums.tolist()))
+
+    def calculate_aggregate_spending_for_customers(self, customer_ids: List[int]) -> List[Dict[str, any]]:
+        if not customer_ids:
+            return []
+
+        spending_by_customer = self.sum_amounts_by_customer(customer_ids)
+
+        return [
+            {
+                "customerId": customer_id,
+                "spend": float(self.to_decimal(spending_by_customer.get(customer_id, 0)))
+            }
+            for customer_id in customer_ids
+        ]
+
+    def get_customer_spend_by_month(self, customer_id: int, iso_month: str) -> float:
+        key = parse_iso_month(iso_month)
+        if key is None:
+            return 0.0
+
+        mask = (self.customer_ids == customer_id) & (self.months == key)
+        return float(self.to_decimal(self.amounts[mask].sum()))
+
+    def positions_by_customer_name(self, customer_name: str) -> List[int]:
+        code = self.name_codes_by_name.get(customer_name)
+        if code is None:
+            return []
+        return np.flatnonzero(self.name_codes == code).tolist()
+
+    def count_orders_by_month(self, customer_name: Optional[str] = None) -> Dict[str, int]:
+        months = self.months
+        if customer_name is not None:
+            code = self.name_codes_by_name.get(customer_name)
+            if code is None:
+                return {}
+            months = months[self.name_codes == code]
+
+        keys, counts = np.unique(months, return_counts=True)
+
+        return {
+            f"{key // 12:04d}-{key % 12 + 1:02d}": count
+            for key, count in zip(keys.tolist(), counts.tolist())
+        }
+
+    def get_order_count_by_customer_and_month(self, customer_name: str, iso_month: str) -> int:
+        code = self.name_codes_by_name.get(customer_name)
+        key = parse_iso_month(iso_month)
+        if code is None or key is None:
+            return 0
+
+        return int(np.count_nonzero((self.name_codes == code) & (self.months == key)))
+
+    def positions_between(self, start: datetime, end: datetime):
+        """Positions of the orders placed in [start, end), in date order."""
+        first, last = np.searchsorted(
+            self.timestamps,
+            np.array([epoch_bound(start), epoch_bound(end)], dtype=self.timestamps.dtype),
+            sorter=self.date_order
+        )
+        return self.date_order[first:last]
+
+    def aggregate_orders(
+        self,
+        start: datetime,
+        end: datetime,
+        metric: str = "count",
+        group_by: Optional[str] = None,
+        country_by_customer_id: Optional[Dict[int, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """See OrderService.aggregate_orders, which validates the arguments."""
+        positions = self.positions_between(start, end)
+        if positions.size == 0:
+            return aggregate_results({}, metric, group_by)
+
+        codes, labels = self._aggregate_group_codes(positions, group_by, country_by_customer_id)
+        # Stable, so the first order of each group is its earliest
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+        amounts = self.amounts[positions][order]
+        counts = np.diff(np.append(starts, amounts.size))
+        sums = np.add.reduceat(amounts, starts)
+        minimums = np.minimum.reduceat(amounts, starts)
+        maximums = np.maximum.reduceat(amounts, starts)
+
+        groups: Dict[Any, GroupTotals] = {}
+        for code, count, total, minimum, maximum in zip(
+            sorted_codes[starts].tolist(), counts.tolist(), sums.tolist(), minimums.tolist(), maximums.tolist()
+        ):
+            groups[labels(code)] = (count, self.to_decimal(total), self.to_decimal(minimum), self.to_decimal(maximum))
+
+        customer_names = None
+        if group_by == "customer":
+            first_positions = positions[order][starts]
+            customer_names = {
+                int(customer_id): self.customer_names[int(code)]
+                for customer_id, code in zip(self.customer_ids[first_positions], self.name_codes[first_positions])
+            }
+        return aggregate_results(groups, metric, group_by, customer_names)
+
+    def _aggregate_group_codes(self, positions, group_by: Optional[str], country_by_customer_id: Optional[Dict[int, str]]):
+        """Integer group code of each selected order, and a function mapping a code to its group key."""
+        if group_by == "customer":
+            return self.customer_ids[positions], lambda code: code
+        if group_by == "month":
+            return self.months[positions], lambda code: f"{code // 12:04d}-{code % 12 + 1:02d}"
+        if group_by == "day":
+            offsets = self.utc_offsets[positions].astype(np.int64)
+            local_timestamps = self.timestamps[positions] + np.where(offsets == NAIVE_UTC_OFFSET, 0, offsets)
+            return local_timestamps // SECONDS_PER_DAY, lambda code: (EPOCH_DATE + timedelta(days=code)).isoformat()
+        if group_by == "country":
+            customer_ids, inverse = np.unique(self.customer_ids[positions], return_inverse=True)
+            countries = [country_by_customer_id.get(customer_id, UNKNOWN_COUNTRY) for customer_id in customer_ids.tolist()]
+            names, country_codes = np.unique(np.array(countries, dtype=object), return_inverse=True)
+            names = names.tolist()
+            return country_codes[inverse], lambda code: names[code]
+        return np.zeros(positions.size, dtype=np.int8), lambda code: None
@@ -1,28 +1,199 @@
-from model.customer import Customer
-import json
+from model.customer import Customer, CustomerRecord
+from service.json_stream import iter_json_batches, iter_json_records
+from service.snapshot import SnapshotCustomerRepository, is_snapshot_path, read_customers_snapshot
+from service.sqlite_repository import SqliteCustomerRepository, SqliteDatabase, is_sqlite_path
+from service.text_keys import normalize_key, trigrams
+from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 10_000
+
+
+def joined_at_key(customer: CustomerRecord) -> Tuple[int, int]:
+    return customer.joined_at_timestamp, customer.joined_at_microsecond
 
 
 class CustomerService:
-    def __init__(self, file_path: str = "data/customers.json"):
-        self.customers = self.load_customers(file_path)
+    def __init__(self, file_path: str = "data/customers.json", background: bool = False):
+        self.customers: List[CustomerRecord] = []
+        self.customers_by_country: Dict[str, List[CustomerRecord]] = {}
+        self.customers_by_normalized_country: Dict[str, List[CustomerRecord]] = {}
+        self.unsorted_country_keys: Set[Tuple[bool, str]] = set()
+        self.customer_id_by_name: Dict[str, int] = {}
+        self.customer_id_by_normalized_name: Dict[str, int] = {}
+        self.name_trigrams: List[Set[str]] = []
+        self.customer_positions_by_trigram: Dict[str, List[int]] = {}
+        self.repository: Optional[SqliteCustomerRepository | SnapshotCustomerRepository] = None
+        self.country_by_customer_id: Optional[Dict[int, str]] = None
+        # Guards the country indexes, which the loader thread writes while tools read them
+        self.index_lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.load_error: Optional[Exception] = None
+
+        if is_snapshot_path(file_path):
+            self.load_snapshot(file_path)
+        elif is_sqlite_path(file_path):
+            self.load_sqlite(file_path)
+        elif background:
+            threading.Thread(target=self.load_in_background, args=(file_path,), name="load-customers", daemon=True).start()
+        else:
+            self.customers = self.load_customers(file_path)
+            self.index_customers(self.customers)
+            self.finish_loading()
 
-    def load_customers(self, file_path: str) -> list[Customer]:
+    def load_customers(self, file_path: str) -> list[CustomerRecord]:
         with open(file_path, "r") as file:
-            return [Customer(**customer) for customer in json.load(file)]
-    
-    def list_recent_customers_by_country(self, country: str, limit: int = 10) -> list[Customer]:
-        customers_from_country = [
-            customer for customer in self.customers 
-            if customer.country == country
-        ]
-        
-        sorted_customers = sorted(
-            customers_from_country,
-            key=lambda customer: customer.joined_at,
-            reverse=True
-        )
-        
-        return sorted_customers[:limit]
-    
+            return [CustomerRecord.from_customer(Customer(**customer)) for customer in iter_json_records(file)]
+
+    def load_snapshot(self, file_path: str) -> None:
+        # Customers stay in the memory-mapped columns and lookups use the indexes stored with them
+        self.repository = read_customers_snapshot(file_path)
+        self.customers = self.repository.customers
+        self.loaded.set()
+
+    def load_sqlite(self, file_path: str) -> None:
+        # Customers stay in the database and lookups are pushed down into SQL
+        self.repository = SqliteCustomerRepository(SqliteDatabase(file_path))
+        self.customers = self.repository.customers
+        self.loaded.set()
+
+    def load_customers_incrementally(self, file_path: str, batch_size: int = LOAD_BATCH_SIZE) -> None:
+        with open(file_path, "r") as file:
+            for batch in iter_json_batches(file, batch_size):
+                self.add_customers([Customer(**customer) for customer in batch])
+                logger.info(f"Loaded {len(self.customers)} customers from {file_path}")
+        self.finish_loading()
+
+    def load_in_background(self, file_path: str) -> None:
+        try:
+            self.load_customers_incrementally(file_path)
+        except Exception as e:
+            logger.exception(f"Failed to load customers from {file_path}")
+            self.load_error = e
+            self.loaded.set()
+
+    def finish_loading(self) -> None:
+        self.sort_country_indexes()
+        self.loaded.set()
+
+    def index_customers(self, customers: List[CustomerRecord]) -> None:
+        with self.index_lock:
+            for customer in customers:
+                self.customer_id_by_name.setdefault(customer.name, customer.id)
+                self.customer_id_by_normalized_name.setdefault(normalize_key(customer.name), customer.id)
+
+                # Trigram sets are appended before their positions are published to readers
+                position = len(self.name_trigrams)
+                name_trigrams = trigrams(customer.name)
+                self.name_trigrams.append(name_trigrams)
+                for trigram in name_trigrams:
+                    self.customer_positions_by_trigram.setdefault(trigram, []).append(position)
+
+                normalized_country = normalize_key(customer.country)
+
+                self.customers_by_country.setdefault(customer.country, []).append(customer)
+                self.customers_by_normalized_country.setdefault(normalized_country, []).append(customer)
+
+                self.unsorted_country_keys.add((True, customer.country))
+                self.unsorted_country_keys.add((False, normalized_country))
+
+    def sort_country_indexes(self) -> None:
+        with self.index_lock:
+            for case_sensitive, country in self.unsorted_country_keys:
+                index = self.customers_by_country if case_sensitive else self.customers_by_normalized_country
+                index[country].sort(key=joined_at_key, reverse=True)
+            self.unsorted_country_keys.clear()
+
+    def materialize(self) -> None:
+        self.customers = list(self.customers)
+        self.repository = None
+        self.index_customers(self.customers)
+        self.sort_country_indexes()
+
+    def add_customers(self, customers: List[Customer | CustomerRecord]) -> None:
+        customers = [CustomerRecord.from_customer(customer) for customer in customers]
+        self.country_by_customer_id = None
+        if isinstance(self.repository, SqliteCustomerRepository):
+            self.repository.add_customers(customers)
+            return
+
+        if self.repository is not None:
+            self.materialize()
+
+        self.customers.extend(customers)
+        self.index_customers(customers)
+        if self.loaded.is_set():
+            self.sort_country_indexes()
+        self.country_by_customer_id = None
+
+    def list_recent_customers_by_country(self, country: str, limit: int = 10, case_sensitive: bool = True) -> list[CustomerRecord]:
+        if self.repository is not None:
+            return self.repository.list_recent_customers_by_country(country, limit, case_sensitive)
+
+        key = (case_sensitive, country if case_sensitive else normalize_key(country))
+        index = self.customers_by_country if case_sensitive else self.customers_by_normalized_country
+
+        with self.index_lock:
+            customers_from_country = index.get(key[1])
+            if not customers_from_country:
+                return []
+            if key not in self.unsorted_country_keys:
+                return customers_from_country[:limit]
+            customers_from_country = list(customers_from_country)
+
+        # Countries still being loaded are ranked on a copy, only writers sort the shared index
+        if 0 <= limit < len(customers_from_country):
+            return heapq.nlargest(limit, customers_from_country, key=joined_at_key)
+
+        customers_from_country.sort(key=joined_at_key, reverse=True)
+        return customers_from_country[:limit]
+
     def get_customer_id_by_name(self, customer_name: str) -> int:
-        return next((customer.id for customer in self.customers if customer.name == customer_name), None)
\ No newline at end of file
+        if self.repository is not None:
+            return self.repository.get_customer_id_by_name(customer_name)
+
+        customer_id = self.customer_id_by_name.get(customer_name)
+        if customer_id is None:
+            customer_id = self.customer_id_by_normalized_name.get(normalize_key(customer_name))
+        return customer_id
+
+    def get_country_by_customer_id(self) -> Dict[int, str]:
+        if self.country_by_customer_id is not None:
+            return self.country_by_customer_id
+
+        if isinstance(self.repository, SnapshotCustomerRepository):
+            country_by_customer_id = self.repository.country_by_customer_id()
+        else:
+            country_by_customer_id = {customer.id: customer.country for customer in self.customers}
+        # A mapping built while loading misses the customers still to come
+        if self.loaded.is_set():
+            self.country_by_customer_id = country_by_customer_id
+        return country_by_customer_id
+
+    def get_customer_ids_by_names(self, customer_names: List[str]) -> Dict[str, Optional[int]]:
+        return {customer_name: self.get_customer_id_by_name(customer_name) for customer_name in customer_names}
+
+    def find_customers_by_name(self, customer_name: str, limit: int = 5, min_similarity: float = 0.3) -> list[Tuple[CustomerRecord, float]]:
+        if self.repository is not None:
+            return self.repository.find_customers_by_name(customer_name, limit, min_similarity)
+
+        query_trigrams = trigrams(customer_name)
+
+        shared_trigrams: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            for position in self.customer_positions_by_trigram.get(trigram, ()):
+                shared_trigrams[position] = shared_trigrams.get(position, 0) + 1
+
+        candidates = []
+        for position, shared in shared_trigrams.items():
+            similarity = shared / (len(query_trigrams) + len(self.name_trigrams[position]) - shared)
+            if similarity >= min_similarity:
+                candidates.append((similarity, position))
+
+        best = heapq.nsmallest(limit, candidates, key=lambda candidate: (-candidate[0], candidate[1]))
+
+        return [(self.customers[position], round(similarity, 3)) for similarity, position in best]
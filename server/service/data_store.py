@@ -0,0 +1,205 @@
+from service.customer_service import CustomerService
+from service.order_service import OrderService
+from service.metrics import LOAD_BUCKETS, metrics
+from functools import partial
+from typing import Callable, Generic, Optional, TypeVar
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ORDERS_FILE_PATH = os.getenv("ORDERS_FILE_PATH", "data/orders.json")
+CUSTOMERS_FILE_PATH = os.getenv("CUSTOMERS_FILE_PATH", "data/customers.json")
+DATA_RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "1.0"))
+ORDER_BACKEND = os.getenv("ORDER_BACKEND", "memory")
+DATA_BACKGROUND_LOAD = os.getenv("DATA_BACKGROUND_LOAD", "false").lower() == "true"
+
+metrics.histogram("data_store_load_seconds", "Time spent loading a data file, including background loads", buckets=LOAD_BUCKETS)
+metrics.counter("data_store_load_errors_total", "Data file loads that failed")
+metrics.gauge("data_store_version", "Times the data file has been loaded by this process")
+
+
+class DataStore(Generic[T]):
+    """
+    Process-wide holder of a value loaded from a data file.
+
+    The value is loaded lazily on first access and reloaded only when the file
+    mtime or size changes. The file is stat'ed at most once per check_interval
+    seconds, so a hot path pays neither the parse cost nor a syscall per call.
+
+    With background=True, reloads run in a separate thread and the previous
+    value keeps being served until the new one has finished loading. Values
+    exposing a `loaded` event (services loading in background) are only
+    swapped in once the event is set. A value whose own background load
+    failed (its `load_error` is set) is loaded again on the next check.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        loader: Callable[[str], T],
+        check_interval: float = DATA_RELOAD_INTERVAL,
+        background: bool = False,
+        name: Optional[str] = None
+    ):
+        self.file_path = file_path
+        self.name = name or os.path.basename(file_path)
+        self.loader = loader
+        self.check_interval = check_interval
+        self.background = background
+        self.version = 0
+        self._value: Optional[T] = None
+        self._signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def get(self) -> T:
+        if self.fresh:
+            return self._value
+
+        with self._lock:
+            self._last_check = time.monotonic()
+            signature = self._file_signature()
+
+            if self.failed and self._signature is not None:
+                # The value's own background load failed: forget the signature so it is loaded again
+                metrics.inc("data_store_load_errors_total", store=self.name)
+                logger.error(f"Background load of {self.file_path} failed, retrying: {self._value.load_error}")
+                self._signature = None
+
+            if self._value is None:
+                self._reload(signature)
+            elif signature != self._signature:
+                if self.background:
+                    self._start_background_reload(signature)
+                else:
+                    self._reload(signature)
+
+            return self._value
+
+    @property
+    def fresh(self) -> bool:
+        """Whether get() returns the current value without checking the file, so it can't block."""
+        return self._value is not None and time.monotonic() - self._last_check < self.check_interval
+
+    @property
+    def loading(self) -> bool:
+        """Whether the current value is still being filled in by a background load."""
+        loaded = getattr(self._value, "loaded", None)
+        return loaded is not None and not loaded.is_set()
+
+    @property
+    def failed(self) -> bool:
+        """Whether the current value's background load failed, leaving it with partial or no data."""
+        return getattr(self._value, "load_error", None) is not None
+
+    @property
+    def data_version(self) -> str:
+        """
+        Identifies the loaded data by file signature, so it is stable across
+        server restarts. A value still loading in background gets its own
+        version, so it changes again once the load completes.
+        """
+        self.get()
+        if self._signature is None:
+            version = f"v{self.version}"
+        else:
+            mtime_ns, size = self._signature
+            version = f"{mtime_ns:x}-{size:x}"
+        if self.failed:
+            return f"{version}-failed"
+        return f"{version}-loading" if self.loading else version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._signature = None
+
+    def _reload(self, signature) -> None:
+        start = time.perf_counter()
+        try:
+            value = self.loader(self.file_path)
+        except Exception:
+            metrics.inc("data_store_load_errors_total", store=self.name)
+            if self._value is None:
+                raise
+            logger.exception(f"Failed to reload {self.file_path}, keeping version {self.version}")
+            return
+
+        metrics.observe("data_store_load_seconds", time.perf_counter() - start, store=self.name)
+        self._set_value(value, signature)
+
+    def _start_background_reload(self, signature) -> None:
+        if self._reloading:
+            return
+        self._reloading = True
+        threading.Thread(target=self._background_reload, args=(signature,), name="reload-data-store", daemon=True).start()
+
+    def _background_reload(self, signature) -> None:
+        start = time.perf_counter()
+        try:
+            value = self.loader(self.file_path)
+
+            loaded = getattr(value, "loaded", None)
+            if loaded is not None:
+                loaded.wait()
+            load_error = getattr(value, "load_error", None)
+            if load_error is not None:
+                raise load_error
+        except Exception:
+            metrics.inc("data_store_load_errors_total", store=self.name)
+            logger.exception(f"Failed to reload {self.file_path}, keeping version {self.version}")
+        else:
+            metrics.observe("data_store_load_seconds", time.perf_counter() - start, store=self.name)
+            with self._lock:
+                self._set_value(value, signature)
+        finally:
+            self._reloading = False
+
+    def _set_value(self, value: T, signature) -> None:
+        self._value = value
+        self._signature = signature
+        self.version += 1
+        metrics.set("data_store_version", self.version, store=self.name)
+        logger.info(f"Loaded {self.file_path} (version {self.version})")
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+order_store: DataStore[OrderService] = DataStore(
+    ORDERS_FILE_PATH,
+    partial(OrderService, columnar=ORDER_BACKEND == "columnar", background=DATA_BACKGROUND_LOAD),
+    background=DATA_BACKGROUND_LOAD,
+    name="orders"
+)
+customer_store: DataStore[CustomerService] = DataStore(
+    CUSTOMERS_FILE_PATH,
+    partial(CustomerService, background=DATA_BACKGROUND_LOAD),
+    background=DATA_BACKGROUND_LOAD,
+    name="customers"
+)
+
+
+def get_order_service() -> OrderService:
+    return order_store.get()
+
+
+def get_customer_service() -> CustomerService:
+    return customer_store.get()
+
+
+def get_data_versions() -> dict:
+    return {
+        "orders": order_store.data_version,
+        "customers": customer_store.data_version
+    }
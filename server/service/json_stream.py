@@ -0,0 +1,116 @@
+from typing import Any, Iterator, Optional, TextIO
+import json
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class JsonRecordReader:
+    """
+    Incremental reader for a JSON array of records or a JSON lines file.
+
+    The file is read in chunk_size pieces and each record is decoded with
+    JSONDecoder.raw_decode as soon as it is complete. Memory stays bounded by
+    the chunk size plus the largest single record, not by the file size.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        first_char = self._next_char()
+
+        if first_char is None:
+            raise json.JSONDecodeError("Expecting value", self.buffer, self.position)
+
+        if first_char == "[":
+            self.position += 1
+            yield from self._iter_array()
+        else:
+            yield from self._iter_lines()
+
+    def _iter_array(self) -> Iterator[Any]:
+        if self._next_char() == "]":
+            self.position += 1
+        else:
+            while True:
+                yield self._decode_value()
+
+                delimiter = self._next_char()
+                if delimiter == ",":
+                    self.position += 1
+                elif delimiter == "]":
+                    self.position += 1
+                    break
+                else:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", self.buffer, self.position)
+
+        if self._next_char() is not None:
+            raise json.JSONDecodeError("Extra data", self.buffer, self.position)
+
+    def _iter_lines(self) -> Iterator[Any]:
+        while self._next_char() is not None:
+            yield self._decode_value()
+
+    def _decode_value(self) -> Any:
+        if self._next_char() is None:
+            raise json.JSONDecodeError("Expecting value", self.buffer, self.position)
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number or literal ending exactly at the buffer end may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.position = end
+            return value
+
+    def _next_char(self) -> Optional[str]:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return None
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.bytes_read += len(chunk)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+
+def iter_json_records(file: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    return iter(JsonRecordReader(file, chunk_size))
+
+
+def iter_json_batches(file: TextIO, batch_size: int, chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    batch = []
+    for record in iter_json_records(file, chunk_size):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,137 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import math
+import threading
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricFamily:
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        buckets: Optional[Sequence[float]] = None,
+        collect: Optional[Callable[[], Dict[Labels, float]]] = None
+    ):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.buckets = buckets
+        self.collect = collect
+        self.samples: Dict[Labels, float | Histogram] = {}
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms, rendered in the Prometheus
+    text exposition format.
+
+    Families are declared once with counter, gauge or histogram and updated
+    by name with labels passed as keyword arguments. Families declared with
+    `collect` read their samples from a callback at render time instead, for
+    values another component already keeps.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, collect: Optional[Callable[[], Dict[Labels, float]]] = None) -> None:
+        self._families[name] = MetricFamily(name, "counter", help, collect=collect)
+
+    def gauge(self, name: str, help: str, collect: Optional[Callable[[], Dict[Labels, float]]] = None) -> None:
+        self._families[name] = MetricFamily(name, "gauge", help, collect=collect)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._families[name] = MetricFamily(name, "histogram", help, buckets=tuple(sorted(buckets)))
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        family = self._families[name]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family.samples[key] = family.samples.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        family = self._families[name]
+        with self._lock:
+            family.samples[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        family = self._families[name]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = family.samples.get(key)
+            if histogram is None:
+                histogram = family.samples[key] = Histogram(family.buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        families = list(self._families.values())
+        # Callbacks take their owners' locks, so they run before taking ours
+        collected = {family.name: family.collect() for family in families if family.collect is not None}
+
+        lines: List[str] = []
+        with self._lock:
+            for family in families:
+                lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for labels, sample in sorted(collected.get(family.name, family.samples).items()):
+                    if isinstance(sample, Histogram):
+                        lines.extend(self._render_histogram(family.name, labels, sample))
+                    else:
+                        lines.append(f"{family.name}{format_labels(labels)} {format_value(sample)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, labels: Labels, histogram: Histogram) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        return lines
+
+
+metrics = MetricsRegistry()
@@ -1,35 +1,331 @@
-from model.order import Order
-import json
-from typing import List, Dict
+from model.order import Order, OrderRecord
+from service.aggregation import UNKNOWN_COUNTRY, GroupTotals, aggregate_results, epoch_bound, validate_aggregation
+from service.columnar_order_store import ColumnarOrderStore, parse_iso_month
+from service.json_stream import iter_json_batches, iter_json_records
+from service.snapshot import is_snapshot_path, read_orders_snapshot
+from service.sqlite_repository import SqliteDatabase, SqliteOrderRepository, is_sqlite_path
+from model.record import from_fixed_point
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Callable, List, Dict, Optional, Set, Tuple
+from operator import attrgetter
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 10_000
+MAX_MONTH_RANGE = 120
+ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_iso_date(iso_date: str) -> Optional[date]:
+    if not ISO_DATE_PATTERN.fullmatch(iso_date):
+        return None
+    try:
+        return date.fromisoformat(iso_date)
+    except ValueError:
+        return None
+
+
+def parse_date_range(start_date: str, end_date: str) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Parse an inclusive range of YYYY-MM-DD dates into a half-open UTC
+    [start, end) range, where end is midnight after the last day. Any other
+    format, including datetimes, is rejected.
+    """
+    start = parse_iso_date(start_date)
+    last = parse_iso_date(end_date)
+    if start is None or last is None or last < start:
+        return None
+    return (
+        datetime.combine(start, time(), tzinfo=timezone.utc),
+        datetime.combine(last + timedelta(days=1), time(), tzinfo=timezone.utc)
+    )
+
+
+def iso_month_range(start_month: str, end_month: str) -> Optional[List[str]]:
+    """Every month from start_month to end_month inclusive, or None when the range is invalid or too long."""
+    start = parse_iso_month(start_month)
+    end = parse_iso_month(end_month)
+    if start is None or end is None or not 0 <= end - start < MAX_MONTH_RANGE:
+        return None
+    return [f"{key // 12:04d}-{key % 12 + 1:02d}" for key in range(start, end + 1)]
 
 
 class OrderService:
-    def __init__(self, file_path: str = "data/orders.json"):
-        self.orders = self.load_orders(file_path)
+    def __init__(self, file_path: str = "data/orders.json", columnar: bool = False, background: bool = False):
+        self.columnar = columnar
+        self.orders: List[OrderRecord] = []
+        self.orders_by_customer_name: Dict[str, List[OrderRecord]] = {}
+        self.customer_ids_by_name: Dict[str, Set[int]] = {}
+        self.order_count_by_customer_and_month: Dict[Tuple[int, str], int] = {}
+        # Scale, spend by customer and spend by customer and month, published together
+        # so readers never pair totals with another scale
+        self.spend_totals: Tuple[int, Dict[int, int], Dict[Tuple[int, str], int]] = (0, {}, {})
+        self.columnar_store: Optional[ColumnarOrderStore] = None
+        # Timestamps and orders sorted by date, published together in one assignment
+        self.orders_by_date: Optional[Tuple[List[int], List[OrderRecord]]] = None
+        self.repository: Optional[ColumnarOrderStore | SqliteOrderRepository] = None
+        self.indexed = True
+        self.loaded = threading.Event()
+        self.load_error: Optional[Exception] = None
+
+        if is_snapshot_path(file_path):
+            self.load_snapshot(file_path)
+        elif is_sqlite_path(file_path):
+            self.load_sqlite(file_path)
+        elif background:
+            threading.Thread(target=self.load_in_background, args=(file_path,), name="load-orders", daemon=True).start()
+        else:
+            self.orders = self.load_orders(file_path)
+            self.index_orders(self.orders)
+            self.finish_loading()
 
-    def load_orders(self, file_path: str) -> list[Order]:
+    def load_orders(self, file_path: str) -> list[OrderRecord]:
         with open(file_path, "r") as file:
-            return [Order(**order) for order in json.load(file)]
+            return [OrderRecord.from_order(Order(**order)) for order in iter_json_records(file)]
+
+    def load_orders_incrementally(self, file_path: str, batch_size: int = LOAD_BATCH_SIZE) -> None:
+        with open(file_path, "r") as file:
+            for batch in iter_json_batches(file, batch_size):
+                self.add_orders([Order(**order) for order in batch])
+                logger.info(f"Loaded {len(self.orders)} orders from {file_path}")
+        self.finish_loading()
+
+    def load_snapshot(self, file_path: str) -> None:
+        # Orders stay in the memory-mapped columns and queries go through the columnar store
+        self.orders, self.repository = read_orders_snapshot(file_path)
+        self.indexed = False
+        self.loaded.set()
+
+    def load_sqlite(self, file_path: str) -> None:
+        # Orders stay in the database and queries are pushed down into SQL
+        self.repository = SqliteOrderRepository(SqliteDatabase(file_path))
+        self.orders = self.repository.orders
+        self.indexed = False
+        self.loaded.set()
+
+    def load_in_background(self, file_path: str) -> None:
+        try:
+            self.load_orders_incrementally(file_path)
+        except Exception as e:
+            logger.exception(f"Failed to load orders from {file_path}")
+            self.load_error = e
+            self.loaded.set()
+
+    def finish_loading(self) -> None:
+        if self.columnar:
+            self.columnar_store = ColumnarOrderStore.from_orders(self.orders)
+        self.loaded.set()
+
+    @property
+    def amount_scale(self) -> int:
+        return self.spend_totals[0]
+
+    @property
+    def spend_by_customer(self) -> Dict[int, int]:
+        return self.spend_totals[1]
+
+    @property
+    def spend_by_customer_and_month(self) -> Dict[Tuple[int, str], int]:
+        return self.spend_totals[2]
+
+    def index_orders(self, orders: List[OrderRecord]) -> None:
+        # Spend totals are fixed-point ints at the largest scale seen so far
+        previous_scale, spend_by_customer, spend_by_customer_and_month = self.spend_totals
+        scale = max([previous_scale] + [order.amount_scale for order in orders])
+        if scale > previous_scale:
+            # Rescaled into new dicts, the ones readers may hold keep matching the old scale
+            factor = 10 ** (scale - previous_scale)
+            spend_by_customer = {key: total * factor for key, total in spend_by_customer.items()}
+            spend_by_customer_and_month = {key: total * factor for key, total in spend_by_customer_and_month.items()}
+            self.spend_totals = (scale, spend_by_customer, spend_by_customer_and_month)
+
+        for order in orders:
+            self.orders_by_customer_name.setdefault(order.customer_name, []).append(order)
+            self.customer_ids_by_name.setdefault(order.customer_name, set()).add(order.customer_id)
+
+            key = (order.customer_id, order.iso_month)
+            self.order_count_by_customer_and_month[key] = self.order_count_by_customer_and_month.get(key, 0) + 1
+
+            amount = order.amount_units * 10 ** (scale - order.amount_scale)
+            spend_by_customer[order.customer_id] = spend_by_customer.get(order.customer_id, 0) + amount
+            spend_by_customer_and_month[key] = spend_by_customer_and_month.get(key, 0) + amount
+
+    @staticmethod
+    def to_amount(fixed_point: int, scale: int) -> float:
+        return float(from_fixed_point(fixed_point, scale))
+
+    def materialize(self) -> None:
+        self.orders = list(self.orders)
+        self.index_orders(self.orders)
+        self.indexed = True
+        self.repository = None
+
+    def add_orders(self, orders: List[Order | OrderRecord]) -> None:
+        orders = [OrderRecord.from_order(order) for order in orders]
+        self.orders_by_date = None
+        if isinstance(self.repository, SqliteOrderRepository):
+            self.repository.add_orders(orders)
+            return
+
+        if not self.indexed:
+            self.materialize()
+
+        self.orders.extend(orders)
+        self.index_orders(orders)
+
+        # Rebuilt on the next query rather than once per appended batch
+        self.columnar_store = None
+
+    def query_store(self) -> Optional[ColumnarOrderStore | SqliteOrderRepository]:
+        """
+        Store answering the aggregate queries: the repository while orders
+        aren't indexed, the columnar store once loaded with columnar=True,
+        or None when the in-memory indexes answer them.
+        """
+        if not self.indexed:
+            return self.repository
+        if self.columnar and self.loaded.is_set():
+            store = self.columnar_store
+            if store is None or len(store) != len(self.orders):
+                store = self.columnar_store = ColumnarOrderStore.from_orders(self.orders)
+            return store
+        return None
+
+    def get_orders_by_customer_name(self, customer_name: str) -> List[OrderRecord]:
+        if not self.indexed:
+            return [self.orders[position] for position in self.repository.positions_by_customer_name(customer_name)]
+
+        return self.orders_by_customer_name.get(customer_name, [])
 
     def get_order_count_by_customer_and_month(self, customer_name: str, iso_month: str) -> int:
-        return len(list(filter(lambda order: order.customer_name == customer_name and order.date.strftime("%Y-%m") == iso_month, self.orders)))
+        store = self.query_store()
+        if store is not None:
+            return store.get_order_count_by_customer_and_month(customer_name, iso_month)
+
+        return sum(
+            self.order_count_by_customer_and_month.get((customer_id, iso_month), 0)
+            for customer_id in self.customer_ids_by_name.get(customer_name, ())
+        )
+
+    def get_order_counts_by_customers_and_months(self, customer_names: List[str], iso_months: List[str]) -> Dict[str, Dict[str, int]]:
+        store = self.query_store()
+        if store is not None:
+            return {
+                customer_name: {
+                    iso_month: store.get_order_count_by_customer_and_month(customer_name, iso_month)
+                    for iso_month in iso_months
+                }
+                for customer_name in customer_names
+            }
+
+        counts = {}
+        for customer_name in customer_names:
+            customer_ids = self.customer_ids_by_name.get(customer_name, ())
+            counts[customer_name] = {
+                iso_month: sum(self.order_count_by_customer_and_month.get((customer_id, iso_month), 0) for customer_id in customer_ids)
+                for iso_month in iso_months
+            }
+        return counts
+
+    def get_customer_spend_by_month(self, customer_id: int, iso_month: str) -> float:
+        store = self.query_store()
+        if store is not None:
+            return store.get_customer_spend_by_month(customer_id, iso_month)
+
+        scale, _, spend_by_customer_and_month = self.spend_totals
+        return self.to_amount(spend_by_customer_and_month.get((customer_id, iso_month), 0), scale)
 
     def calculate_aggregate_spending_for_customers(self, customer_ids: List[int]) -> List[Dict[str, any]]:
-        customer_ids_set = set(customer_ids)
-        
-        spending_by_customer = {}
-        
-        for order in self.orders:
-            if order.customer_id in customer_ids_set:
-                if order.customer_id not in spending_by_customer:
-                    spending_by_customer[order.customer_id] = 0
-                spending_by_customer[order.customer_id] += order.amount
-        
-        result = []
-        for customer_id in customer_ids:
-            result.append({
+        store = self.query_store()
+        if store is not None:
+            return store.calculate_aggregate_spending_for_customers(customer_ids)
+
+        scale, spend_by_customer, _ = self.spend_totals
+        return [
+            {
                 "customerId": customer_id,
-                "spend": float(spending_by_customer.get(customer_id, 0))
-            })
-        
-        return result
+                "spend": self.to_amount(spend_by_customer.get(customer_id, 0), scale)
+            }
+            for customer_id in customer_ids
+        ]
+
+    def date_index(self) -> Tuple[List[int], List[OrderRecord]]:
+        """
+        Orders sorted by epoch seconds, with their timestamps, built on first use.
+
+        Orders are only ever appended, so an index covering fewer orders than
+        the list was built before an append, possibly by a reader racing a
+        background load, and is rebuilt rather than served.
+        """
+        index = self.orders_by_date
+        if index is None or len(index[1]) != len(self.orders):
+            orders = sorted(self.orders, key=attrgetter("timestamp"))
+            index = self.orders_by_date = ([order.timestamp for order in orders], orders)
+        return index
+
+    def get_orders_between(self, start: datetime, end: datetime) -> List[OrderRecord]:
+        timestamps, orders = self.date_index()
+        return orders[bisect_left(timestamps, epoch_bound(start)):bisect_left(timestamps, epoch_bound(end))]
+
+    def aggregate_orders(
+        self,
+        start: datetime,
+        end: datetime,
+        metric: str = "count",
+        group_by: Optional[str] = None,
+        country_by_customer_id: Optional[Dict[int, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate the amounts of the orders placed in [start, end).
+
+        Metrics are count, sum, avg, min and max. Groups are customer, day,
+        month (both in the order's own timezone) and country, which needs the
+        customers' countries. Without group_by a single result is returned.
+        """
+        validate_aggregation(metric, group_by, country_by_customer_id)
+        store = self.query_store()
+        if store is not None:
+            return store.aggregate_orders(start, end, metric, group_by, country_by_customer_id)
+
+        orders = self.get_orders_between(start, end)
+        scale = max((order.amount_scale for order in orders), default=0)
+        group_key = self._aggregate_group_key(group_by, country_by_customer_id)
+        groups: Dict[Any, List] = {}
+        customer_names: Dict[int, str] = {}
+        for order in orders:
+            key = group_key(order)
+            amount = order.amount_units * 10 ** (scale - order.amount_scale)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [1, amount, amount, amount]
+            else:
+                group[0] += 1
+                group[1] += amount
+                if amount < group[2]:
+                    group[2] = amount
+                if amount > group[3]:
+                    group[3] = amount
+            if group_by == "customer":
+                customer_names.setdefault(order.customer_id, order.customer_name)
+
+        totals: Dict[Any, GroupTotals] = {
+            key: (count, *(from_fixed_point(amount, scale) for amount in (total, minimum, maximum)))
+            for key, (count, total, minimum, maximum) in groups.items()
+        }
+        return aggregate_results(totals, metric, group_by, customer_names)
+
+    @staticmethod
+    def _aggregate_group_key(group_by: Optional[str], country_by_customer_id: Optional[Dict[int, str]]) -> Callable[[OrderRecord], Any]:
+        if group_by == "customer":
+            return attrgetter("customer_id")
+        if group_by == "day":
+            return attrgetter("iso_day")
+        if group_by == "month":
+            return attrgetter("iso_month")
+        if group_by == "country":
+            return lambda order: country_by_customer_id.get(order.customer_id, UNKNOWN_COUNTRY)
+        return lambda order: None
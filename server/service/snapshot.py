@@ -0,0 +1,431 @@
+from model.customer import CustomerRecord
+from model.order import OrderRecord
+from service.columnar_order_store import NAIVE_UTC_OFFSET, ColumnarOrderStore
+from service.text_keys import normalize_key, trigrams
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"MCPSNAP1"
+SNAPSHOT_SUFFIX = ".snapshot"
+HEADER_PREFIX = struct.Struct("<8sQ")
+ALIGNMENT = 8
+
+
+def is_snapshot_path(file_path: str) -> bool:
+    return file_path.endswith(SNAPSHOT_SUFFIX)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Snapshots require numpy, install it with the 'columnar' extra")
+
+
+def _encode_utc_offset(utc_offset: Optional[int]) -> int:
+    return NAIVE_UTC_OFFSET if utc_offset is None else utc_offset
+
+
+def _decode_utc_offset(utc_offset: int) -> Optional[int]:
+    return None if utc_offset == NAIVE_UTC_OFFSET else utc_offset
+
+
+def write_snapshot(file_path: str, columns: Dict[str, "np.ndarray"], strings: Dict[str, List[str]], meta: dict) -> None:
+    """
+    Write columns to a snapshot file.
+
+    Layout: magic, header length, JSON header, then every column as raw
+    little-endian data aligned to 8 bytes. String columns are stored as an
+    int64 offsets array plus a UTF-8 blob. The file is written next to the
+    target and renamed over it, so processes mapping the previous snapshot
+    keep a valid view.
+    """
+    _require_numpy()
+
+    blobs = []
+    header = {"meta": meta, "columns": {}, "strings": {}}
+
+    for name, values in columns.items():
+        array = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        header["columns"][name] = {"dtype": array.dtype.str, "length": len(array)}
+        blobs.append((("columns", name), array.tobytes()))
+
+    for name, values in strings.items():
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+        offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+        header["strings"][name] = {"length": len(encoded)}
+        blobs.append((("strings", name, "offsets"), offsets.tobytes()))
+        blobs.append((("strings", name, "data"), b"".join(encoded)))
+
+    def aligned(size: int) -> int:
+        return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    # Offsets depend on the header size, which depends on the offsets: lay out until stable
+    header_size = -1
+    encoded_header = b""
+    while header_size != len(encoded_header):
+        header_size = len(encoded_header)
+        position = aligned(HEADER_PREFIX.size + header_size)
+        for key, blob in blobs:
+            section = header[key[0]][key[1]]
+            if key[0] == "strings":
+                section[f"{key[2]}Offset"] = position
+                section[f"{key[2]}Size"] = len(blob)
+            else:
+                section["offset"] = position
+            position = aligned(position + len(blob))
+        encoded_header = json.dumps(header).encode("utf-8")
+
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER_PREFIX.pack(SNAPSHOT_MAGIC, header_size))
+        file.write(encoded_header)
+        for _, blob in blobs:
+            file.write(b"\0" * (aligned(file.tell()) - file.tell()))
+            file.write(blob)
+    os.replace(temp_path, file_path)
+
+
+class SnapshotStrings(Sequence[str]):
+    def __init__(self, buffer, offsets, data_offset: int):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.data_offset = data_offset
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start = self.data_offset + int(self.offsets[index])
+        end = self.data_offset + int(self.offsets[index + 1])
+        return self.buffer[start:end].decode("utf-8")
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Columns are NumPy arrays backed directly by the mapping, so opening a
+    snapshot only reads the header; data pages are faulted in on access.
+    """
+
+    def __init__(self, file_path: str):
+        _require_numpy()
+
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_size = HEADER_PREFIX.unpack_from(self.buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{file_path} is not a snapshot file")
+
+        header = json.loads(self.buffer[HEADER_PREFIX.size:HEADER_PREFIX.size + header_size])
+        self.meta = header["meta"]
+        self.column_headers = header["columns"]
+        self.string_headers = header["strings"]
+
+    def column(self, name: str) -> "np.ndarray":
+        column = self.column_headers[name]
+        return np.frombuffer(self.buffer, dtype=np.dtype(column["dtype"]), count=column["length"], offset=column["offset"])
+
+    def strings(self, name: str) -> SnapshotStrings:
+        column = self.string_headers[name]
+        offsets = np.frombuffer(self.buffer, dtype="<i8", count=column["length"] + 1, offset=column["offsetsOffset"])
+        return SnapshotStrings(self.buffer, offsets, column["dataOffset"])
+
+
+class SnapshotOrders(Sequence[OrderRecord]):
+    """Lazy sequence of the orders in a snapshot, materialized on access."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.ids = snapshot.column("id")
+        self.customer_ids = snapshot.column("customerId")
+        self.name_codes = snapshot.column("customerNameCode")
+        self.timestamps = snapshot.column("timestamp")
+        self.microseconds = snapshot.column("microsecond")
+        self.utc_offsets = snapshot.column("utcOffset")
+        self.amounts = snapshot.column("amount")
+        self.customer_names = snapshot.strings("customerNames")
+        self.scale = snapshot.meta["scale"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return OrderRecord(
+            int(self.ids[index]),
+            int(self.customer_ids[index]),
+            self.customer_names[int(self.name_codes[index])],
+            int(self.timestamps[index]),
+            int(self.microseconds[index]),
+            _decode_utc_offset(int(self.utc_offsets[index])),
+            int(self.amounts[index]),
+            self.scale
+        )
+
+
+def write_orders_snapshot(orders: List[OrderRecord], file_path: str) -> None:
+    store = ColumnarOrderStore.from_orders(orders)
+
+    write_snapshot(
+        file_path,
+        columns={
+            "id": np.array([order.id for order in orders], dtype=np.int64),
+            "customerId": store.customer_ids,
+            "customerNameCode": store.name_codes,
+            "timestamp": store.timestamps,
+            "microsecond": np.array([order.microsecond for order in orders], dtype=np.int32),
+            "utcOffset": store.utc_offsets,
+            "month": store.months,
+            "amount": store.amounts,
+            "dateOrder": store.date_order
+        },
+        strings={"customerNames": store.customer_names},
+        meta={"kind": "orders", "count": len(orders), "scale": store.scale}
+    )
+
+
+def read_orders_snapshot(file_path: str) -> tuple[SnapshotOrders, ColumnarOrderStore]:
+    snapshot = Snapshot(file_path)
+    if snapshot.meta.get("kind") != "orders":
+        raise ValueError(f"{file_path} is not an orders snapshot")
+
+    store = ColumnarOrderStore(
+        customer_ids=snapshot.column("customerId"),
+        timestamps=snapshot.column("timestamp"),
+        utc_offsets=snapshot.column("utcOffset"),
+        months=snapshot.column("month"),
+        name_codes=snapshot.column("customerNameCode"),
+        amounts=snapshot.column("amount"),
+        scale=snapshot.meta["scale"],
+        customer_names=list(snapshot.strings("customerNames")),
+        date_order=snapshot.column("dateOrder")
+    )
+    return SnapshotOrders(snapshot), store
+
+
+def _grouped_positions(keys: List[str], order_key) -> Tuple[List[str], "np.ndarray", "np.ndarray"]:
+    """Distinct keys in sorted order, with the positions of each key's rows sorted by order_key and the start of every key's run."""
+    positions = sorted(range(len(keys)), key=lambda position: (keys[position], order_key(position)))
+    counts = Counter(keys)
+    distinct = sorted(counts)
+    starts = np.zeros(len(distinct) + 1, dtype=np.int64)
+    starts[1:] = np.cumsum([counts[key] for key in distinct], dtype=np.int64)
+    return distinct, starts, np.array(positions, dtype=np.int64)
+
+
+def _first_ids(keys: List[str], ids: List[int]) -> Tuple[List[str], "np.ndarray"]:
+    first_ids: Dict[str, int] = {}
+    for key, customer_id in zip(keys, ids):
+        first_ids.setdefault(key, customer_id)
+    distinct = sorted(first_ids)
+    return distinct, np.array([first_ids[key] for key in distinct], dtype=np.int64)
+
+
+def write_customers_snapshot(customers: List[CustomerRecord], file_path: str) -> None:
+    """
+    Besides the customers' columns, the snapshot stores the indexes
+    CustomerService would otherwise build on load: the positions of each
+    country's customers from the most recently joined, the id of the first
+    customer with each name, and the positions of the names sharing each
+    trigram. Keys are sorted, so they are looked up by binary search.
+    """
+    ids = [customer.id for customer in customers]
+    names = [customer.name for customer in customers]
+    joined_at = [customer.joined_at_timestamp for customer in customers]
+    joined_at_microseconds = [customer.joined_at_microsecond for customer in customers]
+
+    def most_recent_first(position: int) -> Tuple[int, int, int]:
+        return -joined_at[position], -joined_at_microseconds[position], position
+
+    countries, country_starts, country_order = _grouped_positions([customer.country for customer in customers], most_recent_first)
+    country_keys, country_key_starts, country_key_order = _grouped_positions(
+        [normalize_key(customer.country) for customer in customers], most_recent_first
+    )
+    name_keys, name_ids = _first_ids(names, ids)
+    normalized_name_keys, normalized_name_ids = _first_ids([normalize_key(name) for name in names], ids)
+
+    name_trigrams = [trigrams(name) for name in names]
+    trigram_rows = [(trigram, position) for position, values in enumerate(name_trigrams) for trigram in values]
+    trigram_keys, trigram_starts, trigram_order = _grouped_positions([trigram for trigram, _ in trigram_rows], lambda row: trigram_rows[row][1])
+    country_codes = {country: code for code, country in enumerate(countries)}
+
+    write_snapshot(
+        file_path,
+        columns={
+            "id": np.array(ids, dtype=np.int64),
+            "joinedAt": np.array(joined_at, dtype=np.int64),
+            "joinedAtMicrosecond": np.array(joined_at_microseconds, dtype=np.int32),
+            "utcOffset": np.array([_encode_utc_offset(customer.utc_offset) for customer in customers], dtype=np.int32),
+            "countryCode": np.array([country_codes[customer.country] for customer in customers], dtype=np.int32),
+            "countryStarts": country_starts,
+            "countryOrder": country_order,
+            "countryKeyStarts": country_key_starts,
+            "countryKeyOrder": country_key_order,
+            "nameIds": name_ids,
+            "nameKeyIds": normalized_name_ids,
+            "trigramCount": np.array([len(values) for values in name_trigrams], dtype=np.int32),
+            "trigramStarts": trigram_starts,
+            "trigramPositions": np.array([trigram_rows[row][1] for row in trigram_order], dtype=np.int64)
+        },
+        strings={
+            "name": names,
+            "countries": countries,
+            "countryKeys": country_keys,
+            "names": name_keys,
+            "nameKeys": normalized_name_keys,
+            "trigrams": trigram_keys
+        },
+        meta={"kind": "customers", "count": len(customers)}
+    )
+
+
+def _find(keys: Sequence[str], key: str) -> Optional[int]:
+    index = bisect_left(keys, key)
+    return index if index < len(keys) and keys[index] == key else None
+
+
+class SnapshotCustomers(Sequence[CustomerRecord]):
+    """Lazy sequence of the customers in a snapshot, materialized on access."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.ids = snapshot.column("id")
+        self.joined_at = snapshot.column("joinedAt")
+        self.joined_at_microseconds = snapshot.column("joinedAtMicrosecond")
+        self.utc_offsets = snapshot.column("utcOffset")
+        self.country_codes = snapshot.column("countryCode")
+        self.names = snapshot.strings("name")
+        # Few distinct countries, decoded once
+        self.countries = list(snapshot.strings("countries"))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return CustomerRecord(
+            int(self.ids[index]),
+            self.names[index],
+            self.countries[int(self.country_codes[index])],
+            int(self.joined_at[index]),
+            int(self.joined_at_microseconds[index]),
+            _decode_utc_offset(int(self.utc_offsets[index]))
+        )
+
+
+class SnapshotCustomerRepository:
+    """Customers queried in place from a snapshot through its stored indexes, like SqliteCustomerRepository."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.customers = SnapshotCustomers(snapshot)
+        self.country_indexes = {
+            True: (self.customers.countries, snapshot.column("countryStarts"), snapshot.column("countryOrder")),
+            False: (snapshot.strings("countryKeys"), snapshot.column("countryKeyStarts"), snapshot.column("countryKeyOrder"))
+        }
+        self.name_indexes = (
+            (snapshot.strings("names"), snapshot.column("nameIds")),
+            (snapshot.strings("nameKeys"), snapshot.column("nameKeyIds"))
+        )
+        self.trigrams = snapshot.strings("trigrams")
+        self.trigram_starts = snapshot.column("trigramStarts")
+        self.trigram_positions = snapshot.column("trigramPositions")
+        self.trigram_counts = snapshot.column("trigramCount")
+
+    def list_recent_customers_by_country(self, country: str, limit: int = 10, case_sensitive: bool = True) -> List[CustomerRecord]:
+        keys, starts, order = self.country_indexes[case_sensitive]
+        index = _find(keys, country if case_sensitive else normalize_key(country))
+        if index is None:
+            return []
+        positions = order[starts[index]:starts[index + 1]][:limit]
+        return [self.customers[position] for position in positions.tolist()]
+
+    def get_customer_id_by_name(self, customer_name: str) -> Optional[int]:
+        for (keys, ids), key in zip(self.name_indexes, (customer_name, normalize_key(customer_name))):
+            index = _find(keys, key)
+            if index is not None:
+                return int(ids[index])
+        return None
+
+    def find_customers_by_name(self, customer_name: str, limit: int = 5, min_similarity: float = 0.3) -> List[Tuple[CustomerRecord, float]]:
+        query_trigrams = trigrams(customer_name)
+        runs = []
+        for trigram in query_trigrams:
+            index = _find(self.trigrams, trigram)
+            if index is not None:
+                runs.append(self.trigram_positions[self.trigram_starts[index]:self.trigram_starts[index + 1]])
+        if not runs:
+            return []
+
+        positions, shared = np.unique(np.concatenate(runs), return_counts=True)
+        similarities = shared / (len(query_trigrams) + self.trigram_counts[positions] - shared)
+        matches = similarities >= min_similarity
+        positions, similarities = positions[matches], similarities[matches]
+        best = np.lexsort((positions, -similarities))[:max(limit, 0)]
+
+        return [
+            (self.customers[position], round(similarity, 3))
+            for position, similarity in zip(positions[best].tolist(), similarities[best].tolist())
+        ]
+
+    def country_by_customer_id(self) -> Dict[int, str]:
+        countries = self.customers.countries
+        return dict(zip(self.customers.ids.tolist(), (countries[code] for code in self.customers.country_codes.tolist())))
+
+
+def read_customers_snapshot(file_path: str) -> SnapshotCustomerRepository:
+    snapshot = Snapshot(file_path)
+    if snapshot.meta.get("kind") != "customers":
+        raise ValueError(f"{file_path} is not a customers snapshot")
+    return SnapshotCustomerRepository(snapshot)
+
+
+def snapshot_path_for(file_path: str) -> str:
+    return os.path.splitext(file_path)[0] + SNAPSHOT_SUFFIX
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build memory-mappable snapshots from the JSON data files")
+    parser.add_argument("--orders", default="data/orders.json", help="orders JSON file")
+    parser.add_argument("--customers", default="data/customers.json", help="customers JSON file")
+    args = parser.parse_args()
+
+    from service.customer_service import CustomerService
+    from service.order_service import OrderService
+
+    orders_snapshot = snapshot_path_for(args.orders)
+    write_orders_snapshot(OrderService(args.orders).orders, orders_snapshot)
+    logger.info(f"Wrote {orders_snapshot}")
+
+    customers_snapshot = snapshot_path_for(args.customers)
+    write_customers_snapshot(CustomerService(args.customers).customers, customers_snapshot)
+    logger.info(f"Wrote {customers_snapshot}")
+
+
+if __name__ == "__main__":
+    from config.logging_config import setup_logging
+    setup_logging()
+    main()
@@ -0,0 +1,361 @@
+from model.customer import CustomerRecord
+from model.order import OrderRecord
+from model.record import to_epoch_seconds
+from service.aggregation import GroupTotals, UNKNOWN_COUNTRY, aggregate_results, epoch_bound, merge_group_totals
+from service.text_keys import normalize_key, trigrams
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+MAX_QUERY_PARAMETERS = 500
+# SQL expression of the group key for each aggregate_orders group. Countries
+# aren't stored with the orders, so they are grouped by customer and combined.
+AGGREGATE_GROUP_KEYS = {
+    "customer": "customer_id",
+    "country": "customer_id",
+    "month": "month",
+    "day": "substr(date, 1, 10)"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    position INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    customer_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    date_epoch INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    amount INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_customer_id ON orders (customer_id, month);
+CREATE INDEX IF NOT EXISTS orders_customer_name_month ON orders (customer_name, month);
+CREATE INDEX IF NOT EXISTS orders_date ON orders (date_epoch);
+
+CREATE TABLE IF NOT EXISTS customers (
+    position INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    country TEXT NOT NULL,
+    country_key TEXT NOT NULL,
+    joined_at TEXT NOT NULL,
+    joined_at_us INTEGER NOT NULL,
+    trigram_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS customers_country ON customers (country, joined_at_us DESC, position);
+CREATE INDEX IF NOT EXISTS customers_country_key ON customers (country_key, joined_at_us DESC, position);
+CREATE INDEX IF NOT EXISTS customers_name ON customers (name, position);
+CREATE INDEX IF NOT EXISTS customers_name_key ON customers (name_key, position);
+
+CREATE TABLE IF NOT EXISTS customer_trigrams (
+    trigram TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS customer_trigrams_trigram ON customer_trigrams (trigram);
+"""
+
+def is_sqlite_path(file_path: str) -> bool:
+    return file_path.endswith(SQLITE_SUFFIXES)
+
+
+def chunked(values: List, size: int = MAX_QUERY_PARAMETERS) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class SqliteDatabase:
+    """Shared connection to the SQLite file, serialized with a lock."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def query(self, sql: str, parameters: Sequence = ()) -> List[Tuple]:
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def write(self, callback: Callable[[sqlite3.Connection], None]) -> None:
+        with self.lock, self.connection:
+            callback(self.connection)
+
+    def get_meta(self, key: str, default: str) -> str:
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else default
+
+
+class SqliteRows(Sequence):
+    """Lazy sequence over a table, ordered by load position."""
+
+    def __init__(self, database: SqliteDatabase, table: str, columns: str, to_model: Callable[[Tuple], object]):
+        self.database = database
+        self.table = table
+        self.columns = columns
+        self.to_model = to_model
+
+    def __len__(self) -> int:
+        return self.database.query(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        rows = self.database.query(f"SELECT {self.columns} FROM {self.table} WHERE position = ?", (index,))
+        if not rows:
+            raise IndexError(index)
+        return self.to_model(rows[0])
+
+    def __iter__(self):
+        rows = self.database.query(f"SELECT {self.columns} FROM {self.table} ORDER BY position")
+        return (self.to_model(row) for row in rows)
+
+
+class SqliteOrderRepository:
+    """Orders stored in SQLite, with lookups and aggregations pushed down into SQL."""
+
+    COLUMNS = "id, customer_id, customer_name, date, amount"
+
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+        self.scale = int(database.get_meta("order_amount_scale", "0"))
+        self.orders = SqliteRows(database, "orders", self.COLUMNS, self.to_order)
+
+    def to_order(self, row: Tuple) -> OrderRecord:
+        order_id, customer_id, customer_name, date, amount = row
+        return OrderRecord(order_id, customer_id, customer_name, *to_epoch_seconds(datetime.fromisoformat(date)), amount, self.scale)
+
+    def add_orders(self, orders: List[OrderRecord]) -> None:
+        scale = max([self.scale] + [order.amount_scale for order in orders])
+
+        def insert(connection: sqlite3.Connection) -> None:
+            if scale > self.scale:
+                connection.execute("UPDATE orders SET amount = amount * ?", (10 ** (scale - self.scale),))
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('order_amount_scale', ?)", (str(scale),))
+
+            start = connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM orders").fetchone()[0]
+            connection.executemany(
+                "INSERT INTO orders (position, id, customer_id, customer_name, date, date_epoch, month, amount) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        start + offset,
+                        order.id,
+                        order.customer_id,
+                        order.customer_name,
+                        order.date.isoformat(),
+                        order.timestamp,
+                        order.iso_month,
+                        order.amount_units * 10 ** (scale - order.amount_scale)
+                    )
+                    for offset, order in enumerate(orders)
+                )
+            )
+
+        self.database.write(insert)
+        self.scale = scale
+
+    def positions_by_customer_name(self, customer_name: str) -> List[int]:
+        rows = self.database.query("SELECT position FROM orders WHERE customer_name = ? ORDER BY position", (customer_name,))
+        return [row[0] for row in rows]
+
+    def get_order_count_by_customer_and_month(self, customer_name: str, iso_month: str) -> int:
+        rows = self.database.query("SELECT COUNT(*) FROM orders WHERE customer_name = ? AND month = ?", (customer_name, iso_month))
+        return rows[0][0]
+
+    def get_customer_spend_by_month(self, customer_id: int, iso_month: str) -> float:
+        rows = self.database.query("SELECT COALESCE(SUM(amount), 0) FROM orders WHERE customer_id = ? AND month = ?", (customer_id, iso_month))
+        return float(Decimal(rows[0][0]).scaleb(-self.scale))
+
+    def calculate_aggregate_spending_for_customers(self, customer_ids: List[int]) -> List[Dict[str, any]]:
+        spending_by_customer = {}
+        for ids in chunked(list(set(customer_ids))):
+            placeholders = ", ".join("?" * len(ids))
+            rows = self.database.query(
+                f"SELECT customer_id, SUM(amount) FROM orders WHERE customer_id IN ({placeholders}) GROUP BY customer_id",
+                ids
+            )
+            spending_by_customer.update(rows)
+
+        return [
+            {
+                "customerId": customer_id,
+                "spend": float(Decimal(spending_by_customer.get(customer_id, 0)).scaleb(-self.scale))
+            }
+            for customer_id in customer_ids
+        ]
+
+    def aggregate_orders(
+        self,
+        start: datetime,
+        end: datetime,
+        metric: str = "count",
+        group_by: Optional[str] = None,
+        country_by_customer_id: Optional[Dict[int, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """See OrderService.aggregate_orders, which validates the arguments. The range is looked up with the orders_date index."""
+        totals = "COUNT(*), SUM(amount), MIN(amount), MAX(amount)"
+        where = "date_epoch >= :start AND date_epoch < :end"
+        parameters = {"start": epoch_bound(start), "end": epoch_bound(end)}
+
+        if group_by is None:
+            rows = [(None, *row) for row in self.database.query(f"SELECT {totals} FROM orders WHERE {where}", parameters) if row[0]]
+        elif group_by == "customer":
+            # Name of the customer's first order in the range, as in the in-memory aggregation
+            rows = self.database.query(
+                f"""
+                SELECT customer_id, {totals}, (
+                    SELECT first.customer_name FROM orders AS first
+                    WHERE first.customer_id = orders.customer_id AND first.date_epoch >= :start AND first.date_epoch < :end
+                    ORDER BY first.date_epoch, first.position LIMIT 1
+                )
+                FROM orders WHERE {where} GROUP BY customer_id
+                """,
+                parameters
+            )
+        else:
+            key = AGGREGATE_GROUP_KEYS[group_by]
+            rows = self.database.query(f"SELECT {key}, {totals} FROM orders WHERE {where} GROUP BY {key}", parameters)
+
+        groups: Dict[Any, GroupTotals] = {}
+        customer_names: Dict[int, str] = {}
+        for key, count, total, minimum, maximum, *name in rows:
+            totals_row = (count, *(Decimal(amount).scaleb(-self.scale) for amount in (total, minimum, maximum)))
+            if group_by == "country":
+                merge_group_totals(groups, country_by_customer_id.get(key, UNKNOWN_COUNTRY), totals_row)
+            else:
+                groups[key] = totals_row
+            if name:
+                customer_names[key] = name[0]
+        return aggregate_results(groups, metric, group_by, customer_names)
+
+
+class SqliteCustomerRepository:
+    """Customers stored in SQLite, with country, name and trigram indexes."""
+
+    COLUMNS = "id, name, country, joined_at"
+
+    def __init__(self, database: SqliteDatabase):
+        self.database = database
+        self.customers = SqliteRows(database, "customers", self.COLUMNS, self.to_customer)
+
+    @staticmethod
+    def to_customer(row: Tuple) -> CustomerRecord:
+        customer_id, name, country, joined_at = row
+        return CustomerRecord(customer_id, name, country, *to_epoch_seconds(datetime.fromisoformat(joined_at)))
+
+    def add_customers(self, customers: List[CustomerRecord]) -> None:
+        def insert(connection: sqlite3.Connection) -> None:
+            start = connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM customers").fetchone()[0]
+            for offset, customer in enumerate(customers):
+                position = start + offset
+                name_trigrams = trigrams(customer.name)
+                connection.execute(
+                    "INSERT INTO customers (position, id, name, name_key, country, country_key, joined_at, joined_at_us, trigram_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        position,
+                        customer.id,
+                        customer.name,
+                        normalize_key(customer.name),
+                        customer.country,
+                        normalize_key(customer.country),
+                        customer.joined_at.isoformat(),
+                        customer.joined_at_timestamp * 1_000_000 + customer.joined_at_microsecond,
+                        len(name_trigrams)
+                    )
+                )
+                connection.executemany(
+                    "INSERT INTO customer_trigrams (trigram, position) VALUES (?, ?)",
+                    ((trigram, position) for trigram in name_trigrams)
+                )
+
+        self.database.write(insert)
+
+    def list_recent_customers_by_country(self, country: str, limit: int = 10, case_sensitive: bool = True) -> List[CustomerRecord]:
+        column, value = ("country", country) if case_sensitive else ("country_key", normalize_key(country))
+        # Negative limits keep the slice semantics of the in-memory service
+        sql_limit = limit if limit >= 0 else -1
+
+        rows = self.database.query(
+            f"SELECT {self.COLUMNS} FROM customers WHERE {column} = ? ORDER BY joined_at_us DESC, position LIMIT ?",
+            (value, sql_limit)
+        )
+        customers = [self.to_customer(row) for row in rows]
+        return customers if limit >= 0 else customers[:limit]
+
+    def get_customer_id_by_name(self, customer_name: str) -> Optional[int]:
+        rows = self.database.query("SELECT id FROM customers WHERE name = ? ORDER BY position LIMIT 1", (customer_name,))
+        if not rows:
+            rows = self.database.query("SELECT id FROM customers WHERE name_key = ? ORDER BY position LIMIT 1", (normalize_key(customer_name),))
+        return rows[0][0] if rows else None
+
+    def find_customers_by_name(self, customer_name: str, limit: int = 5, min_similarity: float = 0.3) -> List[Tuple[CustomerRecord, float]]:
+        query_trigrams = list(trigrams(customer_name))
+        placeholders = ", ".join("?" * len(query_trigrams))
+
+        rows = self.database.query(
+            f"""
+            SELECT customers.id, customers.name, customers.country, customers.joined_at,
+                matches.shared * 1.0 / (? + customers.trigram_count - matches.shared) AS similarity
+            FROM (
+                SELECT position, COUNT(*) AS shared FROM customer_trigrams
+                WHERE trigram IN ({placeholders}) GROUP BY position
+            ) AS matches
+            JOIN customers ON customers.position = matches.position
+            WHERE similarity >= ?
+            ORDER BY similarity DESC, customers.position
+            LIMIT ?
+            """,
+            [len(query_trigrams), *query_trigrams, min_similarity, limit]
+        )
+
+        return [(self.to_customer(row[:4]), round(row[4], 3)) for row in rows]
+
+
+def write_sqlite_database(orders: List[OrderRecord], customers: List[CustomerRecord], file_path: str) -> None:
+    temp_path = f"{file_path}.tmp"
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+
+    database = SqliteDatabase(temp_path)
+    SqliteOrderRepository(database).add_orders(orders)
+    SqliteCustomerRepository(database).add_customers(customers)
+    database.connection.close()
+
+    os.replace(temp_path, file_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import the JSON data files into a SQLite database")
+    parser.add_argument("--orders", default="data/orders.json", help="orders JSON file")
+    parser.add_argument("--customers", default="data/customers.json", help="customers JSON file")
+    parser.add_argument("--output", default="data/store.sqlite", help="SQLite database to write")
+    args = parser.parse_args()
+
+    from service.customer_service import CustomerService
+    from service.order_service import OrderService
+
+    write_sqlite_database(OrderService(args.orders).orders, CustomerService(args.customers).customers, args.output)
+    logger.info(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    from config.logging_config import setup_logging
+    setup_logging()
+    main()
@@ -0,0 +1,10 @@
+from typing import Set
+
+
+def normalize_key(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+def trigrams(value: str) -> Set[str]:
+    padded = f"  {normalize_key(value)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,181 @@
+import pytest
+import json
+import tempfile
+import os
+from datetime import datetime
+from unittest.mock import patch
+from service.columnar_order_store import ColumnarOrderStore
+from service.order_service import OrderService
+
+np = pytest.importorskip("numpy")
+
+
+class TestColumnarOrderStore:
+
+    @pytest.fixture
+    def sample_orders_data(self):
+        return [
+            {
+                "id": 1,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-05T14:30:00Z",
+                "amount": 350.25
+            },
+            {
+                "id": 2,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-18T09:45:00Z",
+                "amount": 420.50
+            },
+            {
+                "id": 3,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-02-15T11:15:00Z",
+                "amount": 390.30
+            },
+            {
+                "id": 4,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-04-02T13:50:00Z",
+                "amount": 100.123456
+            },
+            {
+                "id": 5,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-05-31T23:20:00-03:00",
+                "amount": -275.75
+            }
+        ]
+
+    @pytest.fixture
+    def temp_orders_file(self, sample_orders_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(sample_orders_data, f)
+            temp_file_path = f.name
+
+        yield temp_file_path
+
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+    def test_columnar_store_built_only_when_requested(self, temp_orders_file):
+        assert OrderService(temp_orders_file).columnar_store is None
+        assert len(OrderService(temp_orders_file, columnar=True).columnar_store) == 5
+
+    def test_fixed_point_scale_matches_data_precision(self, temp_orders_file):
+        store = OrderService(temp_orders_file, columnar=True).columnar_store
+
+        assert store.scale == 6
+        assert store.amounts.dtype == np.int64
+        assert store.amounts[0] == 350250000
+
+    @pytest.mark.parametrize("customer_ids", [[1], [1, 2], [2, 1, 999], [1, 1, 2], [999], []])
+    def test_aggregate_spending_identical_to_list_backend(self, temp_orders_file, customer_ids):
+        list_service = OrderService(temp_orders_file)
+        columnar_service = OrderService(temp_orders_file, columnar=True)
+
+        expected = list_service.calculate_aggregate_spending_for_customers(customer_ids)
+        result = columnar_service.columnar_store.calculate_aggregate_spending_for_customers(customer_ids)
+
+        assert result == expected
+        assert all(isinstance(r["spend"], float) for r in result)
+
+    @pytest.mark.parametrize("customer_name,month", [
+        ("Vinicius Finger", "2025-03"),
+        ("Vinicius Finger", "2025-05"),
+        ("Vinicius Finger", "2025-06"),
+        ("Cauê Finger", "2025-02"),
+        ("Cliente Inexistente", "2025-03"),
+        ("Vinicius Finger", "2025-3"),
+        ("Vinicius Finger", "2025-03-01"),
+        ("Vinicius Finger", "2025-13"),
+    ])
+    def test_month_count_identical_to_list_backend(self, temp_orders_file, customer_name, month):
+        list_service = OrderService(temp_orders_file)
+        columnar_service = OrderService(temp_orders_file, columnar=True)
+
+        expected = list_service.get_order_count_by_customer_and_month(customer_name, month)
+
+        assert columnar_service.columnar_store.get_order_count_by_customer_and_month(customer_name, month) == expected
+
+    @pytest.mark.parametrize("customer_id,month", [(1, "2025-03"), (1, "2025-05"), (2, "2025-04"), (2, "2025-03"), (1, "2025-3")])
+    def test_spend_by_month_identical_to_materialized_totals(self, temp_orders_file, customer_id, month):
+        expected = OrderService(temp_orders_file).get_customer_spend_by_month(customer_id, month)
+
+        assert OrderService(temp_orders_file, columnar=True).columnar_store.get_customer_spend_by_month(customer_id, month) == expected
+
+    def test_columnar_service_queries_go_through_store(self, temp_orders_file):
+        service = OrderService(temp_orders_file, columnar=True)
+
+        with patch.object(ColumnarOrderStore, "calculate_aggregate_spending_for_customers", return_value=[]) as aggregate, \
+                patch.object(ColumnarOrderStore, "get_order_count_by_customer_and_month", return_value=7) as count:
+            assert service.calculate_aggregate_spending_for_customers([1]) == []
+            assert service.get_order_counts_by_customers_and_months(["Vinicius Finger"], ["2025-03"]) == {"Vinicius Finger": {"2025-03": 7}}
+
+        aggregate.assert_called_once_with([1])
+        count.assert_called_once_with("Vinicius Finger", "2025-03")
+
+    def test_columnar_store_rebuilt_once_after_appends(self, temp_orders_file):
+        service = OrderService(temp_orders_file, columnar=True)
+
+        service.add_orders(OrderService(temp_orders_file).orders[:1])
+        service.add_orders(OrderService(temp_orders_file).orders[:1])
+
+        assert service.columnar_store is None
+        assert service.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 4
+        assert len(service.columnar_store) == 7
+
+    @pytest.mark.parametrize("metric", ["count", "sum", "avg", "min", "max"])
+    @pytest.mark.parametrize("group_by", [None, "customer", "day", "month", "country"])
+    @pytest.mark.parametrize("start,end", [
+        ("2025-01-01T00:00:00+00:00", "2026-01-01T00:00:00+00:00"),
+        ("2025-03-05T14:30:00+00:00", "2025-06-01T02:20:00+00:00"),
+        ("2025-03-05T14:30:00.5+00:00", "2025-06-01T02:21:00+00:00"),
+        ("2026-01-01T00:00:00+00:00", "2026-02-01T00:00:00+00:00")
+    ])
+    def test_aggregate_orders_identical_to_list_backend(self, temp_orders_file, metric, group_by, start, end):
+        arguments = (datetime.fromisoformat(start), datetime.fromisoformat(end), metric, group_by, {1: "Brazil"})
+
+        expected = OrderService(temp_orders_file).aggregate_orders(*arguments)
+
+        assert OrderService(temp_orders_file, columnar=True).columnar_store.aggregate_orders(*arguments) == expected
+
+    def test_columnar_service_aggregates_through_store(self, temp_orders_file):
+        service = OrderService(temp_orders_file, columnar=True)
+        start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2026-01-01T00:00:00+00:00")
+
+        with patch.object(ColumnarOrderStore, "aggregate_orders", return_value=[]) as aggregate:
+            assert service.aggregate_orders(start, end, "sum", "month") == []
+
+        aggregate.assert_called_once_with(start, end, "sum", "month", None)
+        assert service.orders_by_date is None
+
+    def test_count_orders_by_month(self, temp_orders_file):
+        store = OrderService(temp_orders_file, columnar=True).columnar_store
+
+        assert store.count_orders_by_month() == {"2025-02": 1, "2025-03": 2, "2025-04": 1, "2025-05": 1}
+        assert store.count_orders_by_month("Vinicius Finger") == {"2025-03": 2, "2025-05": 1}
+        assert store.count_orders_by_month("Cliente Inexistente") == {}
+
+    def test_empty_orders(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([], f)
+            temp_file_path = f.name
+
+        try:
+            store = OrderService(temp_file_path, columnar=True).columnar_store
+
+            assert store.calculate_aggregate_spending_for_customers([1, 2]) == [
+                {"customerId": 1, "spend": 0.0},
+                {"customerId": 2, "spend": 0.0}
+            ]
+            assert store.get_order_count_by_customer_and_month("João Silva", "2025-03") == 0
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
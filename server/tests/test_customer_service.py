@@ -2,10 +2,11 @@ import pytest
 import json
 import tempfile
 import os
+import threading
 from datetime import datetime
 from unittest.mock import patch, mock_open
 from service.customer_service import CustomerService
-from model.customer import Customer
+from model.customer import Customer, CustomerRecord
 
 
 class TestCustomerService:
@@ -89,7 +90,7 @@ class TestCustomerService:
         service = CustomerService(temp_customers_file)
         
         assert len(service.customers) == 8
-        assert all(isinstance(customer, Customer) for customer in service.customers)
+        assert all(isinstance(customer, CustomerRecord) for customer in service.customers)
         
         first_customer = service.customers[0]
         assert first_customer.id == 1
@@ -229,4 +230,162 @@ class TestCustomerService:
         customers = service.list_recent_customers_by_country("Brazil", limit=-1)
         assert len(customers) == 2
         assert customers[0].name == "Ronaldinho Gaucho"
-        assert customers[1].name == "Maria Silva" 
\ No newline at end of file
+        assert customers[1].name == "Maria Silva" 
+
+    def test_country_index_sorted_by_joined_at_descending(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert [customer.id for customer in service.customers_by_country["Brazil"]] == [5, 4, 3]
+        assert [customer.id for customer in service.customers_by_normalized_country["usa"]] == [2, 1]
+        assert service.unsorted_country_keys == set()
+
+    def test_list_recent_customers_by_country_case_insensitive(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        customers = service.list_recent_customers_by_country(" brazil ", case_sensitive=False)
+        assert [customer.name for customer in customers] == ["Ronaldinho Gaucho", "Maria Silva", "Carlos Rodriguez"]
+
+        customers = service.list_recent_customers_by_country("FRANCE", limit=1, case_sensitive=False)
+        assert [customer.name for customer in customers] == ["Sophie Martin"]
+
+    def test_list_recent_customers_by_country_returns_copy(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        customers = service.list_recent_customers_by_country("Brazil")
+        customers.clear()
+
+        assert len(service.list_recent_customers_by_country("Brazil")) == 3
+
+    def test_add_customers_partial_refresh(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        service.add_customers([
+            Customer(id=9, name="Ana Souza", country="Brazil", joined_at="2024-04-01T00:00:00Z"),
+            Customer(id=10, name="Pedro Alves", country="brazil", joined_at="2024-08-01T00:00:00Z")
+        ])
+
+        assert service.unsorted_country_keys == set()
+
+        top = service.list_recent_customers_by_country("Brazil", limit=2)
+        assert [customer.id for customer in top] == [5, 4]
+
+        everyone = service.list_recent_customers_by_country("Brazil")
+        assert [customer.id for customer in everyone] == [5, 4, 9, 3]
+
+        normalized = service.list_recent_customers_by_country("BRAZIL", limit=3, case_sensitive=False)
+        assert [customer.id for customer in normalized] == [10, 5, 4]
+
+    def test_get_customer_id_by_name_exact(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert service.get_customer_id_by_name("Maria Silva") == 4
+        assert service.get_customer_id_by_name("Cliente Inexistente") is None
+
+    def test_get_customer_id_by_name_normalized(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert service.get_customer_id_by_name("maria silva") == 4
+        assert service.get_customer_id_by_name("  MARIA   Silva ") == 4
+
+    def test_get_customer_ids_by_names(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert service.get_customer_ids_by_names(["Maria Silva", "john doe", "Cliente Inexistente"]) == {
+            "Maria Silva": 4,
+            "john doe": 1,
+            "Cliente Inexistente": None
+        }
+
+    def test_get_country_by_customer_id(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert service.get_country_by_customer_id()[4] == "Brazil"
+
+        service.add_customers([
+            Customer(id=9, name="Ana Souza", country="Portugal", joined_at="2024-08-01T00:00:00Z")
+        ])
+
+        assert service.get_country_by_customer_id()[9] == "Portugal"
+
+    def test_find_customers_by_name_ranks_candidates(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        candidates = service.find_customers_by_name("Jon Doe")
+        assert candidates[0][0].name == "John Doe"
+        assert 0 < candidates[0][1] < 1
+
+        candidates = service.find_customers_by_name("Silva")
+        assert [customer.name for customer, _ in candidates] == ["Maria Silva"]
+
+    def test_find_customers_by_name_respects_limit_and_threshold(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        assert len(service.find_customers_by_name("Martin", limit=1, min_similarity=0)) == 1
+        assert service.find_customers_by_name("Xyzzy") == []
+
+    def test_add_customers_updates_name_indexes(self, temp_customers_file):
+        service = CustomerService(temp_customers_file)
+
+        service.add_customers([
+            Customer(id=9, name="Ana Souza", country="Brazil", joined_at="2024-04-01T00:00:00Z")
+        ])
+
+        assert service.get_customer_id_by_name("ana souza") == 9
+        assert service.find_customers_by_name("Ana Sousa")[0][0].id == 9
+
+    def test_load_customers_in_background(self, temp_customers_file):
+        service = CustomerService(temp_customers_file, background=True)
+
+        assert service.loaded.wait(5)
+        assert service.load_error is None
+        assert len(service.customers) == 8
+        assert service.unsorted_country_keys == set()
+        assert [customer.id for customer in service.list_recent_customers_by_country("Brazil")] == [5, 4, 3]
+
+    def test_reads_during_background_load(self):
+        countries = ["Brazil", "France", "Japan"]
+        customers = [
+            {"id": i, "name": f"Customer {i}", "country": countries[i % 3], "joinedAt": f"2024-01-01T00:00:{i % 60:02d}Z"}
+            for i in range(30_000)
+        ]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(customers, f)
+            temp_file_path = f.name
+
+        errors = []
+        empty_reads = []
+
+        def read(service):
+            while not service.loaded.is_set():
+                try:
+                    for limit in (5, -1):
+                        if service.customers_by_country.get("Brazil") and not service.list_recent_customers_by_country("brazil", limit, case_sensitive=False):
+                            empty_reads.append(limit)
+                    service.find_customers_by_name("Customer 42")
+                    service.get_country_by_customer_id()
+                except Exception as e:
+                    errors.append(e)
+
+        try:
+            service = CustomerService(temp_file_path, background=True)
+            readers = [threading.Thread(target=read, args=(service,)) for _ in range(4)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join(30)
+        finally:
+            os.unlink(temp_file_path)
+
+        assert service.load_error is None
+        assert errors == []
+        assert empty_reads == []
+        recent = service.list_recent_customers_by_country("Brazil", limit=3)
+        assert [customer.joined_at_timestamp for customer in recent] == sorted((customer.joined_at_timestamp for customer in recent), reverse=True)
+        assert len(service.get_country_by_customer_id()) == 30_000
+
+    def test_load_customers_in_background_failure(self):
+        service = CustomerService("arquivo_inexistente.json", background=True)
+
+        assert service.loaded.wait(5)
+        assert isinstance(service.load_error, FileNotFoundError)
+        assert service.customers == []
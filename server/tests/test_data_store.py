@@ -0,0 +1,182 @@
+import pytest
+import json
+import tempfile
+import os
+import time
+from functools import partial
+from service.data_store import DataStore
+from service.order_service import OrderService
+from tools.response_cache import ResponseCache, cached_tool
+
+
+class TestDataStore:
+
+    @pytest.fixture
+    def sample_orders_data(self):
+        return [
+            {
+                "id": 1,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-05T14:30:00Z",
+                "amount": 350.25
+            },
+            {
+                "id": 2,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-02-15T11:15:00Z",
+                "amount": 390.30
+            }
+        ]
+
+    @pytest.fixture
+    def temp_orders_file(self, sample_orders_data):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(sample_orders_data, f)
+            temp_file_path = f.name
+
+        yield temp_file_path
+
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+    def _rewrite(self, file_path, data, mtime_offset=10):
+        stat = os.stat(file_path)
+        with open(file_path, 'w') as f:
+            json.dump(data, f)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 1_000_000_000))
+
+    def test_lazy_load(self, temp_orders_file):
+        loads = []
+
+        def loader(file_path):
+            loads.append(file_path)
+            return OrderService(file_path)
+
+        store = DataStore(temp_orders_file, loader)
+        assert loads == []
+
+        service = store.get()
+        assert loads == [temp_orders_file]
+        assert len(service.orders) == 2
+        assert store.version == 1
+
+    def test_shared_instance_without_changes(self, temp_orders_file):
+        store = DataStore(temp_orders_file, OrderService, check_interval=0)
+
+        assert store.get() is store.get()
+        assert store.version == 1
+
+    def test_reload_on_file_change(self, temp_orders_file, sample_orders_data):
+        store = DataStore(temp_orders_file, OrderService, check_interval=0)
+        first = store.get()
+
+        self._rewrite(temp_orders_file, sample_orders_data[:1])
+
+        second = store.get()
+        assert second is not first
+        assert len(second.orders) == 1
+        assert store.version == 2
+
+    def test_data_version_stable_until_file_changes(self, temp_orders_file, sample_orders_data):
+        store = DataStore(temp_orders_file, OrderService, check_interval=0)
+        first = store.data_version
+
+        assert DataStore(temp_orders_file, OrderService).data_version == first
+
+        self._rewrite(temp_orders_file, sample_orders_data[:1])
+
+        assert store.data_version != first
+
+    def test_data_version_changes_when_background_load_completes(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+        service.loaded.clear()
+        store = DataStore(temp_orders_file, lambda file_path: service, check_interval=3600)
+
+        loading = store.data_version
+        service.loaded.set()
+
+        assert store.loading is False
+        assert loading.endswith("-loading")
+        assert store.data_version != loading
+
+    def test_change_not_checked_within_interval(self, temp_orders_file, sample_orders_data):
+        store = DataStore(temp_orders_file, OrderService, check_interval=3600)
+        first = store.get()
+
+        self._rewrite(temp_orders_file, sample_orders_data[:1])
+
+        assert store.get() is first
+
+    def test_keeps_previous_value_when_reload_fails(self, temp_orders_file):
+        store = DataStore(temp_orders_file, OrderService, check_interval=0)
+        first = store.get()
+
+        with open(temp_orders_file, 'w') as f:
+            f.write('[{"invalid": json')
+
+        assert store.get() is first
+        assert store.version == 1
+
+    def test_initial_load_failure_raises(self):
+        store = DataStore("arquivo_inexistente.json", OrderService)
+
+        with pytest.raises(FileNotFoundError):
+            store.get()
+
+    def test_invalidate_forces_reload(self, temp_orders_file):
+        store = DataStore(temp_orders_file, OrderService, check_interval=3600)
+        first = store.get()
+
+        store.invalidate()
+
+        assert store.get() is not first
+        assert store.version == 2
+
+    def test_background_reload_serves_previous_value(self, temp_orders_file, sample_orders_data):
+        store = DataStore(temp_orders_file, partial(OrderService, background=True), check_interval=0, background=True)
+        first = store.get()
+        first.loaded.wait(5)
+
+        self._rewrite(temp_orders_file, sample_orders_data[:1])
+
+        assert store.get() is first
+        for _ in range(100):
+            if store.version == 2:
+                break
+            time.sleep(0.05)
+
+        second = store.get()
+        assert store.version == 2
+        assert second is not first
+        assert len(second.orders) == 1
+
+    def test_failed_background_load_retried_and_not_cached(self, temp_orders_file):
+        # The first service fails to load in background, the retry loads the unchanged file
+        paths = iter(["arquivo_inexistente.json", temp_orders_file])
+        store = DataStore(temp_orders_file, lambda _: OrderService(next(paths), background=True), check_interval=0, background=True)
+        cache = ResponseCache(max_size=10, ttl=60)
+        calls = []
+
+        @cached_tool(store, cache=cache)
+        def tool() -> str:
+            calls.append(1)
+            return json.dumps({"orders": len(store.get().orders)})
+
+        failed = store.get()
+        assert failed.loaded.wait(5)
+        assert store.failed
+        assert store.data_version.endswith("-failed")
+        tool()
+        tool()
+        assert len(calls) == 2
+
+        for _ in range(100):
+            if store.version == 2:
+                break
+            time.sleep(0.05)
+
+        assert store.get() is not failed
+        assert not store.failed
+        assert json.loads(tool()) == {"orders": 2}
@@ -0,0 +1,53 @@
+import pytest
+import io
+import json
+from service.json_stream import iter_json_batches, iter_json_records
+
+
+class TestJsonStream:
+
+    @pytest.fixture
+    def records(self):
+        return [
+            {"id": 1, "customerName": "Vinicius Finger", "amount": 350.25},
+            {"id": 2, "customerName": "Cauê Finger", "amount": 12345678},
+            {"id": 3, "customerName": "João [Silva], \"Jr\"", "amount": -0.5},
+            {"id": 4, "customerName": "Maria Silva", "amount": 1e3}
+        ]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+    def test_json_array(self, records, chunk_size):
+        content = json.dumps(records, indent=2)
+
+        assert list(iter_json_records(io.StringIO(content), chunk_size)) == records
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 65536])
+    def test_json_lines(self, records, chunk_size):
+        content = "\n".join(json.dumps(record) for record in records) + "\n"
+
+        assert list(iter_json_records(io.StringIO(content), chunk_size)) == records
+
+    @pytest.mark.parametrize("content", ["[]", " [ ] \n", "[\n]"])
+    def test_empty_array(self, content):
+        assert list(iter_json_records(io.StringIO(content), 1)) == []
+
+    @pytest.mark.parametrize("content", [
+        "",
+        "   ",
+        '{"invalid": json}',
+        '[{"id": 1}',
+        '[{"id": 1} {"id": 2}]',
+        '[{"id": 1},]',
+        '[{"id": 1}] trailing'
+    ])
+    def test_invalid_json(self, content):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_records(io.StringIO(content), 4))
+
+    def test_batches(self, records):
+        content = json.dumps(records)
+
+        batches = list(iter_json_batches(io.StringIO(content), batch_size=3, chunk_size=8))
+
+        assert [len(batch) for batch in batches] == [3, 1]
+        assert batches[0] + batches[1] == records
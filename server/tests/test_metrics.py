@@ -0,0 +1,109 @@
+import pytest
+import asyncio
+import json
+import os
+import tempfile
+from service.data_store import DataStore
+from service.metrics import MetricsRegistry, metrics
+from service.order_service import OrderService
+
+
+class TestMetricsRegistry:
+
+    def test_render_counters_and_gauges(self):
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls")
+        registry.gauge("pending", "Pending", collect=lambda: {(): 3})
+
+        registry.inc("calls_total", tool="b")
+        registry.inc("calls_total", tool="a")
+        registry.inc("calls_total", tool="a")
+
+        assert registry.render() == (
+            "# HELP calls_total Calls\n"
+            "# TYPE calls_total counter\n"
+            'calls_total{tool="a"} 2\n'
+            'calls_total{tool="b"} 1\n'
+            "# HELP pending Pending\n"
+            "# TYPE pending gauge\n"
+            "pending 3\n"
+        )
+
+    def test_render_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        registry.histogram("duration_seconds", "Duration", buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 0.5, 2.0):
+            registry.observe("duration_seconds", value, tool="slow")
+
+        lines = registry.render().splitlines()
+
+        assert lines[2:] == [
+            'duration_seconds_bucket{tool="slow",le="0.1"} 1',
+            'duration_seconds_bucket{tool="slow",le="1"} 3',
+            'duration_seconds_bucket{tool="slow",le="+Inf"} 4',
+            'duration_seconds_sum{tool="slow"} 3.05',
+            'duration_seconds_count{tool="slow"} 4'
+        ]
+
+    def test_label_values_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls")
+
+        registry.inc("calls_total", tool='say "hi"\\\n')
+
+        assert 'calls_total{tool="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+class TestInstrumentation:
+
+    @pytest.fixture
+    def temp_orders_file(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([{"id": 1, "customerId": 1, "customerName": "Vinicius Finger", "date": "2025-03-05T14:30:00Z", "amount": 350.25}], f)
+            temp_file_path = f.name
+
+        yield temp_file_path
+
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+    def test_data_store_load_recorded(self, temp_orders_file):
+        store = DataStore(temp_orders_file, OrderService, check_interval=0, name="test_orders")
+
+        store.get()
+
+        rendered = metrics.render()
+        assert 'data_store_version{store="test_orders"} 1' in rendered
+        assert 'data_store_load_seconds_count{store="test_orders"} 1' in rendered
+
+    def test_tool_calls_errors_and_latency_recorded(self):
+        from tools.instrumentation import instrumented
+
+        @instrumented
+        async def instrumented_test_tool(fail: bool = False) -> str:
+            if fail:
+                raise ValueError("failed")
+            return "{}"
+
+        asyncio.run(instrumented_test_tool())
+        with pytest.raises(ValueError):
+            asyncio.run(instrumented_test_tool(fail=True))
+
+        rendered = metrics.render()
+        assert 'mcp_tool_calls_total{tool="instrumented_test_tool"} 2' in rendered
+        assert 'mcp_tool_errors_total{tool="instrumented_test_tool"} 1' in rendered
+        assert 'mcp_tool_duration_seconds_count{tool="instrumented_test_tool"} 2' in rendered
+
+    def test_metrics_route(self):
+        from starlette.testclient import TestClient
+        from server import mcp
+        import tools.instrumentation
+
+        with TestClient(mcp.streamable_http_app()) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE mcp_tool_duration_seconds histogram" in response.text
+        assert "mcp_tool_pending 0" in response.text
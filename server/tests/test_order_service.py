@@ -2,11 +2,12 @@ import pytest
 import json
 import tempfile
 import os
+import threading
 from datetime import datetime
 from decimal import Decimal
 from unittest.mock import patch, mock_open
-from service.order_service import OrderService
-from model.order import Order
+from service.order_service import OrderService, iso_month_range, parse_date_range
+from model.order import Order, OrderRecord
 
 
 class TestOrderService:
@@ -77,7 +78,7 @@ class TestOrderService:
         service = OrderService(temp_orders_file)
         
         assert len(service.orders) == 5
-        assert all(isinstance(order, Order) for order in service.orders)
+        assert all(isinstance(order, OrderRecord) for order in service.orders)
         
         first_order = service.orders[0]
         assert first_order.id == 1
@@ -435,4 +436,277 @@ class TestOrderService:
             assert result[0]["spend"] == 2000000.0  # 999999.99 + 1000000.01
         finally:
             if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path) 
\ No newline at end of file
+                os.unlink(temp_file_path) 
+
+    def test_indexes_built_on_load(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        assert [order.id for order in service.get_orders_by_customer_name("Vinicius Finger")] == [1, 2, 5]
+        assert service.get_orders_by_customer_name("Cliente Inexistente") == []
+        assert service.customer_ids_by_name["Cauê Finger"] == {2}
+        assert service.order_count_by_customer_and_month[(1, "2025-03")] == 2
+        assert service.order_count_by_customer_and_month[(2, "2025-04")] == 1
+
+    def test_add_orders_updates_indexes(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        service.add_orders([
+            Order(id=6, customer_id=1, customer_name="Vinicius Finger", date="2025-03-28T10:00:00Z", amount=10),
+            Order(id=7, customer_id=3, customer_name="João Silva", date="2025-03-01T10:00:00Z", amount=20)
+        ])
+
+        assert len(service.orders) == 7
+        assert service.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 3
+        assert service.get_order_count_by_customer_and_month("João Silva", "2025-03") == 1
+        assert [order.id for order in service.get_orders_by_customer_name("João Silva")] == [7]
+        assert service.calculate_aggregate_spending_for_customers([3]) == [{"customerId": 3, "spend": 20.0}]
+
+    def test_load_orders_in_background(self, temp_orders_file):
+        service = OrderService(temp_orders_file, background=True)
+
+        assert service.loaded.wait(5)
+        assert service.load_error is None
+        assert len(service.orders) == 5
+        assert service.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 2
+
+    def test_date_index_complete_after_reads_during_background_load(self):
+        orders = [
+            {"id": i, "customerId": i % 50, "customerName": f"Customer {i % 50}", "date": f"2025-03-{i % 28 + 1:02d}T10:00:00Z", "amount": 1.5}
+            for i in range(20_000)
+        ]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(orders, f)
+            temp_file_path = f.name
+        start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2026-01-01T00:00:00+00:00")
+
+        def read(service):
+            while not service.loaded.is_set():
+                service.aggregate_orders(start, end)
+
+        try:
+            with patch.object(OrderService.load_orders_incrementally, "__defaults__", (300,)):
+                service = OrderService(temp_file_path, background=True)
+                readers = [threading.Thread(target=read, args=(service,)) for _ in range(4)]
+                for reader in readers:
+                    reader.start()
+                for reader in readers:
+                    reader.join(30)
+        finally:
+            os.unlink(temp_file_path)
+
+        assert service.load_error is None
+        assert service.aggregate_orders(start, end) == [{"count": 20_000, "value": 20_000}]
+
+    def test_spend_scale_consistent_during_background_load(self):
+        # Each batch has one more decimal place than the previous one, so every batch rescales the totals
+        orders = [
+            {"id": i, "customerId": i % 5_000, "customerName": f"Customer {i % 5_000}", "date": "2025-03-05T14:30:00Z", "amount": f"0.{'0' * (i // 3_000)}1"}
+            for i in range(30_000)
+        ]
+        total = float(sum(Decimal(order["amount"]) for order in orders if order["customerId"] == 1))
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(orders, f)
+            temp_file_path = f.name
+
+        bad_reads = []
+
+        def read(service):
+            while not service.loaded.is_set():
+                spend = service.calculate_aggregate_spending_for_customers([1])[0]["spend"]
+                monthly_spend = service.get_customer_spend_by_month(1, "2025-03")
+                # A total read with the previous scale is at least ten times too large
+                if spend > total * 2 or monthly_spend > total * 2:
+                    bad_reads.append((spend, monthly_spend))
+
+        try:
+            with patch.object(OrderService.load_orders_incrementally, "__defaults__", (3_000,)):
+                service = OrderService(temp_file_path, background=True)
+                readers = [threading.Thread(target=read, args=(service,)) for _ in range(4)]
+                for reader in readers:
+                    reader.start()
+                for reader in readers:
+                    reader.join(30)
+        finally:
+            os.unlink(temp_file_path)
+
+        assert service.load_error is None
+        assert bad_reads == []
+        assert service.calculate_aggregate_spending_for_customers([1]) == [{"customerId": 1, "spend": total}]
+
+    def test_load_orders_in_background_failure(self):
+        service = OrderService("arquivo_inexistente.json", background=True)
+
+        assert service.loaded.wait(5)
+        assert isinstance(service.load_error, FileNotFoundError)
+        assert service.orders == []
+
+    def test_load_orders_incrementally_in_batches(self, temp_orders_file):
+        with patch('builtins.open', mock_open(read_data='[]')):
+            service = OrderService()
+
+        service.load_orders_incrementally(temp_orders_file, batch_size=2)
+
+        assert [order.id for order in service.orders] == [1, 2, 3, 4, 5]
+        assert service.get_order_count_by_customer_and_month("Cauê Finger", "2025-04") == 1
+        assert service.loaded.is_set()
+
+    def test_materialized_spend_totals(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        assert service.amount_scale == 2
+        assert service.spend_by_customer == {1: 104650, 2: 87550}
+        assert service.get_customer_spend_by_month(1, "2025-03") == 770.75
+        assert service.get_customer_spend_by_month(2, "2025-04") == 485.20
+        assert service.get_customer_spend_by_month(2, "2025-03") == 0.0
+
+    def test_materialized_spend_totals_updated_incrementally(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        service.add_orders([
+            Order(id=6, customer_id=2, customer_name="Cauê Finger", date="2025-04-20T10:00:00Z", amount="14.80")
+        ])
+
+        assert service.calculate_aggregate_spending_for_customers([2]) == [{"customerId": 2, "spend": 890.30}]
+        assert service.get_customer_spend_by_month(2, "2025-04") == 500.0
+
+    def test_spend_totals_rescaled_for_finer_amounts(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        service.add_orders([
+            Order(id=6, customer_id=2, customer_name="Cauê Finger", date="2025-04-20T10:00:00Z", amount="0.125")
+        ])
+
+        assert service.amount_scale == 3
+        assert service.spend_by_customer == {1: 1046500, 2: 875625}
+        assert service.get_customer_spend_by_month(2, "2025-04") == 485.325
+
+    def test_order_record_round_trip(self):
+        order = Order(id=6, customer_id=2, customer_name="Cauê Finger", date="2025-03-31T22:30:00-03:00", amount="14.80")
+
+        record = OrderRecord.from_order(order)
+
+        assert (record.timestamp, record.utc_offset, record.amount_units, record.amount_scale) == (1743471000, -10800, 1480, 2)
+        assert record.iso_month == "2025-03"
+        assert record.iso_day == "2025-03-31"
+        assert record.to_model() == order
+        assert OrderRecord.from_order(record) is record
+        assert not hasattr(record, "__dict__")
+
+    def test_get_order_counts_by_customers_and_months(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        counts = service.get_order_counts_by_customers_and_months(
+            ["Vinicius Finger", "Cauê Finger", "Cliente Inexistente"],
+            ["2025-02", "2025-03", "2025-04"]
+        )
+
+        assert counts == {
+            "Vinicius Finger": {"2025-02": 0, "2025-03": 2, "2025-04": 0},
+            "Cauê Finger": {"2025-02": 1, "2025-03": 0, "2025-04": 1},
+            "Cliente Inexistente": {"2025-02": 0, "2025-03": 0, "2025-04": 0}
+        }
+        for customer_name, counts_by_month in counts.items():
+            for month, count in counts_by_month.items():
+                assert count == service.get_order_count_by_customer_and_month(customer_name, month)
+
+    @pytest.mark.parametrize("start_month,end_month,expected", [
+        ("2025-01", "2025-03", ["2025-01", "2025-02", "2025-03"]),
+        ("2024-11", "2025-02", ["2024-11", "2024-12", "2025-01", "2025-02"]),
+        ("2025-03", "2025-03", ["2025-03"]),
+        ("2025-04", "2025-03", None),
+        ("2025-3", "2025-04", None),
+        ("2015-01", "2025-01", None)
+    ])
+    def test_iso_month_range(self, start_month, end_month, expected):
+        assert iso_month_range(start_month, end_month) == expected
+
+    def test_get_orders_between_uses_utc_range(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+
+        orders = service.get_orders_between(
+            datetime.fromisoformat("2025-03-01T00:00:00+00:00"),
+            datetime.fromisoformat("2025-04-02T13:50:00+00:00")
+        )
+
+        assert [order.id for order in orders] == [1, 2]
+
+    @pytest.mark.parametrize("metric,group_by,expected", [
+        ("count", None, [{"count": 3, "value": 3}]),
+        ("sum", None, [{"count": 3, "value": 1255.95}]),
+        ("avg", "customer", [
+            {"customerId": 1, "customerName": "Vinicius Finger", "count": 2, "value": 385.375},
+            {"customerId": 2, "customerName": "Cauê Finger", "count": 1, "value": 485.20}
+        ]),
+        ("max", "month", [{"month": "2025-03", "count": 2, "value": 420.50}, {"month": "2025-04", "count": 1, "value": 485.20}]),
+        ("min", "day", [
+            {"day": "2025-03-05", "count": 1, "value": 350.25},
+            {"day": "2025-03-18", "count": 1, "value": 420.50},
+            {"day": "2025-04-02", "count": 1, "value": 485.20}
+        ]),
+        ("sum", "country", [{"country": "Brazil", "count": 2, "value": 770.75}, {"country": "Unknown", "count": 1, "value": 485.20}])
+    ])
+    def test_aggregate_orders(self, temp_orders_file, metric, group_by, expected):
+        service = OrderService(temp_orders_file)
+
+        results = service.aggregate_orders(
+            datetime.fromisoformat("2025-03-01T00:00:00+00:00"),
+            datetime.fromisoformat("2025-05-01T00:00:00+00:00"),
+            metric,
+            group_by,
+            country_by_customer_id={1: "Brazil"}
+        )
+
+        assert results == expected
+
+    def test_aggregate_orders_empty_range(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+        start = datetime.fromisoformat("2026-01-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2026-02-01T00:00:00+00:00")
+
+        assert service.aggregate_orders(start, end, "sum") == [{"count": 0, "value": 0}]
+        assert service.aggregate_orders(start, end, "avg") == [{"count": 0, "value": None}]
+        assert service.aggregate_orders(start, end, "count", "month") == []
+
+    def test_aggregate_orders_invalid_arguments(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+        start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2026-01-01T00:00:00+00:00")
+
+        with pytest.raises(ValueError):
+            service.aggregate_orders(start, end, "median")
+        with pytest.raises(ValueError):
+            service.aggregate_orders(start, end, "count", "year")
+        with pytest.raises(ValueError):
+            service.aggregate_orders(start, end, "count", "country")
+
+    def test_date_index_refreshed_after_add_orders(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+        start = datetime.fromisoformat("2025-01-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2025-02-01T00:00:00+00:00")
+        assert service.get_orders_between(start, end) == []
+
+        service.add_orders([
+            Order(id=6, customer_id=2, customer_name="Cauê Finger", date="2025-01-20T10:00:00Z", amount="14.80")
+        ])
+
+        assert [order.id for order in service.get_orders_between(start, end)] == [6]
+
+    @pytest.mark.parametrize("start_date,end_date,expected", [
+        ("2025-01-01", "2025-03-31", ("2025-01-01T00:00:00+00:00", "2025-04-01T00:00:00+00:00")),
+        ("2025-03-31", "2025-03-31", ("2025-03-31T00:00:00+00:00", "2025-04-01T00:00:00+00:00")),
+        ("2025-01-01T00:00:00-03:00", "2025-01-02T00:00:00-03:00", None),
+        ("2025-01-01", "2025-03-31T23:59:59", None),
+        ("20250101", "20250331", None),
+        ("2025-W01-1", "2025-03-31", None),
+        ("2025-03-31", "2025-01-01", None),
+        ("2025-13-01", "2025-12-31", None),
+        ("", "2025-12-31", None)
+    ])
+    def test_parse_date_range(self, start_date, end_date, expected):
+        result = parse_date_range(start_date, end_date)
+
+        if expected is None:
+            assert result is None
+        else:
+            assert tuple(value.isoformat() for value in result) == expected
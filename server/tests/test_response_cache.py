@@ -0,0 +1,125 @@
+import pytest
+import json
+import tempfile
+import os
+from unittest.mock import patch
+from service.data_store import DataStore
+from service.order_service import OrderService
+from tools.response_cache import ResponseCache, cached_tool
+
+
+class TestResponseCache:
+
+    @pytest.fixture
+    def temp_orders_file(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([], f)
+            temp_file_path = f.name
+
+        yield temp_file_path
+
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+    @pytest.fixture
+    def store(self, temp_orders_file):
+        return DataStore(temp_orders_file, OrderService, check_interval=3600)
+
+    def _counting_tool(self, store, cache):
+        calls = []
+
+        @cached_tool(store, cache=cache)
+        def tool(customer_name: str, limit: int = 10) -> str:
+            calls.append((customer_name, limit))
+            return json.dumps({"calls": len(calls)})
+
+        return tool, calls
+
+    def test_hit_for_identical_arguments(self, store):
+        cache = ResponseCache(max_size=10, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        assert tool("John Doe") == tool("John Doe")
+        assert tool(customer_name="John Doe", limit=10) == tool("John Doe")
+        assert len(calls) == 1
+        assert cache.stats() == {"size": 1, "hits": 3, "misses": 1, "evictions": 0, "invalidations": 0}
+
+    def test_miss_for_different_arguments(self, store):
+        cache = ResponseCache(max_size=10, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        tool("John Doe")
+        tool("John Doe", 5)
+        tool("Jane Smith")
+
+        assert len(calls) == 3
+
+    def test_lru_eviction(self, store):
+        cache = ResponseCache(max_size=2, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        tool("a")
+        tool("b")
+        tool("a")
+        tool("c")
+        tool("a")
+        tool("b")
+
+        assert calls == [("a", 10), ("b", 10), ("c", 10), ("b", 10)]
+        assert cache.evictions == 2
+
+    def test_ttl_expiration(self, store):
+        cache = ResponseCache(max_size=10, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        with patch('tools.response_cache.time.monotonic', return_value=1000.0):
+            tool("John Doe")
+        with patch('tools.response_cache.time.monotonic', return_value=1059.0):
+            tool("John Doe")
+        with patch('tools.response_cache.time.monotonic', return_value=1061.0):
+            tool("John Doe")
+
+        assert len(calls) == 2
+
+    def test_invalidated_when_store_reloads(self, store):
+        cache = ResponseCache(max_size=10, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        tool("John Doe")
+        store.invalidate()
+        tool("John Doe")
+
+        assert len(calls) == 2
+        assert cache.invalidations == 1
+
+    def test_not_cached_while_store_loading(self, temp_orders_file):
+        service = OrderService(temp_orders_file)
+        service.loaded.clear()
+        store = DataStore(temp_orders_file, lambda file_path: service, check_interval=3600)
+        cache = ResponseCache(max_size=10, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        tool("John Doe")
+        tool("John Doe")
+        service.loaded.set()
+        tool("John Doe")
+        tool("John Doe")
+
+        assert len(calls) == 3
+        assert cache.stats()["size"] == 1
+
+    def test_disabled_cache(self, store):
+        cache = ResponseCache(max_size=0, ttl=60)
+        tool, calls = self._counting_tool(store, cache)
+
+        tool("John Doe")
+        tool("John Doe")
+
+        assert len(calls) == 2
+        assert cache.stats()["hits"] == 0
+
+    def test_wrapper_keeps_tool_signature(self, store):
+        tool, _ = self._counting_tool(store, ResponseCache())
+
+        assert tool.__name__ == "tool"
+        assert list(tool.__wrapped__.__code__.co_varnames[:2]) == ["customer_name", "limit"]
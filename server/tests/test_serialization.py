@@ -0,0 +1,51 @@
+import json
+from model.customer import Customer, CustomerRecord
+from tools import serialization
+from tools.serialization import dumps, tabulate
+
+
+class TestSerialization:
+
+    def test_dumps_without_whitespace(self):
+        assert dumps({"customers": [{"id": 1, "name": "Cauê Finger"}]}, compact=False) == '{"customers":[{"id":1,"name":"Cauê Finger"}]}'
+
+    def test_fallback_matches_orjson(self, monkeypatch):
+        value = {"customers": [{"id": 1, "name": "Cauê Finger", "totalSpend": 875.5}], "status": None}
+        fast = dumps(value, compact=False)
+
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        assert dumps(value, compact=False) == fast
+        assert json.loads(fast) == value
+
+    def test_tabulate_lists_of_objects(self):
+        value = {"customers": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}], "count": 2}
+
+        assert tabulate(value) == {"customers": {"columns": ["id", "name"], "rows": [[1, "A"], [2, "B"]]}, "count": 2}
+
+    def test_tabulate_keeps_mixed_and_single_item_lists(self):
+        mixed = [{"name": "A", "customerId": 1}, {"name": "B", "status": "customer_not_found", "candidates": []}]
+
+        assert tabulate(mixed) == mixed
+        assert tabulate([{"id": 1}]) == [{"id": 1}]
+        assert tabulate([1, 2]) == [1, 2]
+
+    def test_compact_mode_produces_fewer_bytes(self):
+        value = {"customers": [{"id": i, "name": f"Customer {i}", "joinedAt": "2024-08-01T00:00:00+00:00"} for i in range(20)]}
+
+        compact = dumps(value, compact=True)
+
+        assert len(compact) < len(dumps(value, compact=False))
+        assert json.loads(compact)["customers"]["columns"] == ["id", "name", "joinedAt"]
+
+    def test_joined_at_iso_keeps_microseconds(self):
+        for joined_at in ("2024-08-01T00:00:00.750000-03:00", "2024-08-01T00:00:00.000001", "1969-12-31T23:59:59.500000+00:00"):
+            record = CustomerRecord.from_customer(Customer(id=1, name="Ana Souza", country="Brazil", joined_at=joined_at))
+
+            assert record.joined_at_iso == joined_at
+
+    def test_joined_at_iso_cached_on_record(self):
+        record = CustomerRecord.from_customer(Customer(id=1, name="Ana Souza", country="Brazil", joined_at="2024-08-01T00:00:00-03:00"))
+
+        assert record.joined_at_iso == "2024-08-01T00:00:00-03:00"
+        assert record.joined_at_iso is record.joined_at_iso
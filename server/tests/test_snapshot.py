@@ -0,0 +1,237 @@
+import pytest
+import json
+import tempfile
+import os
+from datetime import datetime
+from model.customer import CustomerRecord
+from service.customer_service import CustomerService
+from service.order_service import OrderService
+
+np = pytest.importorskip("numpy")
+
+from service.snapshot import Snapshot, write_customers_snapshot, write_orders_snapshot
+
+
+class TestSnapshot:
+
+    @pytest.fixture
+    def sample_orders_data(self):
+        return [
+            {
+                "id": 1,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-05T14:30:00Z",
+                "amount": 350.25
+            },
+            {
+                "id": 2,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-18T09:45:00-03:00",
+                "amount": 420.5
+            },
+            {
+                "id": 3,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-02-15T11:15:00.250000Z",
+                "amount": 100.123456
+            }
+        ]
+
+    @pytest.fixture
+    def sample_customers_data(self):
+        return [
+            {
+                "id": 1,
+                "name": "Vinicius Finger",
+                "country": "Brazil",
+                "joinedAt": "2024-01-15T10:30:00Z"
+            },
+            {
+                "id": 2,
+                "name": "Cauê Finger",
+                "country": "Brazil",
+                "joinedAt": "2024-02-20T14:45:00.500000+02:00"
+            },
+            {
+                "id": 3,
+                "name": "Pierre Dupont",
+                "country": "France",
+                "joinedAt": "2024-05-12T11:00:00Z"
+            },
+            {
+                "id": 4,
+                "name": "Ana Souza",
+                "country": "Brazil",
+                "joinedAt": "2024-02-20T14:45:00.750000+02:00"
+            }
+        ]
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.fixture
+    def orders_files(self, temp_dir, sample_orders_data):
+        json_path = os.path.join(temp_dir, "orders.json")
+        with open(json_path, "w") as f:
+            json.dump(sample_orders_data, f)
+
+        snapshot_path = os.path.join(temp_dir, "orders.snapshot")
+        write_orders_snapshot(OrderService(json_path).orders, snapshot_path)
+        return json_path, snapshot_path
+
+    @pytest.fixture
+    def customers_files(self, temp_dir, sample_customers_data):
+        json_path = os.path.join(temp_dir, "customers.json")
+        with open(json_path, "w") as f:
+            json.dump(sample_customers_data, f)
+
+        snapshot_path = os.path.join(temp_dir, "customers.snapshot")
+        write_customers_snapshot(CustomerService(json_path).customers, snapshot_path)
+        return json_path, snapshot_path
+
+    def test_columns_are_memory_mapped(self, orders_files):
+        _, snapshot_path = orders_files
+
+        snapshot = Snapshot(snapshot_path)
+        customer_ids = snapshot.column("customerId")
+
+        assert customer_ids.tolist() == [1, 1, 2]
+        assert not customer_ids.flags.writeable
+        assert list(snapshot.strings("customerNames")) == ["Vinicius Finger", "Cauê Finger"]
+        assert snapshot.meta == {"kind": "orders", "count": 3, "scale": 6}
+
+    def test_orders_round_trip(self, orders_files):
+        json_path, snapshot_path = orders_files
+
+        expected = OrderService(json_path).orders
+        orders = OrderService(snapshot_path).orders
+
+        assert len(orders) == 3
+        assert [order.to_model().model_dump() for order in orders] == [order.to_model().model_dump() for order in expected]
+        assert orders[1].date.utcoffset().total_seconds() == -3 * 3600
+        assert orders[2].date.isoformat() == "2025-02-15T11:15:00.250000+00:00"
+
+    def test_order_queries_match_json_service(self, orders_files):
+        json_path, snapshot_path = orders_files
+        json_service = OrderService(json_path)
+        snapshot_service = OrderService(snapshot_path)
+
+        assert not snapshot_service.indexed
+        assert snapshot_service.calculate_aggregate_spending_for_customers([2, 1, 999]) == json_service.calculate_aggregate_spending_for_customers([2, 1, 999])
+        assert snapshot_service.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 2
+        assert [order.id for order in snapshot_service.get_orders_by_customer_name("Vinicius Finger")] == [1, 2]
+
+    @pytest.mark.parametrize("metric,group_by", [
+        ("count", None), ("sum", "customer"), ("avg", "day"), ("min", "month"), ("max", "country")
+    ])
+    def test_aggregate_orders_match_json_service(self, orders_files, metric, group_by):
+        json_path, snapshot_path = orders_files
+        arguments = (datetime.fromisoformat("2025-02-15T11:15:00+00:00"), datetime.fromisoformat("2025-03-18T12:45:00+00:00"), metric, group_by, {2: "Brazil"})
+
+        snapshot_service = OrderService(snapshot_path)
+
+        assert snapshot_service.aggregate_orders(*arguments) == OrderService(json_path).aggregate_orders(*arguments)
+        assert snapshot_service.orders_by_date is None
+
+    def test_date_order_is_stored(self, orders_files):
+        _, snapshot_path = orders_files
+
+        store = OrderService(snapshot_path).repository
+
+        assert store.date_order.tolist() == [2, 0, 1]
+        assert not store.date_order.flags.writeable
+
+    def test_add_orders_to_snapshot_service(self, orders_files, sample_orders_data):
+        _, snapshot_path = orders_files
+        service = OrderService(snapshot_path)
+
+        service.add_orders(OrderService(orders_files[0]).orders[:1])
+
+        assert service.indexed
+        assert len(service.orders) == 4
+        assert service.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 3
+
+    def test_customers_round_trip(self, customers_files):
+        json_path, snapshot_path = customers_files
+
+        expected = CustomerService(json_path)
+        service = CustomerService(snapshot_path)
+
+        assert [customer.to_model().model_dump() for customer in service.customers] == [customer.to_model().model_dump() for customer in expected.customers]
+        # Customers 2 and 4 joined in the same second, 4 later within it
+        assert [customer.id for customer in service.list_recent_customers_by_country("Brazil")] == [4, 2, 1]
+        assert service.customers[3].joined_at_iso == "2024-02-20T14:45:00.750000+02:00"
+        assert service.get_customer_id_by_name("pierre dupont") == 3
+
+    @pytest.mark.parametrize("country,limit,case_sensitive", [
+        ("Brazil", 10, True), ("Brazil", 1, True), ("brazil", 10, True), ("  BRAZIL ", 10, False),
+        ("France", 10, True), ("Brazil", -1, True), ("Brazil", 0, True), ("Narnia", 10, False)
+    ])
+    def test_customers_by_country_match_json_service(self, customers_files, country, limit, case_sensitive):
+        json_path, snapshot_path = customers_files
+
+        expected = CustomerService(json_path).list_recent_customers_by_country(country, limit, case_sensitive)
+        result = CustomerService(snapshot_path).list_recent_customers_by_country(country, limit, case_sensitive)
+
+        assert [customer.id for customer in result] == [customer.id for customer in expected]
+
+    @pytest.mark.parametrize("customer_name", ["Vinicius Finger", "vinicius  FINGER", "Cauê", "Pierre", "Nobody", ""])
+    def test_customer_name_lookups_match_json_service(self, customers_files, customer_name):
+        json_path, snapshot_path = customers_files
+        json_service = CustomerService(json_path)
+        snapshot_service = CustomerService(snapshot_path)
+
+        expected = [(customer.id, similarity) for customer, similarity in json_service.find_customers_by_name(customer_name, limit=2, min_similarity=0.1)]
+
+        assert snapshot_service.get_customer_id_by_name(customer_name) == json_service.get_customer_id_by_name(customer_name)
+        assert [(customer.id, similarity) for customer, similarity in snapshot_service.find_customers_by_name(customer_name, limit=2, min_similarity=0.1)] == expected
+
+    def test_snapshot_customers_stay_mapped(self, customers_files):
+        json_path, snapshot_path = customers_files
+        service = CustomerService(snapshot_path)
+
+        assert service.get_country_by_customer_id() == CustomerService(json_path).get_country_by_customer_id()
+        assert service.customers_by_country == {}
+        assert service.customer_positions_by_trigram == {}
+
+    def test_add_customers_to_snapshot_service(self, customers_files):
+        _, snapshot_path = customers_files
+        service = CustomerService(snapshot_path)
+
+        service.add_customers([CustomerRecord(5, "Joana Lima", "Brazil", 1735689600, 0, 0)])
+
+        assert service.repository is None
+        assert len(service.customers) == 5
+        assert [customer.id for customer in service.list_recent_customers_by_country("Brazil")] == [5, 4, 2, 1]
+        assert service.get_customer_id_by_name("Pierre Dupont") == 3
+
+    def test_rewrite_keeps_existing_mapping_valid(self, orders_files):
+        json_path, snapshot_path = orders_files
+        snapshot = Snapshot(snapshot_path)
+
+        write_orders_snapshot(OrderService(json_path).orders[:1], snapshot_path)
+
+        assert snapshot.column("customerId").tolist() == [1, 1, 2]
+        assert Snapshot(snapshot_path).column("customerId").tolist() == [1]
+
+    def test_empty_snapshot(self, temp_dir):
+        snapshot_path = os.path.join(temp_dir, "orders.snapshot")
+        write_orders_snapshot([], snapshot_path)
+
+        service = OrderService(snapshot_path)
+
+        assert len(service.orders) == 0
+        assert service.calculate_aggregate_spending_for_customers([1]) == [{"customerId": 1, "spend": 0.0}]
+
+    def test_not_a_snapshot(self, temp_dir):
+        snapshot_path = os.path.join(temp_dir, "orders.snapshot")
+        with open(snapshot_path, "wb") as f:
+            f.write(b"[" + b" " * 64 + b"]")
+
+        with pytest.raises(ValueError):
+            OrderService(snapshot_path)
@@ -0,0 +1,209 @@
+import pytest
+import json
+import tempfile
+import os
+from datetime import datetime
+from decimal import Decimal
+from service.customer_service import CustomerService
+from service.order_service import OrderService
+from service.sqlite_repository import write_sqlite_database
+from model.customer import Customer
+from model.order import Order
+
+
+class TestSqliteRepository:
+
+    @pytest.fixture
+    def sample_orders_data(self):
+        return [
+            {
+                "id": 1,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-05T14:30:00Z",
+                "amount": 350.25
+            },
+            {
+                "id": 2,
+                "customerId": 1,
+                "customerName": "Vinicius Finger",
+                "date": "2025-03-18T09:45:00Z",
+                "amount": 420.50
+            },
+            {
+                "id": 3,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-02-15T11:15:00Z",
+                "amount": 390.30
+            },
+            {
+                "id": 4,
+                "customerId": 2,
+                "customerName": "Cauê Finger",
+                "date": "2025-04-02T13:50:00-03:00",
+                "amount": 485.20
+            }
+        ]
+
+    @pytest.fixture
+    def sample_customers_data(self):
+        return [
+            {
+                "id": 1,
+                "name": "John Doe",
+                "country": "USA",
+                "joinedAt": "2024-01-15T10:30:00Z"
+            },
+            {
+                "id": 3,
+                "name": "Carlos Rodriguez",
+                "country": "Brazil",
+                "joinedAt": "2024-03-05T09:15:00Z"
+            },
+            {
+                "id": 4,
+                "name": "Maria Silva",
+                "country": "Brazil",
+                "joinedAt": "2024-04-10T16:20:00Z"
+            },
+            {
+                "id": 5,
+                "name": "Ronaldinho Gaucho",
+                "country": "Brazil",
+                "joinedAt": "2024-05-11T16:20:00Z"
+            }
+        ]
+
+    @pytest.fixture
+    def temp_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.fixture
+    def json_services(self, temp_dir, sample_orders_data, sample_customers_data):
+        orders_path = os.path.join(temp_dir, "orders.json")
+        customers_path = os.path.join(temp_dir, "customers.json")
+        with open(orders_path, "w") as f:
+            json.dump(sample_orders_data, f)
+        with open(customers_path, "w") as f:
+            json.dump(sample_customers_data, f)
+        return OrderService(orders_path), CustomerService(customers_path)
+
+    @pytest.fixture
+    def database_path(self, temp_dir, json_services):
+        order_service, customer_service = json_services
+        database_path = os.path.join(temp_dir, "store.sqlite")
+        write_sqlite_database(order_service.orders, customer_service.customers, database_path)
+        return database_path
+
+    def test_orders_round_trip(self, json_services, database_path):
+        service = OrderService(database_path)
+
+        assert not service.indexed
+        assert len(service.orders) == 4
+        assert [order.to_model().model_dump() for order in service.orders] == [order.to_model().model_dump() for order in json_services[0].orders]
+        assert service.orders[-1].id == 4
+        assert isinstance(service.orders[0].amount, Decimal)
+        assert isinstance(service.orders[0].date, datetime)
+
+    @pytest.mark.parametrize("customer_ids", [[1], [2, 1, 999], [1, 1, 2], []])
+    def test_aggregate_spending_matches_json_service(self, json_services, database_path, customer_ids):
+        service = OrderService(database_path)
+
+        expected = json_services[0].calculate_aggregate_spending_for_customers(customer_ids)
+
+        assert service.calculate_aggregate_spending_for_customers(customer_ids) == expected
+
+    @pytest.mark.parametrize("customer_name,month,expected", [
+        ("Vinicius Finger", "2025-03", 2),
+        ("Cauê Finger", "2025-04", 1),
+        ("Cauê Finger", "2025-03", 0),
+        ("vinicius finger", "2025-03", 0),
+        ("Vinicius Finger", "2025-3", 0)
+    ])
+    def test_order_count_by_customer_and_month(self, database_path, customer_name, month, expected):
+        service = OrderService(database_path)
+
+        assert service.get_order_count_by_customer_and_month(customer_name, month) == expected
+
+    def test_orders_by_customer_name(self, database_path):
+        service = OrderService(database_path)
+
+        assert [order.id for order in service.get_orders_by_customer_name("Cauê Finger")] == [3, 4]
+
+    def test_add_orders_persists_and_rescales(self, database_path):
+        service = OrderService(database_path)
+
+        service.add_orders([
+            Order(id=5, customer_id=1, customer_name="Vinicius Finger", date="2025-03-28T10:00:00Z", amount="0.125")
+        ])
+
+        reopened = OrderService(database_path)
+        assert len(reopened.orders) == 5
+        assert reopened.get_order_count_by_customer_and_month("Vinicius Finger", "2025-03") == 3
+        assert reopened.calculate_aggregate_spending_for_customers([1]) == [{"customerId": 1, "spend": 770.875}]
+
+    @pytest.mark.parametrize("metric", ["count", "sum", "avg", "min", "max"])
+    @pytest.mark.parametrize("group_by", [None, "customer", "day", "month", "country"])
+    @pytest.mark.parametrize("start,end", [
+        ("2025-01-01T00:00:00+00:00", "2026-01-01T00:00:00+00:00"),
+        ("2025-03-05T14:30:00+00:00", "2025-04-02T16:50:00+00:00"),
+        ("2026-01-01T00:00:00+00:00", "2026-02-01T00:00:00+00:00")
+    ])
+    def test_aggregate_orders_matches_json_service(self, json_services, database_path, metric, group_by, start, end):
+        arguments = (datetime.fromisoformat(start), datetime.fromisoformat(end), metric, group_by, {1: "Brazil", 2: "Brazil"})
+
+        expected = json_services[0].aggregate_orders(*arguments)
+
+        assert OrderService(database_path).aggregate_orders(*arguments) == expected
+
+    def test_aggregate_orders_after_add_orders(self, database_path):
+        service = OrderService(database_path)
+        start = datetime.fromisoformat("2025-03-01T00:00:00+00:00")
+        end = datetime.fromisoformat("2025-04-01T00:00:00+00:00")
+        assert service.aggregate_orders(start, end, "count") == [{"count": 2, "value": 2}]
+
+        service.add_orders([
+            Order(id=5, customer_id=1, customer_name="Vinicius Finger", date="2025-03-28T10:00:00Z", amount="0.125")
+        ])
+
+        assert service.aggregate_orders(start, end, "count") == [{"count": 3, "value": 3}]
+        assert service.aggregate_orders(start, end, "min", "customer") == [
+            {"customerId": 1, "customerName": "Vinicius Finger", "count": 3, "value": 0.125}
+        ]
+        assert service.orders_by_date is None
+
+    def test_list_recent_customers_by_country(self, json_services, database_path):
+        service = CustomerService(database_path)
+
+        for country, limit, case_sensitive in [("Brazil", 10, True), ("Brazil", 2, True), ("brazil", 10, True), ("BRAZIL", 10, False), ("Brazil", -1, True), ("Brazil", 0, True)]:
+            expected = json_services[1].list_recent_customers_by_country(country, limit, case_sensitive)
+            result = service.list_recent_customers_by_country(country, limit, case_sensitive)
+            assert [customer.id for customer in result] == [customer.id for customer in expected]
+
+    def test_get_customer_id_by_name(self, database_path):
+        service = CustomerService(database_path)
+
+        assert service.get_customer_id_by_name("Maria Silva") == 4
+        assert service.get_customer_id_by_name("  maria SILVA") == 4
+        assert service.get_customer_id_by_name("Cliente Inexistente") is None
+
+    def test_find_customers_by_name_matches_json_service(self, json_services, database_path):
+        service = CustomerService(database_path)
+
+        for name in ["Jon Doe", "Silva", "Ronaldo", "Xyzzy"]:
+            expected = json_services[1].find_customers_by_name(name)
+            result = service.find_customers_by_name(name)
+            assert [(customer.id, similarity) for customer, similarity in result] == [(customer.id, similarity) for customer, similarity in expected]
+
+    def test_add_customers(self, database_path):
+        service = CustomerService(database_path)
+
+        service.add_customers([
+            Customer(id=9, name="Ana Souza", country="Brazil", joined_at="2024-08-01T00:00:00Z")
+        ])
+
+        assert [customer.id for customer in service.list_recent_customers_by_country("Brazil", limit=2)] == [9, 5]
+        assert service.get_customer_id_by_name("ana souza") == 9
+        assert len(service.customers) == 5
@@ -0,0 +1,169 @@
+import pytest
+import asyncio
+import inspect
+import json
+import tempfile
+import os
+import threading
+import time
+from service.data_store import DataStore
+from service.order_service import OrderService
+from tools.response_cache import ResponseCache, cached_tool
+from tools.tool_executor import ToolBusyError, ToolExecutor, offloaded
+
+
+class TestToolExecutor:
+
+    def test_runs_off_the_event_loop(self):
+        executor = ToolExecutor(workers=2, max_pending=10, queue_timeout=1)
+
+        async def main():
+            loop_thread = threading.get_ident()
+            return loop_thread, await executor.run(threading.get_ident)
+
+        loop_thread, tool_thread = asyncio.run(main())
+        assert tool_thread != loop_thread
+
+    def test_event_loop_not_blocked_by_slow_tool(self):
+        executor = ToolExecutor(workers=2, max_pending=10, queue_timeout=1)
+
+        async def main():
+            ticks = []
+
+            async def ticker():
+                for _ in range(5):
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(executor.run(time.sleep, 0.1), ticker())
+            return ticks
+
+        ticks = asyncio.run(main())
+        assert ticks[-1] - ticks[0] < 0.09
+
+    def test_concurrency_limited_to_workers(self):
+        executor = ToolExecutor(workers=2, max_pending=10, queue_timeout=5)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def tool():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return "ok"
+
+        async def main():
+            return await asyncio.gather(*(executor.run(tool) for _ in range(6)))
+
+        assert asyncio.run(main()) == ["ok"] * 6
+        assert max(peak) == 2
+        assert executor.pending == 0
+
+    def test_rejects_when_too_many_pending(self):
+        executor = ToolExecutor(workers=1, max_pending=2, queue_timeout=5)
+
+        async def main():
+            return await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(4)), return_exceptions=True)
+
+        results = asyncio.run(main())
+        assert sum(isinstance(result, ToolBusyError) for result in results) == 2
+        assert executor.rejected == 2
+
+    def test_rejects_after_queue_timeout(self):
+        executor = ToolExecutor(workers=1, max_pending=10, queue_timeout=0.01)
+
+        async def main():
+            return await asyncio.gather(executor.run(time.sleep, 0.1), executor.run(time.sleep, 0), return_exceptions=True)
+
+        results = asyncio.run(main())
+        assert results[0] is None
+        assert isinstance(results[1], ToolBusyError)
+
+    def test_tool_exception_propagates(self):
+        executor = ToolExecutor(workers=1, max_pending=10, queue_timeout=1)
+
+        def tool():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            asyncio.run(executor.run(tool))
+        assert executor.pending == 0
+
+    def test_offloaded_tool(self):
+        executor = ToolExecutor(workers=1, max_pending=0, queue_timeout=1)
+
+        @offloaded(executor=ToolExecutor(workers=1, max_pending=10, queue_timeout=1))
+        def tool(customer_name: str, limit: int = 10) -> str:
+            return json.dumps({"name": customer_name, "limit": limit})
+
+        @offloaded(executor=executor)
+        def busy_tool() -> str:
+            return json.dumps({})
+
+        assert inspect.iscoroutinefunction(tool)
+        assert list(inspect.signature(tool).parameters) == ["customer_name", "limit"]
+        assert json.loads(asyncio.run(tool("John Doe"))) == {"name": "John Doe", "limit": 10}
+        assert json.loads(asyncio.run(busy_tool())) == {"status": "busy"}
+
+    def test_cache_hits_answered_on_the_event_loop(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([], f)
+            temp_file_path = f.name
+
+        try:
+            store = DataStore(temp_file_path, OrderService, check_interval=3600)
+            cache = ResponseCache(max_size=10, ttl=60)
+            executor = ToolExecutor(workers=1, max_pending=10, queue_timeout=1)
+            threads = []
+
+            @offloaded(executor=executor)
+            @cached_tool(store, cache=cache)
+            def tool(customer_name: str) -> str:
+                threads.append(threading.get_ident())
+                return json.dumps({"name": customer_name})
+
+            async def main():
+                first = await tool("John Doe")
+                # A saturated pool would answer busy if the hit still waited for a worker
+                executor.max_pending = 0
+                return first, await tool("John Doe"), await tool("Jane Smith")
+
+            first, second, other = asyncio.run(main())
+
+            assert first == second == json.dumps({"name": "John Doe"})
+            assert json.loads(other) == {"status": "busy"}
+            assert len(threads) == 1 and threads[0] != threading.get_ident()
+            assert cache.stats()["hits"] == 1
+            assert cache.stats()["misses"] == 1
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_cache_checked_off_the_loop_when_store_needs_a_check(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([], f)
+            temp_file_path = f.name
+
+        try:
+            store = DataStore(temp_file_path, OrderService, check_interval=0)
+            cache = ResponseCache(max_size=10, ttl=60)
+            calls = []
+
+            @offloaded(executor=ToolExecutor(workers=1, max_pending=10, queue_timeout=1))
+            @cached_tool(store, cache=cache)
+            def tool(customer_name: str) -> str:
+                calls.append(customer_name)
+                return json.dumps({"name": customer_name})
+
+            async def main():
+                return await tool("John Doe"), await tool("John Doe")
+
+            assert asyncio.run(main())[0] == json.dumps({"name": "John Doe"})
+            assert tool.cached_response("John Doe") is None
+            assert calls == ["John Doe"]
+            assert cache.stats()["hits"] == 1
+        finally:
+            os.unlink(temp_file_path)
@@ -1,18 +1,23 @@
-from service.customer_service import CustomerService
-from service.order_service import OrderService
+from service.data_store import customer_store, get_customer_service, get_order_service, order_store
+from tools.instrumentation import instrumented
+from tools.response_cache import cached_tool
+from tools.serialization import dumps
+from tools.tool_executor import offloaded
 from server import mcp
-import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(customer_store, order_store)
 def list_recent_customers_by_country(country: str, limit: int = 10) -> str:
     """
     List the top N (limit) most recent customers from a specific country
 
     Args:
-        country (str): The country to list customers from (case sensitive, first char of country is uppercase)
+        country (str): The country to list customers from (case insensitive)
         limit (int): The maximum number of customers to return (default: 10)
 
     Returns:
@@ -21,31 +26,37 @@ def list_recent_customers_by_country(country: str, limit: int = 10) -> str:
     logger.info(f"Listing recent customers by country: {country} with limit: {limit}")
 
     if not country:
-        return json.dumps({"status": "invalid_arguments"})
+        return dumps({"status": "invalid_arguments"})
 
-    order_service = OrderService()
-    customer_service = CustomerService()
+    order_service = get_order_service()
+    customer_service = get_customer_service()
 
-    recent_customers = customer_service.list_recent_customers_by_country(country, limit)
+    recent_customers = customer_service.list_recent_customers_by_country(country, limit, case_sensitive=False)
     logger.info(f"Found {len(recent_customers)} customers")
 
     customer_ids = [customer.id for customer in recent_customers]
-    totals = order_service.calculate_aggregate_spending_for_customers(customer_ids)
+    totals = {
+        total["customerId"]: total["spend"]
+        for total in order_service.calculate_aggregate_spending_for_customers(customer_ids)
+    }
     
     customers = [
         {
             "id": customer.id,
             "name": customer.name,
-            "joinedAt": customer.joined_at.isoformat(),
-            "totalSpend": totals[customer.id] if customer.id in totals else 0
+            "joinedAt": customer.joined_at_iso,
+            "totalSpend": totals.get(customer.id, 0)
         }
         for customer in recent_customers
     ]
 
-    return json.dumps({"customers": customers})
+    return dumps({"customers": customers})
 
 
 @mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(order_store)
 def get_customer_total_spend(customer_ids: list[int]) -> str:
     """
     Get the total spend for a list of customers
@@ -60,37 +71,91 @@ def get_customer_total_spend(customer_ids: list[int]) -> str:
     
     if not customer_ids:
         logger.warning("No customer IDs provided")
-        return json.dumps({"status": "invalid_arguments"})
+        return dumps({"status": "invalid_arguments"})
     
     for customer_id in customer_ids:
         if not isinstance(customer_id, int):
             logger.warning(f"Invalid customer ID type: {type(customer_id)} for ID: {customer_id}")
-            return json.dumps({"status": "invalid_arguments"})
+            return dumps({"status": "invalid_arguments"})
 
-    order_service = OrderService()
+    order_service = get_order_service()
     totals = order_service.calculate_aggregate_spending_for_customers(customer_ids)
     
     logger.info(f"Calculated totals: {totals}")
-    return json.dumps({"totals": totals})
+    return dumps({"totals": totals})
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(customer_store)
+def get_customer_ids_by_names(customer_names: list[str]) -> str:
+    """
+    Get the customer IDs of several customers at once, by their names (case insensitive)
+
+    Args:
+        customer_names (list[str]): The names of the customers (case insensitive)
+
+    Returns:
+        A list with name and customerId for each name in a JSON format. When a name has no match, it has status customer_not_found and the closest customer names as candidates with customerId, name and similarity
+    """
+    logger.info(f"Getting customer IDs by names: {customer_names}")
+
+    if not customer_names:
+        return dumps({"status": "invalid_arguments"})
+
+    customer_service = get_customer_service()
+    customer_ids = customer_service.get_customer_ids_by_names(customer_names)
+
+    customers = []
+    for customer_name, customer_id in customer_ids.items():
+        if customer_id is not None:
+            customers.append({"name": customer_name, "customerId": customer_id})
+            continue
+
+        candidates = [
+            {
+                "customerId": customer.id,
+                "name": customer.name,
+                "similarity": similarity
+            }
+            for customer, similarity in customer_service.find_customers_by_name(customer_name)
+        ]
+        customers.append({"name": customer_name, "status": "customer_not_found", "candidates": candidates})
+
+    logger.info(f"Found {sum('customerId' in customer for customer in customers)} of {len(customers)} customers")
+    return dumps({"customers": customers})
 
 
 @mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(customer_store)
 def get_customer_id_by_name(customer_name: str) -> str:
     """
-    Get a customer ID by their name (case sensitive, first char of name and surname is uppercase)
+    Get a customer ID by their name (case insensitive)
 
     Args:
-        customer_name (str): The name of the customer (case sensitive, first char of name and surname is uppercase)
+        customer_name (str): The name of the customer (case insensitive)
 
     Returns:
-        The customer ID in a JSON format
+        The customer ID in a JSON format. When there is no match, the closest customer names are returned as candidates with customerId, name and similarity
     """
     logger.info(f"Getting customer ID by name: {customer_name}")
 
-    customer_service = CustomerService()
+    customer_service = get_customer_service()
     customer_id = customer_service.get_customer_id_by_name(customer_name)
 
     if customer_id is None:
-        return json.dumps({"status": "customer_not_found"})
-
-    return json.dumps({"customerId": customer_id})
\ No newline at end of file
+        candidates = [
+            {
+                "customerId": customer.id,
+                "name": customer.name,
+                "similarity": similarity
+            }
+            for customer, similarity in customer_service.find_customers_by_name(customer_name)
+        ]
+        logger.info(f"Customer not found, {len(candidates)} candidates")
+        return dumps({"status": "customer_not_found", "candidates": candidates})
+
+    return dumps({"customerId": customer_id})
\ No newline at end of file
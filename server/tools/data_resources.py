@@ -0,0 +1,18 @@
+from server import mcp
+from service.data_store import get_data_versions
+from tools.instrumentation import instrumented
+from tools.serialization import dumps
+from tools.tool_executor import offloaded
+
+
+@mcp.resource("data://version", mime_type="application/json")
+@instrumented
+@offloaded
+def get_data_version() -> str:
+    """
+    Version of the orders and customers data served by the tools
+
+    Returns:
+        The version of each data file in a JSON format, changing whenever the file is reloaded
+    """
+    return dumps(get_data_versions())
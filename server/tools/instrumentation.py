@@ -0,0 +1,49 @@
+from server import mcp
+from service.metrics import metrics
+from tools.response_cache import response_cache
+from tools.tool_executor import tool_executor
+from functools import wraps
+from starlette.requests import Request
+from starlette.responses import Response
+from typing import Awaitable, Callable
+import time
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics.counter("mcp_tool_calls_total", "Tool calls, by tool")
+metrics.counter("mcp_tool_errors_total", "Tool calls that raised an error, by tool")
+metrics.histogram("mcp_tool_duration_seconds", "Tool call latency including the wait for a worker, by tool")
+metrics.gauge("mcp_tool_pending", "Tool calls running or waiting for a worker", collect=lambda: {(): tool_executor.pending})
+metrics.counter("mcp_tool_rejected_total", "Tool calls answered busy because the worker pool was saturated", collect=lambda: {(): tool_executor.rejected})
+
+
+def collect_cache_requests() -> dict:
+    stats = response_cache.stats()
+    return {(("result", "hit"),): stats["hits"], (("result", "miss"),): stats["misses"]}
+
+
+metrics.counter("mcp_tool_cache_requests_total", "Tool response cache lookups, by result", collect=collect_cache_requests)
+
+
+def instrumented(func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Count the calls and errors of an async tool and record its latency."""
+    name = func.__name__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> str:
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            metrics.inc("mcp_tool_errors_total", tool=name)
+            raise
+        finally:
+            metrics.inc("mcp_tool_calls_total", tool=name)
+            metrics.observe("mcp_tool_duration_seconds", time.perf_counter() - start, tool=name)
+
+    return wrapper
+
+
+@mcp.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+async def get_metrics(request: Request) -> Response:
+    return Response(metrics.render(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
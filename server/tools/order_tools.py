@@ -1,11 +1,20 @@
 from server import mcp
-from service.order_service import OrderService
-import json
+from service.data_store import customer_store, get_customer_service, get_order_service, order_store
+from service.aggregation import AGGREGATE_GROUPS, AGGREGATE_METRICS
+from service.order_service import MAX_MONTH_RANGE, iso_month_range, parse_date_range
+from service.columnar_order_store import parse_iso_month
+from tools.instrumentation import instrumented
+from tools.response_cache import cached_tool
+from tools.serialization import dumps
+from tools.tool_executor import offloaded
 import logging
 
 logger = logging.getLogger(__name__)
 
 @mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(order_store)
 def get_order_count_by_customer_and_month(customer_name: str, month: str) -> str:
     """
     Count orders for one customer in a specific calendar month
@@ -20,13 +29,98 @@ def get_order_count_by_customer_and_month(customer_name: str, month: str) -> str
     logger.info(f"Getting order count for customer: {customer_name} in month: {month}")
 
     if not customer_name:
-        return json.dumps({"status": "invalid_arguments"})
+        return dumps({"status": "invalid_arguments"})
     
     if not month:
-        return json.dumps({"status": "invalid_arguments"})
+        return dumps({"status": "invalid_arguments"})
 
-    order_service = OrderService()
+    order_service = get_order_service()
     order_count = order_service.get_order_count_by_customer_and_month(customer_name, month)
     
     logger.info(f"Found {order_count} orders for customer {customer_name} in month {month}")
-    return json.dumps({"count": order_count})
\ No newline at end of file
+    return dumps({"count": order_count})
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(order_store)
+def get_order_counts_by_customers_and_months(
+    customer_names: list[str],
+    months: list[str] | None = None,
+    start_month: str | None = None,
+    end_month: str | None = None
+) -> str:
+    """
+    Count orders for several customers over several calendar months in one call
+
+    Args:
+        customer_names (list[str]): The names of the customers (case sensitive, first char of name and surname is uppercase)
+        months (list[str]): Months in ISO 8601 format (YYYY-MM). Use either months or start_month and end_month
+        start_month (str): First month of an inclusive range in ISO 8601 format (YYYY-MM), e.g. 2025-01 for Q1 2025
+        end_month (str): Last month of an inclusive range in ISO 8601 format (YYYY-MM), e.g. 2025-03 for Q1 2025
+
+    Returns:
+        A list with customerName, month and count, and the total per customer, in a JSON format
+    """
+    logger.info(f"Getting order counts for customers: {customer_names} in months: {months} from {start_month} to {end_month}")
+
+    if not customer_names:
+        return dumps({"status": "invalid_arguments"})
+
+    if months and not (start_month or end_month):
+        if len(months) > MAX_MONTH_RANGE or any(parse_iso_month(month) is None for month in months):
+            return dumps({"status": "invalid_arguments"})
+    elif start_month and end_month and not months:
+        months = iso_month_range(start_month, end_month)
+        if months is None:
+            return dumps({"status": "invalid_arguments"})
+    else:
+        return dumps({"status": "invalid_arguments"})
+
+    order_service = get_order_service()
+    counts = order_service.get_order_counts_by_customers_and_months(customer_names, months)
+
+    logger.info(f"Counted orders for {len(counts)} customers over {len(months)} months")
+    return dumps({
+        "counts": [
+            {"customerName": customer_name, "month": month, "count": count}
+            for customer_name, counts_by_month in counts.items()
+            for month, count in counts_by_month.items()
+        ],
+        "totals": [
+            {"customerName": customer_name, "count": sum(counts_by_month.values())}
+            for customer_name, counts_by_month in counts.items()
+        ]
+    })
+
+
+@mcp.tool()
+@instrumented
+@offloaded
+@cached_tool(order_store, customer_store)
+def aggregate_orders(start_date: str, end_date: str, metric: str = "count", group_by: str | None = None) -> str:
+    """
+    Aggregate the orders placed in a date range, optionally grouped, e.g. Q1 spend by country
+
+    Args:
+        start_date (str): First day of the range in ISO 8601 format (YYYY-MM-DD), inclusive
+        end_date (str): Last day of the range in ISO 8601 format (YYYY-MM-DD), inclusive
+        metric (str): count, sum, avg, min or max of the order amounts (default: count)
+        group_by (str): customer, day, month or country, or empty for a single result
+
+    Returns:
+        A list of results with the group (customerId and customerName, day, month or country), the order count and the metric value in a JSON format
+    """
+    logger.info(f"Aggregating orders from {start_date} to {end_date} with metric: {metric} grouped by: {group_by}")
+
+    date_range = parse_date_range(start_date, end_date)
+    if date_range is None or metric not in AGGREGATE_METRICS or (group_by and group_by not in AGGREGATE_GROUPS):
+        return dumps({"status": "invalid_arguments"})
+
+    order_service = get_order_service()
+    country_by_customer_id = get_customer_service().get_country_by_customer_id() if group_by == "country" else None
+    results = order_service.aggregate_orders(*date_range, metric, group_by or None, country_by_customer_id)
+
+    logger.info(f"Aggregated orders into {len(results)} results")
+    return dumps({"metric": metric, "groupBy": group_by or None, "results": results})
@@ -0,0 +1,154 @@
+from service.data_store import DataStore
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+
+
+class ResponseCache:
+    """
+    LRU cache of tool responses with a time to live.
+
+    Entries are keyed by tool name and canonical arguments. The versions of
+    the data stores a tool reads are checked on every lookup and the whole
+    cache is cleared when any of them changes, so a reload never serves a
+    stale response. Responses computed while a store is still loading in
+    background, or after its background load failed, are not cached, since
+    they only see part of the data.
+    """
+
+    def __init__(self, max_size: int = TOOL_CACHE_SIZE, ttl: float = TOOL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Tuple, Tuple[float, str]] = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Tuple, record_miss: bool = True) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                if record_miss:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def check_versions(self, stores: Tuple[DataStore, ...]) -> None:
+        for store in stores:
+            store.get()
+
+        with self._lock:
+            for store in stores:
+                previous = self._versions.get(id(store))
+                if previous is not None and previous != store.version:
+                    logger.info(f"Data store {store.file_path} reloaded, clearing {len(self._entries)} cached responses")
+                    self._entries.clear()
+                    self.invalidations += 1
+                self._versions[id(store)] = store.version
+
+    def versions_current(self, stores: Tuple[DataStore, ...]) -> bool:
+        """Whether the cache was last checked against the stores' current versions, without touching their files."""
+        with self._lock:
+            return all(store.fresh and self._versions.get(id(store)) == store.version for store in stores)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+response_cache = ResponseCache()
+
+
+def canonical_arguments(signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def cached_tool(*stores: DataStore, cache: ResponseCache = response_cache) -> Callable:
+    """
+    Cache a tool's JSON response until the TTL expires or one of `stores` reloads.
+
+    The wrapper gets a `cached_response` function returning the cached
+    response, or None, without calling the tool or blocking on a store
+    reload, so callers like offloaded can answer hits on the event loop.
+    """
+
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        signature = inspect.signature(func)
+
+        def cached_response(*args, **kwargs) -> Optional[str]:
+            if not cache.enabled or not cache.versions_current(stores) or any(store.loading or store.failed for store in stores):
+                return None
+
+            # Misses are counted by the wrapper when it computes the response
+            response = cache.get((func.__name__, canonical_arguments(signature, args, kwargs)), record_miss=False)
+            if response is not None:
+                logger.debug(f"Cache hit for {func.__name__}")
+            return response
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> str:
+            if not cache.enabled:
+                return func(*args, **kwargs)
+
+            cache.check_versions(stores)
+            if any(store.loading or store.failed for store in stores):
+                return func(*args, **kwargs)
+
+            key = (func.__name__, canonical_arguments(signature, args, kwargs))
+
+            response = cache.get(key)
+            if response is not None:
+                logger.debug(f"Cache hit for {func.__name__}")
+                return response
+
+            response = func(*args, **kwargs)
+            cache.put(key, response)
+            return response
+
+        wrapper.cached_response = cached_response
+        return wrapper
+
+    return decorator
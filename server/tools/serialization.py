@@ -0,0 +1,41 @@
+from typing import Any
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TOOL_RESPONSE_COMPACT = os.getenv("TOOL_RESPONSE_COMPACT", "false").lower() == "true"
+
+
+def tabulate(value: Any) -> Any:
+    """
+    Replace lists of objects that share the same keys with a single
+    {"columns": [...], "rows": [[...], ...]} table, so keys aren't repeated
+    for every row. Nested values are tabulated too.
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [tabulate(item) for item in value]
+        if len(items) > 1 and all(isinstance(item, dict) for item in items):
+            columns = list(items[0])
+            if all(list(item) == columns for item in items):
+                return {"columns": columns, "rows": [list(item.values()) for item in items]}
+        return items
+    return value
+
+
+def dumps(value: Any, compact: bool = None) -> str:
+    """
+    Serialize a tool response without whitespace, with orjson when it is
+    installed and the json module otherwise. In compact mode lists of
+    objects are sent as tables, see tabulate.
+    """
+    if TOOL_RESPONSE_COMPACT if compact is None else compact:
+        value = tabulate(value)
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
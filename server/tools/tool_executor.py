@@ -0,0 +1,93 @@
+from tools.serialization import dumps
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+TOOL_MAX_PENDING = int(os.getenv("TOOL_MAX_PENDING", "64"))
+TOOL_QUEUE_TIMEOUT = float(os.getenv("TOOL_QUEUE_TIMEOUT", "10"))
+
+
+class ToolBusyError(Exception):
+    pass
+
+
+class ToolExecutor:
+    """
+    Bounded thread pool running tool bodies off the event loop.
+
+    At most `workers` tool calls run at once. Calls beyond that wait for a
+    slot for up to `queue_timeout` seconds, and once `max_pending` calls are
+    running or waiting new ones are rejected right away with ToolBusyError,
+    so a burst of slow calls can't stall other sessions or queue unboundedly.
+    """
+
+    def __init__(self, workers: int = TOOL_WORKERS, max_pending: int = TOOL_MAX_PENDING, queue_timeout: float = TOOL_QUEUE_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool")
+
+    async def run(self, func: Callable[..., str], *args, **kwargs) -> str:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ToolBusyError(f"{self.pending} tool calls pending")
+
+        self.pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except TimeoutError:
+                self.rejected += 1
+                raise ToolBusyError(f"No tool worker free after {self.queue_timeout}s")
+
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+            finally:
+                self._slots.release()
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+tool_executor = ToolExecutor()
+
+
+def offloaded(func: Callable[..., str] = None, *, executor: ToolExecutor = None) -> Callable[..., Awaitable[str]]:
+    """
+    Turn a blocking tool into an async one that runs on the tool executor and reports busy when saturated.
+
+    Responses cached by cached_tool are returned on the event loop, without
+    waiting for a worker.
+    """
+
+    def decorator(func: Callable[..., str]) -> Callable[..., Awaitable[str]]:
+        cached_response = getattr(func, "cached_response", None)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> str:
+            if cached_response is not None:
+                response = cached_response(*args, **kwargs)
+                if response is not None:
+                    return response
+
+            try:
+                return await (executor or tool_executor).run(func, *args, **kwargs)
+            except ToolBusyError as e:
+                logger.warning(f"Rejected {func.__name__}: {e}")
+                return dumps({"status": "busy"})
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator